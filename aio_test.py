@@ -0,0 +1,88 @@
+"""비동기 수집 점검: 로컬 aiohttp 서버로 호출 결과 상태(ok/timeout/rate_limited/parse_error) 분류와 동시성 확인
+
+    python aio_test.py        # 결과 출력
+    python -m pytest aio_test.py
+"""
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+from dashboard import aio
+
+DELAY = 0.2  # 느린 응답 지연 (초)
+
+
+def make_app():
+    hits = {'limited': 0}
+
+    async def ok(request):
+        return web.json_response([{'value': int(request.query.get('n', 0))}])
+
+    async def slow(request):
+        await asyncio.sleep(DELAY)
+        return web.json_response([{'value': 1}])
+
+    async def limited(request):
+        hits['limited'] += 1
+        if hits['limited'] == 1: return web.Response(status=429, headers={'Retry-After': '0'})
+        return web.json_response([{'value': 2}])
+
+    async def always_limited(request):
+        return web.Response(status=429, headers={'Retry-After': '0'})
+
+    async def broken(request):
+        return web.Response(text="<html>not json</html>")
+
+    app = web.Application()
+    app.router.add_get('/ok', ok)
+    app.router.add_get('/slow', slow)
+    app.router.add_get('/limited', limited)
+    app.router.add_get('/always_limited', always_limited)
+    app.router.add_get('/broken', broken)
+    return app
+
+
+async def run_checks():
+    runner = web.AppRunner(make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    sem = asyncio.Semaphore(aio.CONCURRENCY)
+
+    def value(res):
+        return res[0]['value']
+
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=DELAY / 2)) as session:
+            statuses = {name: (await aio.fetch(session, sem, f"{base}/{name}", value)).status
+                        for name in ['ok', 'slow', 'limited', 'always_limited', 'broken']}
+            missing = await aio.fetch(session, sem, f"{base}/ok", lambda res: res[0]['missing'])
+
+        # 지연 응답 200건을 동시에 보내도 지연 1~2회 분량 안에 끝나야 함
+        async with aiohttp.ClientSession() as session:
+            started = time.perf_counter()
+            outcomes = await asyncio.gather(*(aio.fetch(session, sem, f"{base}/slow", value) for _ in range(200)))
+            elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+    return statuses, missing, outcomes, elapsed
+
+
+def test_outcomes_and_concurrency():
+    statuses, missing, outcomes, elapsed = asyncio.run(run_checks())
+    assert statuses == {'ok': aio.OK, 'slow': aio.TIMEOUT, 'limited': aio.OK,
+                        'always_limited': aio.RATE_LIMITED, 'broken': aio.PARSE_ERROR}
+    assert missing.status == aio.PARSE_ERROR and 'KeyError' in missing.error
+    assert all(o.ok for o in outcomes)
+    assert elapsed < DELAY * 5, f"200건 동시 요청 {elapsed:.2f}초"
+
+
+if __name__ == "__main__":
+    statuses, missing, outcomes, elapsed = asyncio.run(run_checks())
+    print(statuses)
+    print(f"지연 {DELAY}초 응답 200건 동시 처리: {elapsed:.2f}초")
+    test_outcomes_and_concurrency()
+    print("✅ 통과")
@@ -0,0 +1,112 @@
+"""알림 엔진 점검: 기준선 돌파 1회 알림 + 히스테리시스 재무장, 등급 상향, 시장별 규칙, 싱크 전달, 평가 속도 확인
+
+    python alerts_test.py        # 결과 출력
+    python -m pytest alerts_test.py
+"""
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard.alerts import AlertEngine, FileSink, MemorySink, Rule, default_rules, dispatch
+from dashboard.model import GRADE_LABELS
+
+N_RULES = 300          # 속도 측정 규칙 수
+N_TICKERS = 5_000      # 속도 측정 종목 수
+RULE_BUDGET = 0.001    # 규칙 1개당 허용 시간 (초, 갱신 1회)
+
+
+def frame(drops, grades=None, market='kr'):
+    """종목 A, B, ... 의 고점대비 (%)와 투자등급"""
+    tickers = [chr(ord('A') + i) for i in range(len(drops))]
+    return pd.DataFrame({'시장': market, '종목': tickers, '기업명': [f"기업{t}" for t in tickers],
+                         '고점대비 (%)': drops, '투자등급': grades or [GRADE_LABELS[0]] * len(drops)})
+
+
+def test_crossing_fires_once_with_hysteresis():
+    engine = AlertEngine([Rule("하락", '고점대비 (%)', 'below', -30, hysteresis=2)])
+    assert engine.evaluate(frame([-35.0, -10.0])) == []       # 처음 관측: 이미 넘은 값도 알림 없음
+    fired = engine.evaluate(frame([-36.0, -31.0]))
+    assert [a['종목'] for a in fired] == ['B']                  # B만 기준선을 새로 넘음
+    assert engine.evaluate(frame([-36.0, -29.0])) == []        # 히스테리시스 폭 안에서 되돌아옴: 재무장 안 됨
+    assert engine.evaluate(frame([-36.0, -30.5])) == []        # 다시 넘어도 알림 없음
+    engine.evaluate(frame([-36.0, -27.0]))                     # -28보다 위로 회복 -> 재무장
+    assert [a['종목'] for a in engine.evaluate(frame([-36.0, -31.0]))] == ['B']
+
+
+def test_missing_rows_keep_state():
+    engine = AlertEngine([Rule("하락", '고점대비 (%)', 'below', -30)])
+    engine.evaluate(frame([-10.0, -10.0]))
+    assert engine.evaluate(frame([-10.0])) == []               # B가 이번 갱신에 없음 (부분 갱신)
+    assert [a['종목'] for a in engine.evaluate(frame([-10.0, -40.0]))] == ['B']
+
+
+def test_grade_upgrade_and_market_rules():
+    rules = default_rules('kr', min_drop=30, min_up=70)
+    engine = AlertEngine(rules)
+    engine.evaluate(frame([-10.0, -10.0], [GRADE_LABELS[1], GRADE_LABELS[2]]))
+    fired = engine.evaluate(frame([-10.0, -10.0], [GRADE_LABELS[3], GRADE_LABELS[1]]))
+    assert [(a['종목'], a['값']) for a in fired] == [('A', GRADE_LABELS[3])]  # 상향만, 하향은 알림 없음
+    # kr 규칙은 다른 시장 종목에 적용되지 않음
+    engine.evaluate(frame([-10.0], market='us'))
+    assert engine.evaluate(frame([-50.0], market='us')) == []
+
+
+def test_sinks():
+    path = os.path.join(tempfile.mkdtemp(), "alerts.jsonl")
+    memory = MemorySink()
+
+    class Broken:
+        def send(self, alerts): raise ConnectionError("down")
+    alerts = [{'종목': 'A', '규칙': '하락'}]
+    errors = dispatch(alerts, [Broken(), FileSink(path), memory])
+    assert len(errors) == 1 and "Broken" in errors[0]          # 한 싱크 실패가 나머지 전달을 막지 않음
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == alerts
+    assert memory.drain() == alerts and memory.drain() == [] and list(memory.recent) == alerts
+
+
+def test_state_round_trip():
+    path = os.path.join(tempfile.mkdtemp(), "state.pkl")
+    rules = [Rule("하락", '고점대비 (%)', 'below', -30)]
+    engine = AlertEngine(rules)
+    engine.evaluate(frame([-10.0]))
+    engine.save(path)
+    assert len(AlertEngine.load(rules, path).evaluate(frame([-40.0]))) == 1
+    assert AlertEngine.load([Rule("하락", '고점대비 (%)', 'below', -20)], path).evaluate(frame([-40.0])) == []  # 규칙이 바뀌면 새 상태
+
+
+def measure_rules(n_rules=N_RULES, n_tickers=N_TICKERS):
+    rng = np.random.default_rng(0)
+    rules = [Rule(f"규칙{i}", ['고점대비 (%)', '상승여력 (%)', 'PER', '투자등급'][i % 4],
+                  ['below', 'above', 'below', 'up'][i % 4], [-30, 70, 10, 0][i % 4] + i % 7, 2) for i in range(n_rules)]
+    df = pd.DataFrame({'시장': 'us', '종목': [f"T{i}" for i in range(n_tickers)], '기업명': "x",
+                       '고점대비 (%)': -rng.uniform(0, 60, n_tickers), '상승여력 (%)': rng.uniform(0, 100, n_tickers),
+                       'PER': rng.uniform(0, 40, n_tickers), '투자등급': rng.choice(GRADE_LABELS, n_tickers)})
+    engine = AlertEngine(rules)
+    engine.evaluate(df)
+    ticks = 5
+    started = time.perf_counter()
+    for _ in range(ticks):  # 갱신마다 일부 종목이 기준선을 넘나드는 정도의 변동
+        df['고점대비 (%)'] += rng.normal(0, 1, n_tickers)
+        df['상승여력 (%)'] += rng.normal(0, 1, n_tickers)
+        engine.evaluate(df)
+    return (time.perf_counter() - started) / ticks / n_rules
+
+
+def test_rule_speed():
+    assert measure_rules() < RULE_BUDGET
+
+
+if __name__ == "__main__":
+    print(f"규칙 {N_RULES}개 x 종목 {N_TICKERS:,}개: 규칙 1개당 {measure_rules() * 1e6:.1f}µs / 갱신")
+    test_crossing_fires_once_with_hysteresis()
+    test_missing_rows_keep_state()
+    test_grade_upgrade_and_market_rules()
+    test_sinks()
+    test_state_round_trip()
+    test_rule_speed()
+    print("✅ 통과")
@@ -1,31 +1,51 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
-import json
+import numpy as np
 import os
-import requests
-import re
-from collections import Counter
-from datetime import datetime, timedelta
-from pykrx import stock
-from io import BytesIO
+
+# altair(차트), pykrx(한국 주식), xlsxwriter(엑셀)는 사용하는 시점에만 지연 로딩
+from dashboard.alerts import (ALERT_LOG, ALERTS_PATH, AlertEngine, FileSink, MemorySink, WebhookSink, alert_message,
+                              default_rules, dispatch, load_rules)
+from dashboard.cache import shared_cache
+from dashboard.clients import new_session, use_session
+from dashboard.config import CACHE_BACKEND, HISTORY_DIR, MARKETS
+from dashboard.engine import analyze_all_markets, grade_frame, score_pool
+from dashboard.export import EXPORT_FORMATS, export_bytes
+from dashboard.failover import us_chain
+from dashboard.fundamentals import load_series
+from dashboard.fx import BASE_CURRENCY, rates_for
+from dashboard.holdings import HOLDINGS_PATH, Holdings, import_sheet, load_holdings, quote_table, save_holdings
+from dashboard.model import GRADE_LABELS, RESULT_SCHEMA, compact_frame, format_memory_usage, grade_color
+from dashboard.portfolio import load_portfolio, parse_tickers, portfolio_path, save_portfolio, thresholds_of
+from dashboard.risk import HIGH_CORR, analyze_risk, name_key
+from dashboard.results import (BackgroundRefresh, age_label, analyze_incremental, is_stale, load_result, merge_rows,
+                               reusable_rows, save_result, save_rows)
+from dashboard.sectors import SECTOR_MIN_COUNT, us_coverage
+from dashboard.universe import symbol_index, validate_tickers
+from dashboard.watchlist import import_watchlist, list_watchlists, load_watchlist
 
 # ==============================================================================
 # [1] 시스템 설정 및 전역 변수 초기화
 # ==============================================================================
-# API 인증 정보 및 로컬 저장 경로 설정
-NAVER_CLIENT_ID = "UtJVnNmIIhf5KLF4Wssx"
-NAVER_CLIENT_SECRET = "RWqDMr5avj"
-FINNHUB_API_KEY = "d5ghto1r01ql4f48gcrgd5ghto1r01ql4f48gcs0"
-HISTORY_DIR = "history"
+# 로컬 저장 경로 설정 (API 인증 정보 등 공통 설정은 dashboard.config)
 os.makedirs(HISTORY_DIR, exist_ok=True)
 
 def init_session_state():
     """Streamlit 세션 상태 초기화: 앱 리프레시 시에도 유지될 기본값 설정"""
     defaults = {
         "tickers_input": "005930, 000660, 005380, 000270, 012330, 035420, 035720, 017670, 207940, 008770, 041510, 122870, 035900, 352820",
-        "max_per": 20, "min_up": 70, "min_drop": 30, "min_div": 4.0,
-        "df": None, "market": "kr", "saved_portfolio": {}
+        "max_per": 20, "min_up": 70, "min_drop": 30, "min_div": 4.0, "max_rsi": 0, "margin_trend": False,
+        "df": None, "market": "kr", "saved_portfolio": {}, "export_file": None, "table_styles": None,
+        # stale-while-revalidate: 시장별 등급 산정 전 결과/저장 시각, 백그라운드 갱신, 마지막으로 반영한 갱신 버전
+        "raw_frames": {}, "saved_at": {}, "refreshers": {}, "seen_versions": {}, "swr_key": None,
+        # 화면 결과의 등급/표 스타일에 적용한 기준값 (슬라이더가 바뀌면 원본으로 다시 계산)
+        "graded_key": None,
+        # 보유 종목: (holdings.json 수정 시각, Holdings) - 포지션 파일이 바뀔 때만 다시 생성
+        "holdings": (None, None),
+        # 시장별로 분석 중인 관심 목록 이름 (None: 종목 코드 직접 입력)
+        "watchlists": {},
+        # 알림: (규칙/기준값 서명, AlertEngine) - 규칙이 바뀌면 상태를 새로 시작, 화면 표시용 최근 알림
+        "alert_engine": (None, None), "alert_sink": MemorySink()
     }
     for key, value in defaults.items():
         if key not in st.session_state:
@@ -33,166 +53,206 @@ def init_session_state():
 
 init_session_state()
 
+@st.cache_resource
+def get_http_session():
+    """서버 프로세스 전체에서 공유하는 HTTP 세션 (세션/재실행 간 커넥션 풀 재사용)"""
+    return new_session()
+
+use_session(get_http_session())
+
 # ==============================================================================
-# [2] 뉴스 수집 및 감성 분석 엔진
+# [2] 유틸리티 (수집/점수/등급 엔진은 dashboard 패키지)
 # ==============================================================================
-def get_sentiment_score(text, market='kr'):
-    """텍스트 내 키워드를 매칭하여 감성 점수 산출 (단순 키워드 카운팅 방식)"""
-    # 긍정/부정 사전 정의 (한/영 통합)
-    pos_kr = ['상승', '돌파', '수익', '호재', '성장', '매수', '긍정', '신고가', '최고', '증가', '성공', '반등', '실적개선', '우수']
-    neg_kr = ['하락', '감소', '악재', '손실', '우려', '매도', '부정', '급락', '쇼크', '폭락', '실패', '약세', '부진']
-    pos_en = ['up', 'rise', 'growth', 'gain', 'positive', 'buy', 'bullish', 'high', 'jump', 'surpass', 'beat', 'success', 'dividend']
-    neg_en = ['down', 'fall', 'loss', 'drop', 'negative', 'sell', 'bearish', 'low', 'slump', 'miss', 'fail', 'concern', 'risk']
-    
-    score = 0
-    text_lower = text.lower()
-    pos_words = pos_kr + pos_en
-    neg_words = neg_kr + neg_en
-    
-    for word in pos_words:
-        if word in text_lower: score += 1
-    for word in neg_words:
-        if word in text_lower: score -= 1
-    return score
-
-def get_stock_news(query, market='us'):
-    """시장에 따라 Finnhub(미국) 또는 Naver(한국/코인) API를 호출하여 뉴스 수집"""
-    news_display, full_text_list, total_sentiment = [], [], 0
-    try:
-        if market == 'us':
-            # Finnhub API: 최근 3일간의 기업 뉴스 수집
-            url = f"https://finnhub.io/api/v1/company-news?symbol={query}&from={(datetime.now()-timedelta(days=3)).strftime('%Y-%m-%d')}&to={datetime.now().strftime('%Y-%m-%d')}&token={FINNHUB_API_KEY}"
-            res = requests.get(url, timeout=5).json()[:3]
-            for item in res:
-                title, summary = item.get('headline', ''), item.get('summary', '')
-                news_display.append(title)
-                full_text_list.append(f"{title} {summary}")
-                total_sentiment += get_sentiment_score(title + summary, 'us')
-        else:
-            # Naver 뉴스 검색 API: 관련도 높은 뉴스 3건 수집
-            url = f"https://openapi.naver.com/v1/search/news.json?query={query}&display=3&sort=sim"
-            headers = {"X-Naver-Client-Id": NAVER_CLIENT_ID, "X-Naver-Client-Secret": NAVER_CLIENT_SECRET}
-            res = requests.get(url, headers=headers, timeout=5).json()
-            for item in res.get('items', []):
-                title = re.sub(r'<[^>]*>', '', item['title'])
-                desc = re.sub(r'<[^>]*>', '', item['description'])
-                news_display.append(title)
-                full_text_list.append(f"{title} {desc}")
-                total_sentiment += get_sentiment_score(title + desc, 'kr')
-    except: pass
-    
-    label = "🙂 긍정" if total_sentiment > 0 else "😟 부정" if total_sentiment < 0 else "🧐 중립"
-    return news_display, full_text_list, label, total_sentiment
+def get_save_file(market=None): 
+    """포트폴리오 파일명 생성 (시장별 별도 관리)"""
+    return portfolio_path(market or st.session_state.market)
 
 # ==============================================================================
-# [3] 유틸리티 및 데이터 래퍼 (API 통신 및 전처리)
+# [3] 결과 표 스타일 및 내보내기 캐시
 # ==============================================================================
-def get_save_file(): 
-    """포트폴리오 파일명 생성 (시장별 별도 관리)"""
-    return f"portfolio_{st.session_state.market}.json"
-
-def get_safe_trading_day():
-    """최근 개장일 확인: 주말/공휴일을 고려하여 데이터가 존재하는 가장 가까운 영업일 반환"""
-    for i in range(10):
-        target_day = (datetime.now() - timedelta(days=i)).strftime("%Y%m%d")
-        df = stock.get_market_ohlcv_by_date(target_day, target_day, "005930")
-        if not df.empty: return target_day
-    return datetime.now().strftime("%Y%m%d")
-
-def get_kr_indicators(ticker):
-    url = f"https://finance.naver.com/item/main.naver?code={ticker}"
-    try:
-        res = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=5).text
-        
-        def parse_value(pattern, text):
-            match = re.search(pattern, text, re.DOTALL)
-            if match:
-                raw_data = match.group(1).strip()
-                # N/A 또는 마이너스 표시(-)가 있으면 0.0 반환 (적자 업종/종목 처리)
-                if 'N/A' in raw_data.upper() or not raw_data or raw_data == '-':
-                    return 0.0
-                
-                # 숫자, 소수점, 콤마, 마이너스 기호만 남기고 제거
-                val_str = re.sub(r'[^\d,.\-]', '', raw_data).replace(',', '')
-                try:
-                    val = float(val_str)
-                    # 업종 PER이 10,000 이상인 경우 데이터 오류 혹은 비정상치로 보고 0.0 처리
-                    return val if -1000 < val < 10000 else 0.0
-                except:
-                    return 0.0
-            return 0.0
+UNDERVALUED_STYLES = {'저평가': 'color: blue; font-weight: bold', '고평가': 'color: red', '업종적자': 'color: orange'}
+TABLE_PAGE_SIZE = 50       # 결과 표 한 페이지 행 수
+SUMMARY_CARD_LIMIT = 30    # 요약 카드로 표시할 상위 종목 수
+NA_IF_NONPOSITIVE = ['PER', '업종PER', 'PBR', '업종PBR', '배당률 (%)']  # 0 이하 값을 N/A로 표시하는 컬럼
+PRICE_COLUMNS = ['현재가', '52주 고점', '52주 저점']
+PRICE_FORMATS = {'kr': "{:,.0f}"}  # 시장별 가격 표시 형식 (그 밖의 시장은 소수 둘째 자리)
+ALERT_TOASTS = 5           # 갱신 1회에 토스트로 띄우는 최대 알림 수 (나머지는 알림 기록 파일)
 
-        per = parse_value(r'id="_per">(.+?)<', res)
-        pbr = parse_value(r'id="_pbr">(.+?)<', res)
-        div = parse_value(r'배당수익률.*?<em.*?>(.+?)</em>', res)
-        sec_per = parse_value(r'동일업종 PER.*?<em.*?>([\d,.\-\s]+).*?</em>', res)
 
-        return per, pbr, div, sec_per
-    except:
-        return 0.0, 0.0, 0.0, 0.0
+def sentiment_style(label):
+    """뉴스감성 라벨 -> 셀 CSS"""
+    if '긍정' in label: return 'background-color: #e6f4ea; color: #137333'
+    if '부정' in label: return 'background-color: #fce8e6; color: #c5221f'
+    return 'background-color: #f1f3f4; color: #3c4043'
 
 
-def get_crypto_data(ticker):
-    """업비트 Public API를 사용하여 암호화폐 시세 및 52주 고/저점 데이터 수집"""
-    try:
-        url = f"https://api.upbit.com/v1/ticker?markets=KRW-{ticker}"
-        res = requests.get(url, timeout=5).json()
-        if not res: return None
-        data = res[0]
-        return {
-            '현재가': data['trade_price'],
-            '52주 고점': data['highest_52_week_price'],
-            '52주 저점': data['lowest_52_week_price'],
-            '24시간 변동률 (%)': round(data['signed_change_rate'] * 100, 2)
-        }
-    except: return None
+def _label_styles(series, resolve):
+    """라벨 컬럼 스타일: 고유 라벨마다 한 번만 계산한 뒤 전체 행에 매핑"""
+    lookup = {label: resolve(str(label)) for label in series.unique()}
+    return series.astype(object).map(lookup)
+
+
+def build_table_styles(df, max_per, min_up, min_drop, min_div):
+    """결과 표의 셀별 CSS를 컬럼 단위 벡터 연산으로 계산 (등급 산정과 함께 호출, 기준값이 바뀌면 다시 계산)"""
+    styles = pd.DataFrame('', index=df.index, columns=df.columns)
+    styles['투자등급'] = _label_styles(df['투자등급'], lambda g: "background-color: {}; color: {}".format(*grade_color(g)))
+    styles['뉴스감성'] = _label_styles(df['뉴스감성'], sentiment_style)
+    styles['저평가여부(PER)'] = _label_styles(df['저평가여부(PER)'], lambda v: UNDERVALUED_STYLES.get(v, 'color: gray') + '; text-align: right')
+
+    per = df['PER'].to_numpy()
+    styles['PER'] = np.where((per > 0) & (per <= max_per), 'background-color: #d1f7d6', '')
+    styles['고점대비 (%)'] = np.where(df['고점대비 (%)'].to_numpy() <= -min_drop, 'background-color: #d1e0f7', '')
+    styles['상승여력 (%)'] = np.where(df['상승여력 (%)'].to_numpy() >= min_up, 'background-color: #fff0b3', '')
+    styles['배당률 (%)'] = np.where(df['배당률 (%)'].to_numpy() >= min_div, 'background-color: #fde2e2', '')
+    # 스타일 문자열은 종류가 몇 개뿐이므로 category로 보관
+    return styles.astype('category')
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_export(df, fmt, thresholds=None):
+    """내보내기 파일 생성: 결과 DataFrame 해시 + 형식 + 기준값 단위로 캐시하여 재생성 비용 제거"""
+    return export_bytes(df, fmt, thresholds)
 
 # ==============================================================================
-# [4] 핵심 키워드 추출 로직
+# [4] 차트 데이터 계층 (필요 컬럼만 전달 + 대규모 결과 사전 집계 + 스펙 캐시)
 # ==============================================================================
-def extract_keywords(full_texts, ticker_name, market='kr'):
-    """뉴스 텍스트에서 불용어를 제외하고 가장 빈도가 높은 주요 단어 3개 추출"""
-    # 필터링할 무의미한 단어 집합 (Stopwords)
-    stop_words = {
-        '이번엔', '달라', '스토리', '이슈들', '최대', '올해', '때문', '통해', '대해', '위해',
-        '관련', '진행', '이후', '이상', '이하', '기대', '전망', '분석', '기사', '뉴스', '오늘',
-        '등', '및', '위한', '기존', '확인', '중', '것', '이', '가', '에', '의', '를', '은', '는',
-        '로', '으로', '과', '와', '도', '까지', '부터', '에서', '이다', '입니다', '하고',
-        '종목', '주식', '코인', '시장', '투자', '투자자', '거래', '분석', '상승', '하락', 
-        '전망', '분기', '실적', '주가', '가격', '비중', '목표', '추천', '매수', '매도', 
-        '상황', '이유', '속보', '특징주', '전문가', '전략', '포인트',
-        'the', 'and', 'for', 'with', 'from', 'into', 'during', 'including', 'until',
-        'against', 'among', 'throughout', 'despite', 'towards', 'upon', 'concerning',
-        'about', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-        'could', 'would', 'will', 'also', 'their', 'this', 'that', 'its', 'it', 'to',
-        'what', 'which', 'who', 'whom', 'whose', 'when', 'where', 'why', 'how', 'than',
-        'stock', 'stocks', 'market', 'markets', 'share', 'shares', 'price', 'prices', 
-        'investing', 'investor', 'investors', 'trading', 'coin', 'coins', 'crypto', 
-        'cryptocurrency', 'bitcoin', 'ethereum', 'daily', 'report', 'analysis', 
-        'forecast', 'update', 'today', 'says', 'said', 'expected', 'likely', 'potential',
-        'announced', 'latest', 'breaking', 'news', 'brief', 'summary', 'outlook'
-    }
+BUBBLE_MAX_POINTS = 400   # 초과 시 개별 버블 대신 2D 구간 밀도 차트로 전환
+DENSITY_BINS = 40         # 밀도 차트 축별 구간 수
+BAR_TOP_N = 15            # 바 차트: 고점대비 하락폭 상/하위 N개씩만 표시
+GRADE_RANGE = ['darkred', '#ff4b4b', 'green', '#DAA520', "#666769"]  # GRADE_LABELS 역순(높은 등급부터) 색상
+HEATMAP_MAX_NAMES = 60    # 상관 히트맵: 초과 시 비중 상위 N개 종목만 표시 (셀 수 = N^2)
+# 펀더멘털 추이 차트에서 고를 수 있는 Finnhub 분기 시계열 지표 -> 표시 이름
+SERIES_LABELS = {'pe': 'PER', 'eps': 'EPS', 'netMargin': '순이익률', 'operatingMargin': '영업이익률', 'grossMargin': '매출총이익률'}
+
+
+def chart_frame(df, cols):
+    """차트에 인코딩되는 컬럼만 추출 (Vega-Lite 스펙에 전체 결과가 실리지 않도록)"""
+    out = df[list(dict.fromkeys(cols))].copy()
+    for col in out.select_dtypes('category').columns:
+        out[col] = out[col].astype(str)
+    return out
+
+
+def bar_frame(df, n=BAR_TOP_N):
+    """하락폭 상위/하위 N개 종목만 선택 (종목 수가 많아도 막대 개수 고정)"""
+    if len(df) <= 2 * n: return df
+    return pd.concat([df.nsmallest(n, '고점대비 (%)'), df.nlargest(n, '고점대비 (%)')])
+
+
+def density_frame(df, x_col, y_col, bins=DENSITY_BINS):
+    """2D 히스토그램으로 사전 집계: 종목 수와 무관하게 최대 bins x bins개 셀만 전달"""
+    counts, x_edges, y_edges = np.histogram2d(df[x_col].to_numpy(float), df[y_col].to_numpy(float), bins=bins)
+    ix, iy = np.nonzero(counts)
+    return pd.DataFrame({
+        'x0': x_edges[ix], 'x1': x_edges[ix + 1],
+        'y0': y_edges[iy], 'y1': y_edges[iy + 1],
+        '종목 수': counts[ix, iy].astype(int),
+    })
+
+
+def _padded_domain(series):
+    """축 범위에 15% 여백 추가 (값이 하나뿐이면 ±5)"""
+    lo, hi = float(series.min()), float(series.max())
+    margin = (hi - lo) * 0.15 if hi != lo else 5
+    return [lo - margin, hi + margin]
+
+
+def _chart_title(title, n):
+    """대규모 결과일 때 차트 제목에 집계 방식 표기"""
+    return title if n <= BUBBLE_MAX_POINTS else f"{title} - {n}개 종목 밀도 + 상위 등급"
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def bubble_chart_spec(chart_df, x_col, x_title, title, size_title, enable_div):
+    """버블 차트 Vega-Lite 스펙 생성 (데이터 해시 단위 캐시): 대규모 결과는 밀도 차트 + 상위 등급 버블"""
+    import altair as alt
+
+    x_domain, y_domain = _padded_domain(chart_df[x_col]), _padded_domain(chart_df['상승여력 (%)'])
+    grade_color_enc = alt.Color('투자등급', scale=alt.Scale(domain=GRADE_LABELS[::-1], range=GRADE_RANGE), legend=alt.Legend(title="투자 등급"))
+    tooltip = ['기업명', '종목', x_col, '상승여력 (%)', '배당률 (%)', '뉴스감성', '투자등급']
+
+    if len(chart_df) <= BUBBLE_MAX_POINTS:
+        size_encoding = alt.Size('배당률 (%)', scale=alt.Scale(range=[120, 700]), legend=alt.Legend(title=size_title)) if enable_div else alt.value(120)
+        chart = alt.Chart(chart_df).mark_circle(opacity=0.7, stroke='white', strokeWidth=1).encode(
+            x=alt.X(x_col, title=x_title, scale=alt.Scale(domain=x_domain)),
+            y=alt.Y('상승여력 (%)', title='상승여력 (%)', scale=alt.Scale(domain=y_domain)),
+            color=grade_color_enc,
+            size=size_encoding,
+            tooltip=tooltip
+        ).properties(height=500, title=_chart_title(title, len(chart_df))).interactive()
+        return chart.to_dict()
+
+    density = alt.Chart(density_frame(chart_df, x_col, '상승여력 (%)')).mark_rect(opacity=0.8).encode(
+        x=alt.X('x0:Q', title=x_title, scale=alt.Scale(domain=x_domain)), x2='x1:Q',
+        y=alt.Y('y0:Q', title='상승여력 (%)', scale=alt.Scale(domain=y_domain)), y2='y1:Q',
+        color=alt.Color('종목 수:Q', scale=alt.Scale(scheme='greys'), legend=alt.Legend(title="종목 수")),
+        tooltip=['종목 수:Q']
+    )
+    # 상위 등급(초적극 매수 이상) 종목만 개별 버블로 겹쳐 표시
+    top = chart_df[chart_df['투자등급'].isin(GRADE_LABELS[-2:])].head(BUBBLE_MAX_POINTS)
+    highlight = alt.Chart(top).mark_circle(size=120, opacity=0.9, stroke='white', strokeWidth=1).encode(
+        x=alt.X(x_col), y=alt.Y('상승여력 (%)'), color=grade_color_enc, tooltip=tooltip
+    )
+    chart = alt.layer(density, highlight).properties(height=500, title=_chart_title(title, len(chart_df)))
+    return chart.to_dict()
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def drop_bar_spec(chart_df, total):
+    """고점대비 하락폭 바 차트 스펙 (상/하위 N개, 막대 수에 비례한 높이)"""
+    import altair as alt
+
+    title = "종목별 고점 대비 하락폭" if total == len(chart_df) else f"고점 대비 하락폭 상/하위 {BAR_TOP_N}개 (전체 {total}개)"
+    chart = alt.Chart(chart_df).mark_bar().encode(
+        x=alt.X('고점대비 (%)', title='고점 대비 하락률 (%)'),
+        y=alt.Y('기업명', sort='x', title='종목명'),
+        color=alt.Color('고점대비 (%)', scale=alt.Scale(scheme='redblue'), legend=None),
+        tooltip=['기업명', '고점대비 (%)']
+    ).properties(height=max(200, 20 * len(chart_df)), title=title)
+    return chart.to_dict()
 
-    combined_text = " ".join(full_texts).lower()
-    clean_text = re.sub(r'&[a-z]+;', ' ', combined_text)
-    clean_text = re.sub(r'[^\w\s]', ' ', clean_text)
-    words = clean_text.split()
-    
-    filtered_words = []
-    ticker_parts = set(ticker_name.lower().split())
-    
-    for w in words:
-        # 필터링 조건: 3글자 이상, 숫자가 아님, 불용어 아님, 티커명 미포함
-        if len(w) >= 3 and not w.isdigit() and w not in stop_words:
-            if not any(part in w for part in ticker_parts if len(part) >= 2):
-                filtered_words.append(w)
-    
-    counts = Counter(filtered_words)
-    most_common = counts.most_common(3)
-    
-    if market == 'us':
-        return [word.capitalize() for word, count in most_common]
-    return [word for word, count in most_common]
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def series_line_spec(series_df, label, title):
+    """저장된 분기 시계열 한 지표의 꺾은선 차트 스펙"""
+    import altair as alt
+
+    chart = alt.Chart(series_df).mark_line(point=True).encode(
+        x=alt.X('기간:T', title='분기'),
+        y=alt.Y('값:Q', title=label),
+        tooltip=['기간', alt.Tooltip('값:Q', format=',.3f')]
+    ).properties(height=300, title=title)
+    return chart.to_dict()
+
+
+def heatmap_frame(corr, weights=None, limit=HEATMAP_MAX_NAMES):
+    """상관 행렬 -> 히트맵용 긴 형식 + 축 순서 (종목이 많으면 비중 상위 limit개만, 군집 순서 유지)"""
+    names = list(corr.index)
+    if len(names) > limit:
+        top = set(weights.nlargest(limit).index) if weights is not None else set(names[:limit])
+        names = [n for n in names if n in top]
+    sub = corr.loc[names, names].rename_axis('종목 1').reset_index()
+    return sub.melt(id_vars='종목 1', var_name='종목 2', value_name='상관계수'), names
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def corr_heatmap_spec(heat_df, order, title):
+    """상관계수 히트맵 스펙 (축은 계층 군집 순서: 함께 움직이는 종목이 블록으로 모임)"""
+    import altair as alt
+
+    chart = alt.Chart(heat_df).mark_rect().encode(
+        x=alt.X('종목 2:N', sort=order, title=None),
+        y=alt.Y('종목 1:N', sort=order, title=None),
+        color=alt.Color('상관계수:Q', scale=alt.Scale(scheme='redblue', domain=[-1, 1], reverse=True)),
+        tooltip=['종목 1', '종목 2', alt.Tooltip('상관계수:Q', format='.2f')]
+    ).properties(height=max(300, 14 * len(order)), title=title)
+    return chart.to_dict()
+
+
+@st.cache_data(ttl=600, max_entries=4, show_spinner=False)
+def risk_report(names, weights):
+    """위험 요약 (일봉 저장소를 읽으므로 재실행마다 다시 계산하지 않음, 저장된 행렬에는 새 일봉만 반영)"""
+    return analyze_risk(list(names), None if weights is None else list(weights))
 
 # ==============================================================================
 # [5] 메인 사용자 인터페이스 (UI) 및 분석 컨트롤러
@@ -201,8 +261,8 @@ st.set_page_config(page_title="주식 투자 판단 대시보드 v13.1", layout=
 st.title("📊 주식 투자 판단 대시보드 (v13.1)")
 
 # 사이드바: 시장 선택 및 필터 파라미터 설정
-market_choice = st.radio("📌 대상 선택", ["한국주식", "미국주식", "암호화폐"], horizontal=True)
-st.session_state.market = 'kr' if market_choice == "한국주식" else 'us' if market_choice == "미국주식" else 'crypto'
+market_choice = st.radio("📌 대상 선택", ["한국주식", "미국주식", "암호화폐", "전체"], horizontal=True)
+st.session_state.market = {"한국주식": 'kr', "미국주식": 'us', "암호화폐": 'crypto', "전체": 'all'}[market_choice]
 
 if st.session_state.market == 'crypto' and st.session_state.tickers_input.startswith("005930"):
     st.session_state.tickers_input = "BTC, ETH, SOL, XRP, DOGE, ADA"
@@ -212,134 +272,270 @@ max_per = st.sidebar.slider("PER 최대값", 0, 50, st.session_state.max_per)
 min_up = st.sidebar.slider("최소 상승여력 (%)", 0, 100, st.session_state.min_up)
 min_drop = st.sidebar.slider("최소 하락률 (%)", 0, 100, st.session_state.min_drop)
 min_div = st.sidebar.slider("최소 배당률 (%)", 0.0, 10.0, st.session_state.min_div)
+max_rsi = st.sidebar.slider("RSI 과매도 기준", 0, 50, st.session_state.max_rsi, help="RSI(14)가 이 값 이하이면 가점 (0: 사용 안 함)")
+margin_trend = st.sidebar.checkbox("순이익률 개선 가점 (미국)", value=st.session_state.margin_trend,
+                                   help="최근 분기 순이익률 추세가 개선 중이면 가점 (펀더멘털 이력이 있는 미국 주식만)")
 enable_div = st.sidebar.checkbox("배당률로 크기 표현", value=True)
 
-# 설정 저장 및 불러오기 버튼 로직
-if st.sidebar.button("💾 포트폴리오 저장"):
-    data = {"tickers": st.session_state.tickers_input, "max_per": max_per, "min_up": min_up, "min_drop": min_drop, "min_div": min_div}
-    with open(get_save_file(), "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+with st.sidebar.expander("⚙️ 고급 설정"):
+    workers = st.number_input("수집 스레드 수", 1, 32, 4, help="종목별 시세/뉴스 수집을 병렬로 수행할 스레드 수")
+    processes = st.number_input("계산 프로세스 수", 0, os.cpu_count() or 1, 0,
+                                help="페이지 파싱/감성 점수/키워드 계산을 나눠 맡을 프로세스 수 (0: 사용 안 함, 수백 종목 이상일 때 권장)")
+    use_async = st.checkbox("비동기 수집 (aiohttp)", value=False, help="하나의 이벤트 루프로 모든 요청을 동시에 보내고, 호출별 실패(timeout/rate_limited 등)를 표시 "
+                            "(컬럼 선택/공유 캐시/미국 시세 제공자 전환은 동기 수집과 동일)")
+    optional_cols = [c for c in RESULT_SCHEMA if c not in ('시장', '종목', '기업명')]
+    shown_cols = st.multiselect("표시할 컬럼", optional_cols, default=optional_cols,
+                                help="선택한 컬럼과 투자등급 산정에 필요한 값만 수집 (예: 뉴스 컬럼을 빼고 투자등급도 보지 않으면 뉴스 검색 생략)")
+    columns = None if len(shown_cols) == len(optional_cols) else ['투자등급', *shown_cols]
+    cache_stats = shared_cache().stats
+    st.caption(f"공유 캐시({CACHE_BACKEND}): 적중 {cache_stats['hit']} / 수집 {cache_stats['miss']} / 합류 {cache_stats['coalesced']}")
+    st.caption("미국 시세 제공자: " + " > ".join(
+        f"{name}({state}, 성공 {success:.0%}" + (f", p95 {p95:.1f}초)" if p95 is not None else ")")
+        for name, state, success, p95, _ in us_chain().status()))
+
+with st.sidebar.expander("💼 보유 종목"):
+    sheet_file = st.file_uploader("stock_valuation.xlsx 가져오기", type=["xlsx"])
+    if sheet_file is not None and st.button("📥 보유 종목으로 저장"):
+        try:
+            with st.spinner("시트 읽는 중... (한국 종목명 -> 코드 변환)"):
+                positions, unresolved = import_sheet(sheet_file)
+            save_holdings(positions)
+            st.success(f"✅ {len(positions)}개 포지션 저장 ({HOLDINGS_PATH})")
+            if unresolved: st.warning(f"종목코드를 찾지 못한 종목: {', '.join(unresolved)}")
+        except Exception as e:
+            st.error(f"가져오기 실패: {e}")
+
+if st.session_state.market != 'all':
+    with st.sidebar.expander("📋 관심 목록"):
+        list_file = st.file_uploader("CSV/xlsx 종목 목록 가져오기", type=["csv", "xlsx"],
+                                     help="종목/종목코드/티커/기업 컬럼을 찾아 읽음 (분석 결과 파일, stock_valuation.xlsx 포함)")
+        if list_file is not None:
+            list_name = st.text_input("목록 이름", os.path.splitext(list_file.name)[0])
+            if st.button("📥 관심 목록으로 저장"):
+                progress = st.empty()
+                try:
+                    report = import_watchlist(list_file, list_file.name, st.session_state.market, list_name,
+                                              on_progress=lambda rows: progress.caption(f"{rows:,}행 읽는 중..."))
+                except Exception as e:
+                    st.error(f"가져오기 실패: {e}")
+                else:
+                    progress.empty()
+                    if not report.validated: st.warning("종목 목록을 불러오지 못해 검증 없이 저장했습니다.")
+                    if report.unknown: st.warning(f"종목 목록에 없는 값 {len(report.unknown)}개 제외: {', '.join(report.unknown[:20])}")
+                    if report.tickers:
+                        st.success(f"✅ {len(report.tickers):,}개 종목 저장 (중복 {report.duplicates}, 다른 시장 {report.skipped})")
+                        st.session_state.watchlists[st.session_state.market] = list_name
+                    else:
+                        st.error("저장할 종목이 없습니다.")
+        saved_lists = dict(list_watchlists(st.session_state.market))
+        options = [None, *saved_lists]
+        current = st.session_state.watchlists.get(st.session_state.market)
+        st.session_state.watchlists[st.session_state.market] = st.selectbox(
+            "분석할 종목", options, index=options.index(current) if current in options else 0,
+            format_func=lambda n: "직접 입력" if n is None else f"{n} ({saved_lists[n]:,}개)")
+
+with st.sidebar.expander("🔔 알림"):
+    enable_alerts = st.checkbox("갱신 시 기준 돌파 알림", value=True,
+                                help="투자등급 상향, 고점대비 하락률/상승여력 기준 도달, RSI 과매도 진입을 한 번씩 알림 (기준선 근처 반복 알림 없음)")
+    webhook_url = st.text_input("웹훅 URL (선택)", help='알림을 {"alerts": [...]} JSON으로 POST')
+    user_rules = load_rules()
+    st.caption(f"기록: {ALERT_LOG}" + (f" | 사용자 규칙 {len(user_rules)}개 ({ALERTS_PATH})" if user_rules else ""))
+    for alert in list(st.session_state.alert_sink.recent)[-5:][::-1]:
+        st.caption(f"{alert['시각'][11:16]} {alert_message(alert)}")
+
+# 설정 저장 및 불러오기 버튼 로직 (전체 모드는 시장별 파일을 그대로 사용)
+if st.session_state.market == 'all':
+    st.sidebar.info("전체 모드는 시장별 포트폴리오 파일의 종목과 기준값으로 등급을 산정합니다.")
+elif st.sidebar.button("💾 포트폴리오 저장"):
+    data = {"tickers": st.session_state.tickers_input, "max_per": max_per, "min_up": min_up, "min_drop": min_drop, "min_div": min_div, "max_rsi": max_rsi, "margin_trend": margin_trend}
+    if st.session_state.watchlists.get(st.session_state.market):
+        data["watchlist"] = st.session_state.watchlists[st.session_state.market]
+    save_portfolio(st.session_state.market, data)
     st.sidebar.success("✅ 저장 완료")
 
-if st.sidebar.button("📂 포트폴리오 불러오기"):
-    if os.path.exists(get_save_file()):
-        with open(get_save_file(), "r", encoding="utf-8") as f:
-            p = json.load(f)
-            st.session_state.tickers_input = p["tickers"]
-            st.session_state.max_per, st.session_state.min_up = p["max_per"], p["min_up"]
-            st.session_state.min_drop, st.session_state.min_div = p["min_drop"], p["min_div"]
-            st.rerun()
+if st.session_state.market != 'all' and st.sidebar.button("📂 포트폴리오 불러오기"):
+    p = load_portfolio(st.session_state.market)
+    if p:
+        st.session_state.watchlists[st.session_state.market] = p.get("watchlist")
+        if not p.get("watchlist"): st.session_state.tickers_input = p["tickers"]
+        st.session_state.max_per, st.session_state.min_up = p["max_per"], p["min_up"]
+        st.session_state.min_drop, st.session_state.min_div = p["min_drop"], p["min_div"]
+        st.session_state.max_rsi, st.session_state.margin_trend = p.get("max_rsi", 0), p.get("margin_trend", False)
+        st.rerun()
+
+if st.session_state.market == 'all':
+    portfolios = {m: load_portfolio(m) for m in MARKETS}
+    portfolios = {m: p for m, p in portfolios.items() if p}
+    if portfolios:
+        st.caption("📂 " + " | ".join(f"{get_save_file(m)}: {len(parse_tickers(p['tickers']))}개" for m, p in portfolios.items()))
+    else:
+        st.warning("저장된 시장별 포트폴리오 파일이 없습니다. 시장을 골라 종목을 입력한 뒤 💾 포트폴리오 저장을 먼저 해 주세요.")
+    # 종목 목록에 없는 코드는 네트워크 조회 없이 분석에서 제외
+    for m, p in portfolios.items():
+        valid, unknown = validate_tickers(m, parse_tickers(p["tickers"]))
+        if unknown:
+            st.warning(f"❓ {get_save_file(m)}: 종목 목록에 없는 코드 제외 - {', '.join(unknown)}")
+            portfolios[m] = {**p, "tickers": ", ".join(valid)}
+    tickers = [t for p in portfolios.values() for t in parse_tickers(p["tickers"])]
+elif st.session_state.watchlists.get(st.session_state.market):
+    # 관심 목록: 가져올 때 검증/중복 제거를 마친 종목을 저장소에서 읽음 (입력창에 수천 개를 펼치지 않음)
+    watchlist = st.session_state.watchlists[st.session_state.market]
+    tickers = load_watchlist(watchlist, st.session_state.market)
+    st.caption(f"📋 관심 목록 '{watchlist}': {len(tickers):,}개 종목 - {', '.join(tickers[:10])}{' ...' if len(tickers) > 10 else ''}")
+else:
+    search_col, pick_col = st.columns([1, 2])
+    query = search_col.text_input("🔎 종목 검색", placeholder="코드 / 종목명 / 영문명")
+    index = symbol_index(st.session_state.market) if query else None
+    if query and index is None:
+        pick_col.caption("종목 목록을 불러오지 못해 검색할 수 없습니다.")
+    elif query:
+        matches = index.search(query)
+        if matches:
+            picked = pick_col.selectbox("검색 결과", matches, format_func=lambda m: f"{m[0]} — {m[1]}")
+            if pick_col.button("➕ 종목 추가") and picked[0] not in parse_tickers(st.session_state.tickers_input):
+                st.session_state.tickers_input = ", ".join([*parse_tickers(st.session_state.tickers_input), picked[0]])
+                st.rerun()
+        else:
+            pick_col.caption("일치하는 종목이 없습니다.")
 
-tickers_input = st.text_input("✅ 종목 코드를 입력하세요", st.session_state.tickers_input)
-st.session_state.tickers_input = tickers_input
-tickers = [t.strip().upper() for t in tickers_input.split(",") if t.strip()]
+    tickers_input = st.text_input("✅ 종목 코드를 입력하세요", st.session_state.tickers_input)
+    st.session_state.tickers_input = tickers_input
+    # 종목 목록에 없는 코드는 네트워크 조회 없이 분석에서 제외
+    tickers, unknown = validate_tickers(st.session_state.market, parse_tickers(tickers_input))
+    if unknown: st.warning(f"❓ 종목 목록에 없는 코드 제외: {', '.join(unknown)}")
 
 # ==============================================================================
-# [6] 데이터 분석 엔진 (본체)
+# [6] 데이터 분석 실행 (엔진: dashboard.engine, 결과 캐시: dashboard.results)
 # ==============================================================================
+# 시장별 분석 대상: (종목 목록, 필터 기준, 선택 가점 기준 (max_rsi, margin_trend))
+if st.session_state.market == 'all':
+    targets = {m: (parse_tickers(p["tickers"]), thresholds_of(p), thresholds_of(p, bonus=True)[4:]) for m, p in portfolios.items()}
+else:
+    targets = {st.session_state.market: (tickers, (max_per, min_up, min_drop, min_div), (max_rsi, margin_trend))}
+
+def progress_reporter(placeholder):
+    """종목 수집이 끝날 때마다 진행 상황 표시 (analyze_market의 on_progress 콜백)"""
+    count = [0]
+    def report(ticker):
+        count[0] += 1
+        placeholder.text(f"{ticker} 수집 완료 ({count[0]}개째)")
+    return report
+
+def grading_key():
+    """현재 등급/표 스타일 기준값 서명 (시장별 필터 기준 + 선택 가점 기준)"""
+    return tuple((m, thresholds, bonus) for m, (_, thresholds, bonus) in targets.items())
+
+def publish():
+    """시장별 원본 결과에 현재 기준으로 등급/표 스타일을 입혀 화면용 결과로 반영"""
+    graded = [(st.session_state.raw_frames[m], m, thresholds, bonus) for m, (_, thresholds, bonus) in targets.items()
+              if m in st.session_state.raw_frames and not st.session_state.raw_frames[m].empty]
+    if not graded: return
+    st.session_state.graded_key = grading_key()
+    # 등급과 표 스타일은 dtype 축소 전 float64 원본으로 시장별 기준값을 적용해 계산
+    frames = [grade_frame(market_df.copy(), market, *thresholds, *bonus) for market_df, market, thresholds, bonus in graded]
+    styles = [build_table_styles(frame, *thresholds) for frame, (_, _, thresholds, _) in zip(frames, graded)]
+    st.session_state.table_styles = pd.concat(styles, ignore_index=True).astype('category')
+    st.session_state.df = compact_frame(pd.concat(frames, ignore_index=True))
+    st.session_state.export_file = None
+    check_alerts()
+
+def check_alerts():
+    """화면 결과가 바뀔 때마다 알림 규칙 평가 -> 파일/웹훅/토스트로 전달"""
+    if not enable_alerts: return
+    # 기본 규칙은 시장별 필터 기준에서 생성 (thresholds = max_per, min_up, min_drop, min_div)
+    rules = [r for m, (_, thresholds, bonus) in targets.items() for r in default_rules(m, thresholds[2], thresholds[1], bonus[0])]
+    rules += user_rules
+    key = (tuple(r.key() for r in rules), grading_key())
+    if st.session_state.alert_engine[0] != key:
+        st.session_state.alert_engine = (key, AlertEngine(rules))
+    alerts = st.session_state.alert_engine[1].evaluate(st.session_state.df)
+    sinks = [FileSink(), st.session_state.alert_sink] + ([WebhookSink(webhook_url)] if webhook_url else [])
+    for message in dispatch(alerts, sinks): st.warning(message)
+    pending = st.session_state.alert_sink.drain()
+    for alert in pending[:ALERT_TOASTS]: st.toast(alert_message(alert), icon="🔔")
+    if len(pending) > ALERT_TOASTS: st.toast(f"외 {len(pending) - ALERT_TOASTS}건 ({ALERT_LOG})", icon="🔔")
+
+def start_refresh(market):
+    """저장된 결과를 보여주는 동안 백그라운드에서 다시 분석"""
+    st.session_state.refreshers[market] = BackgroundRefresh(market, targets[market][0], workers=workers, use_async=use_async, columns=columns)
+    st.session_state.seen_versions[market] = 0
+
+# 포트폴리오가 바뀌면(앱 첫 진입 포함) 저장된 결과를 즉시 표시하고, 신선도 예산을 넘긴 시장은 백그라운드 갱신
+# 같은 목록의 결과가 없으면(종목 추가/삭제) 행 저장소에서 남은 종목의 행을 보여주고 추가된 종목만 백그라운드 분석
+swr_key = tuple((m, tuple(t)) for m, (t, _, _) in targets.items())
+if st.session_state.swr_key != swr_key:
+    st.session_state.swr_key = swr_key
+    st.session_state.raw_frames, st.session_state.saved_at = {}, {}
+    st.session_state.refreshers, st.session_state.seen_versions = {}, {}
+    for market, (market_tickers, _, _) in targets.items():
+        cached, saved_at = load_result(market, market_tickers)
+        missing = []
+        if cached is None:
+            cached, saved_at, missing = reusable_rows(market, market_tickers, columns)
+            if cached is None: continue
+        st.session_state.raw_frames[market], st.session_state.saved_at[market] = cached, saved_at
+        if missing or is_stale(market, saved_at): start_refresh(market)
+    if st.session_state.raw_frames: publish()
+
 if st.button("📊 분석 시작"):
-    data = []
-    latest_day = get_safe_trading_day()
-    one_year_ago = (datetime.strptime(latest_day, "%Y%m%d") - timedelta(days=365)).strftime("%Y%m%d")
-    
-    for ticker in tickers:
-        with st.spinner(f'{ticker} 분석 중...'):
-            try:
-                per, pbr, div, change_24h, sec_per = 0, 0, 0, 0, 0
-                under_val = "N/A"
-                name = ""
-
-                # [시장별 데이터 분기 처리]
-                if st.session_state.market == 'crypto':
-                    c_data = get_crypto_data(ticker)
-                    if not c_data: continue
-                    name, price = ticker, c_data['현재가']
-                    high, low = c_data['52주 고점'], c_data['52주 저점']
-                    change_24h = c_data['24시간 변동률 (%)']
-                    query = ticker
-                    # 코인은 업종PER이 없으므로 기본값(0, N/A) 유지
-
-                elif st.session_state.market == 'us':
-                    params = {'token': FINNHUB_API_KEY, 'symbol': ticker}
-                    q = requests.get("https://finnhub.io/api/v1/quote", params=params).json()
-                    p = requests.get("https://finnhub.io/api/v1/stock/profile2", params=params).json()
-                    f = requests.get("https://finnhub.io/api/v1/stock/metric", params={**params, 'metric': 'all'}).json()
-                    
-                    if 'c' not in q or q['c'] == 0: continue
-                    name, price = p.get('name', ticker), q['c']
-                    high = f['metric'].get('52WeekHigh', price) or price
-                    low = f['metric'].get('52WeekLow', price) or price
-                    per = f['metric'].get('peBasicExclExtraTTM', 0) or 0
-                    pbr = f['metric'].get('pbAnnual', 0) or 0
-                    div = f['metric'].get('dividendYieldIndicatedAnnual', 0) or 0
-                    query = ticker
-                    # 미국 주식도 현재 로직상 업종PER은 0으로 처리 (필요시 추가 구현 가능)
-                    
-                else: # 한국 주식
-                    name = stock.get_market_ticker_name(ticker)
-                    if not name: continue
-                    df_p = stock.get_market_ohlcv_by_date(latest_day, latest_day, ticker)
-                    price = int(df_p['종가'].iloc[0])
-                    hist = stock.get_market_ohlcv_by_date(one_year_ago, latest_day, ticker)
-                    high, low = hist['고가'].max(), hist['저가'].min()
-                    
-                    # 한국 주식만 업종PER 데이터 업데이트
-                    per, pbr, div, sec_per = get_kr_indicators(ticker)
-                    query = name
-                    
-                    # 저평가 여부 로직 (한국 주식 전용)
-                    if per > 0 and sec_per > 0:
-                        under_val = "저평가" if per < sec_per else "고평가"
-                    elif per > 0 and sec_per == 0:
-                        under_val = "업종적자"
-
-                # 뉴스 및 핵심 키워드 수집
-                display_titles, analysis_texts, sentiment_label, s_score = get_stock_news(query, st.session_state.market)
-                keywords = extract_keywords(analysis_texts, name, st.session_state.market)
-
-                # 데이터 취합 (계산 필드 포함)
-                data.append({
-                    '종목': ticker, 
-                    '기업명': name, 
-                    '현재가': price, 
-                    '52주 고점': float(high),
-                    'PER': round(float(per), 2), 
-                    '업종PER': round(float(sec_per), 2),
-                    '저평가여부(PER)': under_val,
-                    'PBR': round(float(pbr), 2), 
-                    '배당률 (%)': round(float(div), 2),
-                    '24시간 변동률 (%)': round(float(change_24h), 2),
-                    '고점대비 (%)': round(((price / high) - 1) * 100, 2) if high != 0 else 0, 
-                    '상승여력 (%)': round(((high - price) / (high - low) * 100) if high != low else 0, 2),
-                    '뉴스감성': sentiment_label, 
-                    '감성점수': s_score, 
-                    '최근뉴스': display_titles[0] if display_titles else "최근 뉴스 없음",
-                    '핵심키워드': ", ".join(keywords) if keywords else "데이터 없음"
-                })
-            except Exception as e: st.error(f"{ticker} 실패: {e}")
-            
-    if data:
-        df = pd.DataFrame(data)
-        
-        def classify(row):
-            score = 0
-            if row['고점대비 (%)'] <= -min_drop: score += 1
-            if row['상승여력 (%)'] >= min_up: score += 1
-            if row['감성점수'] > 0: score += 0.5
-            
-            if st.session_state.market != 'crypto':
-                # 보강된 로직: PER이 0보다 크고 업종 평균보다 낮으면 가점
-                if 0 < row['PER'] <= row['업종PER']: 
-                    score += 1
-                elif 0 < row['PER'] <= max_per: # 업종데이터가 없더라도 설정한 기준보다 낮으면 가점
-                    score += 0.5
-                if row['배당률 (%)'] >= min_div: score += 1
-            
-            mapping = {4:'🔥🔥🔥🔥 초초적극 매수', 3:'🔥🔥🔥 초적극 매수', 2:'🔥🔥 적극 매수', 1:'🔥 매수', 0:'👀 관망'}
-            return mapping.get(int(score), '👀 관망')
-
-        df['투자등급'] = df.apply(classify, axis=1)
-        st.session_state.df = df
+    st.session_state.refreshers = {}  # 직접 분석이 진행 중인 백그라운드 갱신을 대체
+    errors, oldest = [], None
+    if st.session_state.market == 'all':
+        # 전체 모드: 시장별 포트폴리오 파일의 종목과 기준값으로 3개 시장을 동시에 분석
+        with st.spinner("전체 시장 동시 분석 중..."):
+            results = analyze_all_markets(portfolios, workers, processes, use_async, columns)
+        for market, (market_df, _) in results.items(): save_rows(market, market_df, columns)
+    else:
+        status = st.empty()
+        with st.spinner("분석 중..."), score_pool(processes) as pool:
+            # 신선도 예산 안에 분석한 종목은 행 저장소에서 재사용하고 추가/만료된 종목만 수집
+            market_df, market_errors, fetched, oldest = analyze_incremental(
+                tickers, st.session_state.market, on_progress=progress_reporter(status),
+                workers=workers, score_pool=pool, use_async=use_async, columns=columns)
+            results = {st.session_state.market: (market_df, market_errors)}
+        status.empty()
+        if len(fetched) < len(tickers): st.caption(f"🔁 {len(fetched)}개 종목 새로 수집 ({len(tickers) - len(fetched)}개 재사용)")
+
+    for market, (market_df, market_errors) in results.items():
+        errors += market_errors
+        if not market_df.empty:
+            st.session_state.raw_frames[market] = market_df
+            st.session_state.saved_at[market] = save_result(market, targets[market][0], market_df, oldest)
+    for message in errors: st.error(message)
+    publish()
+
+# 백그라운드 갱신 반영: 새로 도착한 행은 이전 결과에 덮어쓰고, 완료되면 최종 결과(지표 포함)로 교체
+changed = False
+for market, refresher in list(st.session_state.refreshers.items()):
+    version, rows, result, errors = refresher.poll()
+    if version == st.session_state.seen_versions.get(market): continue
+    st.session_state.seen_versions[market] = version
+    if refresher.done:
+        for message in errors: st.warning(message)
+        if result is not None and not result.empty:
+            st.session_state.raw_frames[market], st.session_state.saved_at[market] = result, refresher.saved_at
+        del st.session_state.refreshers[market]
+    elif rows:
+        st.session_state.raw_frames[market] = merge_rows(st.session_state.raw_frames.get(market), rows, refresher.tickers)
+    changed = True
+if changed: publish()
+# 슬라이더로 기준값만 바꾼 경우: 재수집 없이 저장된 원본으로 등급/표 스타일을 다시 계산
+elif st.session_state.raw_frames and st.session_state.graded_key != grading_key(): publish()
+
+@st.fragment(run_every=1.0)
+def watch_refresh():
+    """갱신 진행 상황 표시, 새 행이 도착하면 전체 화면을 다시 그림"""
+    refreshers = st.session_state.refreshers
+    if any(r.poll()[0] != st.session_state.seen_versions.get(m) for m, r in refreshers.items()):
+        st.rerun(scope="app")
+    progress = ", ".join(f"{m} {len(r.poll()[1])}/{len(r.tickers)}" for m, r in refreshers.items())
+    st.caption(f"🔄 백그라운드 갱신 중... ({progress})")
+
+if st.session_state.raw_frames and st.session_state.saved_at:
+    ages = " | ".join(f"{m}: {age_label(t)}" for m, t in st.session_state.saved_at.items())
+    st.caption(f"🕒 결과 기준 시각 — {ages}")
+if st.session_state.refreshers:
+    watch_refresh()
 
 # ==============================================================================
 # [7] 시각화 및 결과 리포트
@@ -354,58 +550,61 @@ if df is not None:
     cols.insert(target_idx, '투자등급')
     cols.insert(target_idx + 1, '뉴스감성')
     
-    display_cols = [c for c in cols if c not in ['감성점수', '최근뉴스']]
+    hidden_cols = ['감성점수', '최근뉴스'] + (['시장'] if df['시장'].nunique() <= 1 else [])
+    display_cols = [c for c in cols if c not in hidden_cols and (c in ('시장', '종목', '기업명', '투자등급') or c in shown_cols)]
     display_df = df[display_cols]
 
-    # 2. 스타일 함수 (기존과 동일)
-    def get_color_code(val):
-        if '🔥🔥🔥🔥' in val: return 'darkred', 'white'
-        if '🔥🔥🔥' in val: return '#ff4b4b', 'white'
-        if '🔥🔥' in val: return 'green', 'white'
-        if '🔥' in val: return '#DAA520', 'black'
-        return '#f0f2f6', 'black'
-
-    def get_sentiment_color(val):
-        if '긍정' in val: return 'background-color: #e6f4ea; color: #137333'
-        if '부정' in val: return 'background-color: #fce8e6; color: #c5221f'
-        return 'background-color: #f1f3f4; color: #3c4043'
-
-    def get_undervalued_style(val):
-        if val == "저평가": return 'color: blue; font-weight: bold'
-        if val == "고평가": return 'color: red'
-        if val == "업종적자": return 'color: orange'
-        return 'color: gray'
-
     st.subheader("📋 종합 투자 분석 표")
-    is_kr = st.session_state.market == 'kr'
-
-    # 3. 스타일 통합 적용 (set_properties로 오른쪽 정렬 추가)
-    styled_df = display_df.style.format({
-        'PER': lambda x: "N/A" if x <= 0 else f"{x:.2f}",
-        '업종PER': lambda x: "N/A" if x <= 0 else f"{x:.2f}",
-        'PBR': lambda x: "N/A" if x <= 0 else f"{x:.2f}",
-        '배당률 (%)': lambda x: "N/A" if x <= 0 else f"{x:.2f}",
-        '24시간 변동률 (%)': "{:.2f}",
-        '고점대비 (%)': "{:.2f}",
-        '상승여력 (%)': "{:.2f}",
-        '52주 고점': "{:,.0f}" if is_kr else "{:,.2f}",
-        '현재가': "{:,.0f}" if is_kr else "{:,.2f}"
-    }).set_properties(subset=['저평가여부(PER)'], **{'text-align': 'right'})\
-      .apply(lambda x: [f"background-color: {get_color_code(v)[0]}; color: {get_color_code(v)[1]}" for v in x], subset=['투자등급'])\
-      .applymap(get_sentiment_color, subset=['뉴스감성'])\
-      .apply(lambda s: [get_undervalued_style(v) for v in s], subset=['저평가여부(PER)'])\
-      .apply(lambda s: ['background-color: #d1f7d6' if 0 < v <= max_per else '' for v in s], subset=['PER'])\
-      .apply(lambda s: ['background-color: #d1e0f7' if v <= -min_drop else '' for v in s], subset=['고점대비 (%)'])\
-      .apply(lambda s: ['background-color: #fff0b3' if v >= min_up else '' for v in s], subset=['상승여력 (%)'])\
-      .apply(lambda s: ['background-color: #fde2e2' if v >= min_div else '' for v in s], subset=['배당률 (%)'])
-
-    # 4. 화면 출력 (config에서 alignment 제거)
-    st.dataframe(styled_df, use_container_width=True)
-
-    # 종목별 상세 요약 카드 출력
+    st.caption(f"💾 결과 메모리 사용량: {format_memory_usage(df)} ({len(df)}개 종목)")
+
+    # 2. 페이지 단위 출력: 현재 페이지 행만 스타일/포맷을 입혀 렌더링 비용을 표 크기와 무관하게 유지
+    n_pages = max(1, -(-len(display_df) // TABLE_PAGE_SIZE))
+    page = st.number_input(f"페이지 (총 {n_pages})", 1, n_pages, 1) if n_pages > 1 else 1
+    page_df = display_df.iloc[(page - 1) * TABLE_PAGE_SIZE: page * TABLE_PAGE_SIZE].copy()
+    page_styles = st.session_state.table_styles.loc[page_df.index, display_cols].astype(object)
+
+    # 0 이하 값은 결측으로 바꿔 na_rep("N/A")로 표시
+    na_cols = [c for c in NA_IF_NONPOSITIVE if c in page_df]
+    page_df[na_cols] = page_df[na_cols].where(page_df[na_cols] > 0)
+    # 가격은 행의 시장 통화 단위로 표시 (전체 모드에서 원화 종목에 달러식 소수점이 붙지 않도록)
+    price_cols = [c for c in PRICE_COLUMNS if c in page_df]
+    styled_df = page_df.style.apply(lambda _: page_styles, axis=None)\
+        .format(precision=2, na_rep="N/A")
+    page_markets = df.loc[page_df.index, '시장'].astype(str)
+    for market in page_markets.unique():
+        rows = page_markets.index[page_markets == market]
+        styled_df = styled_df.format(PRICE_FORMATS.get(market, "{:,.2f}"), subset=pd.IndexSlice[rows, price_cols], na_rep="N/A")
+
+    # 3. 화면 출력
+    st.dataframe(styled_df, use_container_width=True, column_config={
+        '종목': st.column_config.Column(width='small'),
+        '투자등급': st.column_config.Column(width='medium'),
+        '고점대비 (%)': st.column_config.Column(help="52주 고점 대비 현재가 등락률"),
+        '상승여력 (%)': st.column_config.Column(help="52주 고점-저점 범위에서 고점까지 남은 비율"),
+        '업종PER': st.column_config.Column(help="같은 업종 종목들의 PER 중앙값 (흑자 종목 기준, 표본이 부족한 업종은 N/A)"),
+        '업종PBR': st.column_config.Column(help="같은 업종 종목들의 PBR 중앙값"),
+        '업종배당률 (%)': st.column_config.Column(help="같은 업종 종목들의 배당률 중앙값 (무배당 포함)"),
+        'MA20 이격도 (%)': st.column_config.Column(help="20일 이동평균 대비 현재가 위치"),
+        'MA60 이격도 (%)': st.column_config.Column(help="60일 이동평균 대비 현재가 위치"),
+        'RSI(14)': st.column_config.Column(help="14일 상대강도지수 (30 이하 과매도, 70 이상 과매수)"),
+        '변동성 (%)': st.column_config.Column(help="최근 20일 일간 수익률의 연율화 표준편차"),
+        '거래량 Z': st.column_config.Column(help="직전 20일 평균 대비 최근 거래량의 표준점수"),
+        'PER 추세': st.column_config.Column(help="최근 4개 분기 PER의 분기당 변화 (음수: 이익 대비 주가 부담 감소, 미국 주식)"),
+        '순이익률 추세 (%p)': st.column_config.Column(help="최근 4개 분기 순이익률의 분기당 변화 (순이익률 개선 가점을 켜면 양수일 때 투자등급 가점, 미국 주식)"),
+        '핵심키워드': st.column_config.Column(width='large'),
+    })
+    if (df['시장'] == 'us').any():
+        observed, sectors = us_coverage()
+        st.caption(f"미국 업종 지표는 전 종목이 아니라 지금까지 분석한 미국 종목 {observed}개로 계산한 중앙값입니다. "
+                   f"업종별로 {SECTOR_MIN_COUNT}개 이상 모인 {sectors}개 업종만 값이 있고 나머지는 N/A로 표시됩니다.")
+
+    # 종목별 상세 요약 카드 출력 (상위 등급 종목만)
     st.subheader("🧠 AI 투자 요약")
-    for _, row in df.sort_values(by='투자등급', ascending=False).iterrows():
-        bg, txt = get_color_code(row['투자등급'])
+    top_df = df.sort_values(by='투자등급', ascending=False).head(SUMMARY_CARD_LIMIT)
+    if len(df) > SUMMARY_CARD_LIMIT:
+        st.caption(f"상위 {SUMMARY_CARD_LIMIT}개 종목만 표시합니다. (전체 {len(df)}개)")
+    for _, row in top_df.iterrows():
+        bg, txt = grade_color(row['투자등급'])
         st.markdown(f"""
         <div style="background-color: {bg}; color: {txt}; padding: 15px; border-radius: 10px; margin-bottom: 12px; border: 1px solid #ddd;">
             📌 <b>{row['기업명']}</b> ({row['종목']}) | {row['뉴스감성']}<br>
@@ -418,43 +617,122 @@ if df is not None:
     # Altair 버블 차트 생성
     st.subheader("📈 투자 지표 대시보드")
     
-    if st.session_state.market == 'crypto':
+    is_crypto = bool((df['시장'] == 'crypto').all())
+    if is_crypto:
         x_title, chart_main_title = '24시간 변동률 (%)', "암호화폐 변동성 대비 상승여력 분석"
         bubble_size_title = "고정 크기" if not enable_div else "배당률(0%)"
     else:
         x_title, chart_main_title = 'PER (주가수익비율)', "PER 대비 상승여력 분석 (버블 크기: 배당률)"
         bubble_size_title = "배당률 크기"
 
-    x_col = '24시간 변동률 (%)' if st.session_state.market == 'crypto' else 'PER'
-    per_min, per_max = df[x_col].min(), df[x_col].max()
-    up_min, up_max = df['상승여력 (%)'].min(), df['상승여력 (%)'].max()
-    per_margin = (per_max - per_min) * 0.15 if per_max != per_min else 5
-    up_margin = (up_max - up_min) * 0.15 if up_max != up_min else 5
-
-    size_encoding = alt.Size('배당률 (%)', scale=alt.Scale(range=[120, 700]), legend=alt.Legend(title=bubble_size_title)) if enable_div else alt.value(120)
-    domain = ['🔥🔥🔥🔥 초초적극 매수', '🔥🔥🔥 초적극 매수', '🔥🔥 적극 매수', '🔥 매수', '👀 관망']
-    range_ = ['darkred', '#ff4b4b', 'green', '#DAA520', "#666769"]
-
-    bubble = alt.Chart(df).mark_circle(opacity=0.7, stroke='white', strokeWidth=1).encode(
-        x=alt.X(x_col, title=x_title, scale=alt.Scale(domain=[per_min - per_margin, per_max + per_margin])),
-        y=alt.Y('상승여력 (%)', title='상승여력 (%)', scale=alt.Scale(domain=[up_min - up_margin, up_max + up_margin])),
-        color=alt.Color('투자등급', scale=alt.Scale(domain=domain, range=range_), legend=alt.Legend(title="투자 등급")),
-        size=size_encoding,
-        tooltip=['기업명', '종목', x_col, '상승여력 (%)', '배당률 (%)', '뉴스감성', '투자등급']
-    ).properties(height=500, title=chart_main_title).interactive()
-    
-    st.altair_chart(bubble, use_container_width=True)
+    x_col = '24시간 변동률 (%)' if is_crypto else 'PER'
+    bubble_cols = ['기업명', '종목', x_col, '상승여력 (%)', '배당률 (%)', '뉴스감성', '투자등급']
+    bubble_spec = bubble_chart_spec(chart_frame(df, bubble_cols), x_col, x_title, chart_main_title, bubble_size_title, enable_div)
+    st.vega_lite_chart(bubble_spec, use_container_width=True)
+
+    # 하단 바 차트 (상/하위 N개)
+    bar_spec = drop_bar_spec(chart_frame(bar_frame(df), ['기업명', '고점대비 (%)']), len(df))
+    st.vega_lite_chart(bar_spec, use_container_width=True)
+
+    # 미국 주식 펀더멘털 추이: 분석 중 저장된 Finnhub 분기 시계열 (추가 API 호출 없음)
+    us_tickers = df.loc[df['시장'] == 'us', '종목'].tolist()
+    if us_tickers:
+        with st.expander("🧾 미국 주식 펀더멘털 추이 (분기)"):
+            series_col, metric_col = st.columns(2)
+            series_ticker = series_col.selectbox("종목", us_tickers, key="series_ticker")
+            series_metric = metric_col.selectbox("지표", list(SERIES_LABELS), format_func=SERIES_LABELS.get, key="series_metric")
+            series = load_series(series_ticker, series_metric)
+            if series.empty:
+                st.caption("저장된 분기 이력이 없습니다. (Finnhub 지표를 받은 종목만 표시)")
+            else:
+                label = SERIES_LABELS[series_metric]
+                st.vega_lite_chart(series_line_spec(series, label, f"{series_ticker} 분기 {label}"), use_container_width=True)
+
+    # 결과 내보내기: 재실행마다 파일을 만들지 않고 버튼 클릭 시에만 생성 (동일 결과는 캐시 재사용)
+    st.subheader("📥 결과 내보내기")
+    exp_fmt_col, exp_opt_col, exp_btn_col = st.columns([2, 2, 3])
+    export_fmt = exp_fmt_col.selectbox("파일 형식", list(EXPORT_FORMATS), format_func=lambda k: EXPORT_FORMATS[k][0])
+    with_rules = exp_opt_col.checkbox("엑셀 조건부 서식 포함", value=True, disabled=export_fmt != 'xlsx')
+    # 전체 모드는 시장마다 포트폴리오 기준값으로 등급을 매기므로 하이라이트도 행의 시장 기준으로
+    thresholds = {m: market_thresholds for m, (_, market_thresholds, _) in targets.items()} if export_fmt == 'xlsx' and with_rules else None
+
+    if exp_btn_col.button("📦 내보내기 파일 생성"):
+        try:
+            with st.spinner("파일 생성 중..."):
+                st.session_state.export_file = (export_fmt, thresholds, build_export(df, export_fmt, thresholds))
+        except ImportError as e:
+            # xlsx는 xlsxwriter, parquet은 pyarrow(또는 fastparquet): 실제로 없는 모듈 이름을 표시
+            st.error(f"{EXPORT_FORMATS[export_fmt][0]} 내보내기에 필요한 패키지가 설치되어 있지 않습니다: {e.name or e}")
+
+    export_file = st.session_state.export_file
+    if export_file and export_file[:2] == (export_fmt, thresholds):
+        _, ext, mime = EXPORT_FORMATS[export_fmt]
+        st.download_button("📥 다운로드", data=export_file[2], file_name=f"stock_analysis.{ext}", mime=mime)
 
-    # 하단 바 차트 및 데이터 내보내기
-    bar = alt.Chart(df).mark_bar().encode(
-        x=alt.X('고점대비 (%)', title='고점 대비 하락률 (%)'),
-        y=alt.Y('기업명', sort='x', title='종목명'),
-        color=alt.Color('고점대비 (%)', scale=alt.Scale(scheme='redblue'), legend=None),
-        tooltip=['기업명', '고점대비 (%)']
-    ).properties(height=400, title="종목별 고점 대비 하락폭")
-    st.altair_chart(bar, use_container_width=True)
+# ==============================================================================
+# [8] 보유 종목 평가 (holdings.json, 분석 결과 시세로 재평가)
+# ==============================================================================
+holdings_mtime = os.path.getmtime(HOLDINGS_PATH) if os.path.exists(HOLDINGS_PATH) else None
+if holdings_mtime is not None:
+    if st.session_state.holdings[0] != holdings_mtime:
+        st.session_state.holdings = (holdings_mtime, Holdings(load_holdings()))
+    book = st.session_state.holdings[1]
+    try:
+        rates = rates_for(book.currencies)
+    except Exception as e:
+        rates = None
+        st.warning(f"환율 조회 실패 — 통화별 합계만 표시합니다: {e}")
+    lots, summary = book.revalue(quote_table(st.session_state.raw_frames.values()), rates)
+
+    st.subheader("💼 보유 종목 평가")
+    if rates and len(rates) > 1:
+        st.caption("💱 환율: " + " | ".join(f"{c}/{BASE_CURRENCY} {r:,.2f}" for c, r in rates.items() if c != BASE_CURRENCY))
+    for currency, row in summary.iloc[::-1].iterrows():  # 환산 합계 행을 먼저
+        fmt = "{:,.2f}" if currency == 'USD' else "{:,.0f}"
+        c1, c2, c3 = st.columns(3)
+        c1.metric(f"평가금액 ({currency})", fmt.format(row['평가금액']), f"{row['수익률 (%)']:.2f}%")
+        c2.metric(f"평가손익 ({currency})", fmt.format(row['평가손익']))
+        c3.metric(f"연 배당수입 ({currency})", fmt.format(row['배당수입']), f"{row['배당수익률 (%)']:.2f}%", delta_color="off")
+    st.dataframe(lots.style.format(precision=2, na_rep="N/A"), use_container_width=True, hide_index=True, column_config={
+        '비중 (%)': st.column_config.Column(help="같은 통화 포지션의 평가금액 합계 대비 비중"),
+        '변위저점대비 (%)': st.column_config.Column(help="52주 저점-고점 범위에서 현재가 위치"),
+        '배당수입': st.column_config.Column(help="주당 연간 배당금 x 보유주수"),
+    })
+    st.caption("시세: 이번 분석 결과 -> 일봉 저장소 -> 가져온 시트 값 순으로 사용")
+    if '전체비중 (%)' in lots and lots['전체비중 (%)'].sum() > 0:
+        st.bar_chart(lots.set_index('기업명')['전체비중 (%)'], horizontal=True)
 
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Result')
-    st.download_button("📥 엑셀 다운로드", data=output.getvalue(), file_name="stock_analysis.xlsx")
+# ==============================================================================
+# [9] 포트폴리오 위험 (일봉 저장소 수익률 -> 상관/변동성, 보유 종목이 있으면 평가금액 비중, 없으면 분석 종목 동일 비중)
+# ==============================================================================
+if holdings_mtime is not None and len(lots):
+    risk_frame, risk_label = lots, "보유 종목"
+    risk_weights = tuple(lots['전체비중 (%)']) if '전체비중 (%)' in lots else None
+else:
+    risk_frame, risk_label, risk_weights = df, "분석 종목 (동일 비중)", None
+if risk_frame is not None and len(risk_frame) >= 2:
+    st.subheader(f"⚠️ 포트폴리오 위험 — {risk_label}")
+    risk_names = tuple(zip(risk_frame['시장'].astype(str), risk_frame['종목'].astype(str)))
+    with st.spinner("수익률 상관 행렬 계산 중..."):
+        report = risk_report(risk_names, risk_weights)
+    if not report.days:
+        st.info("저장된 일봉이 없습니다. 분석을 실행하면 종목별 일봉이 저장되고 다음부터 위험 지표가 표시됩니다.")
+    else:
+        c1, c2, c3 = st.columns(3)
+        c1.metric("포트폴리오 변동성 (연율)", "N/A" if np.isnan(report.portfolio) else f"{report.portfolio:.1f}%")
+        c2.metric("평균 상관계수", "N/A" if np.isnan(report.average) else f"{report.average:.2f}")
+        c3.metric(f"고상관 쌍 (ρ ≥ {HIGH_CORR})", len(report.pairs))
+        if len(report.pairs):
+            st.warning(f"상관계수 {HIGH_CORR} 이상인 종목 쌍이 {len(report.pairs)}개 있습니다. 같은 방향으로 움직이는 종목에 쏠려 있지 않은지 확인하세요.")
+            st.dataframe(report.pairs.head(20).style.format({'상관계수': "{:.2f}"}), use_container_width=True, hide_index=True)
+        weight_series = None if risk_weights is None else \
+            pd.Series(risk_weights, index=[name_key(m, t) for m, t in risk_names]).groupby(level=0).sum()
+        heat_df, order = heatmap_frame(report.corr, weight_series)
+        title = "종목 간 일간 수익률 상관계수 (계층 군집 순서)" + (f" — 비중 상위 {len(order)}개" if len(order) < len(report.corr) else "")
+        st.vega_lite_chart(corr_heatmap_spec(heat_df, order, title), use_container_width=True)
+        with st.expander("종목별 변동성"):
+            st.dataframe(report.volatility.to_frame().style.format(precision=1, na_rep="N/A"), use_container_width=True)
+        st.caption(f"최근 {report.days}일 일봉 저장소 기준 (시장 합집합 달력, 종목 쌍마다 함께 거래한 날만 사용). 저장된 일봉이 없는 종목은 N/A")
+        if {'us'} < {m for m, _ in risk_names}:
+            st.caption("⚠️ 수익률은 각 종목의 현지 통화 기준이라 원화(한국 주식/코인)와 달러(미국 주식) 수익률이 섞여 있습니다. "
+                       "환율 변동은 반영되지 않으므로 원화 기준 실제 변동성/상관과 다를 수 있습니다.")
@@ -0,0 +1,61 @@
+"""백테스트 엔진 점검: 벡터화 등급 산정이 classify 규칙과 일치하고, 병렬 실행 결과가 단일 프로세스와 같은지 확인
+
+    python backtest_test.py        # 결과 출력
+    python -m pytest backtest_test.py
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard.backtest import grade_codes, rule_terms, run_backtest, summarize
+from dashboard.engine import classify
+from dashboard.model import GRADE_LABELS
+from dashboard.snapshots import Panel
+
+GRID = {'max_per': [10, 20], 'min_up': [50, 70], 'min_drop': [20, 30], 'min_div': [2.0, 4.0]}
+
+
+def sample_panel(days, tickers, seed=0):
+    """임의 보행 종가와 임의 펀더멘털로 구성한 패널"""
+    rng = np.random.default_rng(seed)
+    close = (1000 * np.exp(rng.normal(0, 0.02, size=(days, tickers)).cumsum(axis=0))).astype('float32')
+    high = np.maximum.accumulate(close * 1.01, axis=0)
+    low = np.minimum.accumulate(close * 0.99, axis=0)
+    per = np.where(rng.random((days, tickers)) < 0.2, 0, rng.uniform(3, 40, (days, tickers))).astype('float32')
+    sec_per = np.where(rng.random((days, tickers)) < 0.5, 0, rng.uniform(5, 30, (days, tickers))).astype('float32')
+    div = rng.uniform(0, 8, (days, tickers)).astype('float32')
+    return Panel(pd.bdate_range('2022-01-03', periods=days), [f"{i:06d}" for i in range(tickers)], close, high, low, per, div, sec_per)
+
+
+def test_matches_classify():
+    panel = sample_panel(30, 40)
+    terms = rule_terms(panel, GRID)
+    grades = grade_codes(terms, 20, 50, 20, 2.0)
+    drop = np.round((panel.close / panel.high - 1) * 100, 2)
+    up = np.round((panel.high - panel.close) / (panel.high - panel.low) * 100, 2)
+    for d, t in zip(*np.nonzero(np.ones(panel.shape, dtype=bool))):
+        row = {'고점대비 (%)': drop[d, t], '상승여력 (%)': up[d, t], '감성점수': 0, 'PER': round(float(panel.per[d, t]), 2),
+               '업종PER': round(float(panel.sec_per[d, t]), 2), '배당률 (%)': round(float(panel.div[d, t]), 2)}
+        assert GRADE_LABELS[grades[d, t]] == classify(row, 'kr', 20, 50, 20, 2.0), (d, t)
+
+
+def test_parallel_matches_serial():
+    panel = sample_panel(120, 60)
+    serial = run_backtest(panel, GRID, [5, 20], chunk_size=3)
+    parallel = run_backtest(panel, GRID, [5, 20], processes=2, chunk_size=3)
+    pd.testing.assert_frame_equal(serial, parallel)
+    # 조합마다 등급 분포만 달라지고 기간별 전체 표본수는 같아야 함
+    totals = serial.groupby(['max_per', 'min_up', 'min_drop', 'min_div', '기간(일)'])['표본수'].sum()
+    assert (totals.groupby('기간(일)').nunique() == 1).all()
+
+
+if __name__ == "__main__":
+    test_matches_classify()
+    test_parallel_matches_serial()
+    panel = sample_panel(750, 2500)
+    started = time.perf_counter()
+    result = run_backtest(panel, processes=4)
+    print(f"750일 x 2500종목 x 기본 그리드: {time.perf_counter() - started:.1f}초")
+    print(summarize(result, 20).head(5).to_string(index=False, float_format="%.2f"))
+    print("✅ 통과")
@@ -0,0 +1,89 @@
+"""공유 캐시 점검: 동시 요청 합류(스레드/프로세스), TTL 만료, 예외 미저장, SQLite 연결 닫힘 확인
+
+    python cache_test.py        # 결과 출력
+    python -m pytest cache_test.py
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dashboard import cache as cache_module
+from dashboard.cache import MemoryCache, SQLiteCache
+
+WORK_SEC = 0.3  # 느린 수집 흉내
+
+
+def slow_compute(counter):
+    def compute():
+        with counter['lock']: counter['n'] += 1
+        time.sleep(WORK_SEC)
+        return {'value': 42}
+    return compute
+
+
+def test_threads_coalesce():
+    for cache in [MemoryCache(), SQLiteCache(os.path.join(tempfile.mkdtemp(), "shared.sqlite"))]:
+        counter = {'n': 0, 'lock': threading.Lock()}
+        with ThreadPoolExecutor(16) as pool:
+            values = list(pool.map(lambda _: cache.get_or_compute(('k',), 60, slow_compute(counter)), range(16)))
+        assert counter['n'] == 1 and all(v == {'value': 42} for v in values)
+        assert cache.stats['miss'] == 1 and cache.stats['coalesced'] == 15
+
+
+def test_ttl_and_errors():
+    cache = MemoryCache()
+    calls = []
+    cache.get_or_compute('k', 0.05, lambda: calls.append(1))
+    cache.get_or_compute('k', 0.05, lambda: calls.append(1))
+    time.sleep(0.1)
+    cache.get_or_compute('k', 0.05, lambda: calls.append(1))
+    assert len(calls) == 2
+
+    def fail():
+        raise RuntimeError("down")
+    try: cache.get_or_compute('e', 60, fail)
+    except RuntimeError: pass
+    assert cache.get_or_compute('e', 60, lambda: 'ok') == 'ok'
+
+
+def _worker(path):
+    cache = SQLiteCache(path)
+    counter = {'n': 0, 'lock': threading.Lock()}
+    value = cache.get_or_compute(('shared',), 60, slow_compute(counter))
+    return counter['n'], value
+
+
+def test_processes_coalesce():
+    path = os.path.join(tempfile.mkdtemp(), "shared.sqlite")
+    SQLiteCache(path)
+    with ProcessPoolExecutor(4) as pool:
+        results = list(pool.map(_worker, [path] * 4))
+    assert sum(n for n, _ in results) == 1 and all(v == {'value': 42} for _, v in results)
+
+
+def test_sqlite_connections_closed():
+    opened, connect = [], sqlite3.connect
+    cache_module.sqlite3.connect = lambda *args, **kwargs: opened.append(connect(*args, **kwargs)) or opened[-1]
+    try:
+        cache = SQLiteCache(os.path.join(tempfile.mkdtemp(), "shared.sqlite"))
+        assert cache.get_or_compute('k', 60, lambda: 1) == 1 and cache.get_or_compute('k', 60, lambda: 2) == 1
+    finally:
+        cache_module.sqlite3.connect = connect
+    assert len(opened) >= 4  # 생성 / 조회 / 임대 / 저장 / 해제
+    for conn in opened:  # 닫힌 연결은 ProgrammingError
+        try:
+            conn.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            continue
+        raise AssertionError("연결이 닫히지 않음")
+
+
+if __name__ == "__main__":
+    test_threads_coalesce()
+    test_ttl_and_errors()
+    test_processes_coalesce()
+    test_sqlite_connections_closed()
+    print("✅ 통과")
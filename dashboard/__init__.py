@@ -0,0 +1,34 @@
+"""주식 투자 판단 대시보드 분석 엔진 패키지
+
+Streamlit UI(app.py)와 헤드리스 배치 실행(python -m dashboard)이 공유하는
+수집 -> 점수 산정 -> 등급 부여 파이프라인. 이 패키지는 UI 모듈을 import하지 않는다.
+"""
+from .alerts import AlertEngine, Rule, default_rules
+from .backtest import run_backtest, summarize
+from .engine import (analyze_all_markets, analyze_market, analyze_ticker, classify, collect_ticker, finish_ticker,
+                     grade_frame, run_portfolios, score_pool)
+from .extremes import RollingExtremes, extremes_frame
+from .fundamentals import TREND_COLUMNS, load_fundamentals, trend_columns
+from .holdings import Holdings, import_sheet, load_holdings, save_holdings
+from .export import EXPORT_FORMATS, export_bytes, write_result
+from .model import GRADE_LABELS, RESULT_SCHEMA, ResultBuffer, compact_frame, format_memory_usage
+from .portfolio import load_portfolio, parse_tickers, read_portfolio
+from .risk import RiskMatrix, analyze_risk
+from .universe import SymbolIndex, symbol_index, validate_tickers
+from .watchlist import import_watchlist, list_watchlists, load_watchlist, save_watchlist
+
+__all__ = [
+    'AlertEngine', 'Rule', 'default_rules',
+    'run_backtest', 'summarize',
+    'analyze_all_markets', 'analyze_market', 'analyze_ticker', 'classify', 'collect_ticker', 'finish_ticker',
+    'grade_frame', 'run_portfolios', 'score_pool',
+    'RollingExtremes', 'extremes_frame',
+    'TREND_COLUMNS', 'load_fundamentals', 'trend_columns',
+    'Holdings', 'import_sheet', 'load_holdings', 'save_holdings',
+    'EXPORT_FORMATS', 'export_bytes', 'write_result',
+    'GRADE_LABELS', 'RESULT_SCHEMA', 'ResultBuffer', 'compact_frame', 'format_memory_usage',
+    'load_portfolio', 'parse_tickers', 'read_portfolio',
+    'RiskMatrix', 'analyze_risk',
+    'SymbolIndex', 'symbol_index', 'validate_tickers',
+    'import_watchlist', 'list_watchlists', 'load_watchlist', 'save_watchlist',
+]
@@ -0,0 +1,217 @@
+"""헤드리스 배치 실행 (Streamlit 서버 없이 cron/배치 작업에서 사용)
+
+    python -m dashboard run --portfolio portfolio_us.json --out result.parquet
+    python -m dashboard run --portfolio portfolio_kr.json --portfolio portfolio_us.json --workers 8 --out all.xlsx
+    python -m dashboard run --portfolio portfolio_us.json --alerts --webhook https://example.com/hook   # cron 알림
+    python -m dashboard backtest --start 20220101 --end 20241231 --fetch --processes 4 --out backtest.csv
+    python -m dashboard holdings --import stock_valuation.xlsx --result all.parquet
+    python -m dashboard search 삼성 --market kr
+    python -m dashboard watchlist --import symbols.csv --market us --name 미국전체
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import pandas as pd
+
+from .alerts import ALERT_LOG, AlertEngine, FileSink, WebhookSink, alert_message, default_rules, dispatch, load_rules
+from .backtest import DEFAULT_GRID, DEFAULT_HORIZONS, run_backtest, summarize
+from .engine import run_portfolios
+from .fx import StaticRates, rates_for, use_provider
+from .holdings import HOLDINGS_PATH, Holdings, import_sheet, load_holdings, quote_table, save_holdings
+from .export import write_result
+from .portfolio import market_from_path, parse_tickers, read_portfolio, thresholds_of
+from .snapshots import load_panel, update_snapshots
+from .universe import SEARCH_LIMIT, symbol_index, validate_tickers
+from .watchlist import WATCHLIST_PATH, import_watchlist, list_watchlists
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m dashboard", description="주식 투자 판단 대시보드 배치 실행기")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="포트폴리오 분석 후 결과 저장")
+    run.add_argument("--portfolio", action="append", required=True,
+                     help="포트폴리오 파일 (여러 번 지정하면 시장별로 동시에 분석)")
+    run.add_argument("--market", choices=["kr", "us", "crypto"],
+                     help="시장 코드 (파일명이 portfolio_{market}.json 형식이면 생략 가능)")
+    run.add_argument("--out", help="결과 파일 (.parquet / .csv / .xlsx), 생략 시 표준 출력")
+    run.add_argument("--workers", type=int, default=4, help="시장별 종목 병렬 수집 스레드 수 (기본 4)")
+    run.add_argument("--processes", type=int, default=0,
+                     help="페이지 파싱/감성 점수/키워드 계산 프로세스 수 (기본 0: 현재 프로세스에서 계산)")
+    run.add_argument("--async", dest="use_async", action="store_true",
+                     help="aiohttp 이벤트 루프로 수집 (--workers 대신 사용, 호출별 실패 상태를 보고)")
+    run.add_argument("--columns", nargs="+",
+                     help="결과에 채울 컬럼 (필요한 수집만 실행, 투자등급 산정 입력은 항상 포함, 생략 시 전체)")
+    run.add_argument("--excel-rules", action="store_true", help="xlsx 저장 시 필터 기준을 조건부 서식으로 포함")
+    run.add_argument("--alerts", action="store_true",
+                     help="직전 실행 결과와 비교해 기준 돌파 알림 (필터 기준 기본 규칙 + alerts.json 사용자 규칙)")
+    run.add_argument("--alert-log", default=ALERT_LOG, help=f"알림 기록 파일 (JSON Lines, 기본 {ALERT_LOG})")
+    run.add_argument("--webhook", help="알림을 POST할 웹훅 URL")
+
+    bt = sub.add_parser("backtest", help="과거 스냅샷으로 투자등급 규칙 백테스트 및 기준값 그리드 탐색 (한국 주식)")
+    bt.add_argument("--start", required=True, help="시작일 (YYYYMMDD)")
+    bt.add_argument("--end", required=True, help="종료일 (YYYYMMDD)")
+    bt.add_argument("--fetch", action="store_true", help="저장되지 않은 날짜의 스냅샷을 pykrx로 먼저 수집")
+    bt.add_argument("--horizons", type=int, nargs="+", default=DEFAULT_HORIZONS, help="보유 기간 (거래일, 기본 5 20 60)")
+    for name, values in DEFAULT_GRID.items():
+        bt.add_argument(f"--{name.replace('_', '-')}", type=float, nargs="+", default=values,
+                        help=f"{name} 후보값 (기본 {' '.join(map(str, values))})")
+    bt.add_argument("--processes", type=int, default=0, help="파라미터 묶음 병렬 실행 프로세스 수 (기본 0)")
+    bt.add_argument("--top", type=int, default=10, help="출력할 상위 조합 수 (기본 10)")
+    bt.add_argument("--out", help="등급별 상세 결과 파일 (.parquet / .csv)")
+
+    hd = sub.add_parser("holdings", help="보유 종목 평가 (수익률/평가손익/배당수입/비중)")
+    hd.add_argument("--import", dest="sheet", help=f"stock_valuation.xlsx 형식 시트를 읽어 {HOLDINGS_PATH}에 저장")
+    hd.add_argument("--result", action="append", default=[],
+                    help="시세로 사용할 분석 결과 파일 (.parquet / .csv, 생략 시 일봉 저장소/시트 값)")
+    hd.add_argument("--rate", action="append", default=[], metavar="USD=1400",
+                    help="고정 환율 지정 (온라인 환율 조회 대신 사용, 여러 통화는 반복 지정)")
+    hd.add_argument("--out", help="포지션별 평가 결과 파일 (.csv)")
+
+    sr = sub.add_parser("search", help="종목 코드/종목명/영문명 검색 (시장별 전체 종목 목록)")
+    sr.add_argument("query", help="검색어 (코드 또는 이름의 앞부분/일부)")
+    sr.add_argument("--market", choices=["kr", "us", "crypto"], required=True, help="시장 코드")
+    sr.add_argument("--limit", type=int, default=SEARCH_LIMIT, help=f"출력할 후보 수 (기본 {SEARCH_LIMIT})")
+
+    wl = sub.add_parser("watchlist", help=f"CSV/xlsx 종목 목록을 검증/중복 제거 후 관심 목록으로 저장 ({WATCHLIST_PATH})")
+    wl.add_argument("--import", dest="file", help="종목 컬럼이 있는 CSV/xlsx (분석 결과 파일, stock_valuation.xlsx 포함)")
+    wl.add_argument("--market", choices=["kr", "us", "crypto"], required=True, help="시장 코드")
+    wl.add_argument("--name", help="관심 목록 이름 (생략 시 파일 이름, 포트폴리오 파일의 \"watchlist\"로 참조)")
+    return parser
+
+
+def cmd_run(args):
+    portfolios = {}
+    for path in args.portfolio:
+        market = args.market if args.market and len(args.portfolio) == 1 else market_from_path(path)
+        if market is None:
+            sys.exit(f"{path}: 시장을 알 수 없습니다. --market을 지정하거나 portfolio_{{kr|us|crypto}}.json 형식을 사용하세요.")
+        portfolio = read_portfolio(path, market)
+        if portfolio is None:
+            sys.exit(f"{path}: 파일이 없습니다.")
+        valid, unknown = validate_tickers(market, parse_tickers(portfolio["tickers"]))
+        if unknown:  # 종목 목록에 없는 코드는 수집하지 않음
+            print(f"{path}: 종목 목록에 없는 코드 제외 - {', '.join(unknown)}", file=sys.stderr)
+            portfolio = {**portfolio, "tickers": ", ".join(valid)}
+        portfolios[market] = portfolio
+
+    started = time.perf_counter()
+    columns = ['투자등급', *args.columns] if args.columns else None
+    df, errors = run_portfolios(portfolios, workers=args.workers, processes=args.processes, use_async=args.use_async, columns=columns)
+    for message in errors: print(message, file=sys.stderr)
+    if df is None:
+        sys.exit("분석 결과가 없습니다.")
+    if args.alerts: notify(portfolios, df, args)
+
+    if args.out:
+        # 조건부 서식 기준값은 시장별 포트폴리오 기준 (행의 시장 컬럼으로 구분)
+        thresholds = {m: thresholds_of(p) for m, p in portfolios.items()} if args.excel_rules else None
+        write_result(df, args.out, thresholds)
+        print(f"✅ {len(df)}개 종목 -> {args.out} ({time.perf_counter() - started:.1f}초)")
+    else:
+        print(df.drop(columns=['최근뉴스']).to_string(index=False))
+
+
+def notify(portfolios, df, args):
+    """배치 실행 간 알림 상태를 이어 가며 규칙 평가 -> 파일/웹훅 전달, 알림은 표준 오류로도 출력"""
+    rules = [r for m, p in portfolios.items() for r in default_rules(m, p["min_drop"], p["min_up"], p.get("max_rsi", 0))]
+    engine = AlertEngine.load(rules + load_rules())
+    alerts = engine.evaluate(df)
+    engine.save()
+    sinks = [FileSink(args.alert_log)] + ([WebhookSink(args.webhook)] if args.webhook else [])
+    for message in dispatch(alerts, sinks): print(message, file=sys.stderr)
+    for alert in alerts: print(f"🔔 {alert_message(alert)}", file=sys.stderr)
+
+
+def cmd_backtest(args):
+    started = time.perf_counter()
+    if args.fetch:
+        fetched = update_snapshots(args.start, args.end, on_progress=lambda day: print(f"{day} 스냅샷 수집", file=sys.stderr))
+        print(f"📥 {fetched}일 수집", file=sys.stderr)
+    panel = load_panel(args.start, args.end)
+    if panel is None:
+        sys.exit("저장된 스냅샷이 없습니다. --fetch로 먼저 수집하세요.")
+
+    grid = {name: getattr(args, name) for name in DEFAULT_GRID}
+    result = run_backtest(panel, grid, args.horizons, processes=args.processes)
+    if args.out and args.out.endswith(".parquet"):
+        result.to_parquet(args.out)
+    elif args.out:
+        result.to_csv(args.out, index=False, encoding="utf-8-sig")
+    days, tickers = panel.shape
+    print(f"✅ {days}일 x {tickers}종목 x {math.prod(len(v) for v in grid.values())}개 조합 ({time.perf_counter() - started:.1f}초)")
+    for horizon in args.horizons:
+        print(f"\n[{horizon}거래일 보유] 상위 {args.top}개 조합")
+        print(summarize(result, horizon).head(args.top).to_string(index=False, float_format="%.2f"))
+
+
+def read_result(path):
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path, dtype={'종목': str})
+
+
+def cmd_holdings(args):
+    if args.sheet:
+        positions, unresolved = import_sheet(args.sheet)
+        save_holdings(positions)
+        print(f"📥 {len(positions)}개 포지션 -> {HOLDINGS_PATH}", file=sys.stderr)
+        for name in unresolved: print(f"{name}: 종목코드를 찾지 못했습니다.", file=sys.stderr)
+    positions = load_holdings()
+    if positions.empty:
+        sys.exit(f"{HOLDINGS_PATH}에 포지션이 없습니다. --import로 먼저 가져오세요.")
+
+    if args.rate:
+        use_provider(StaticRates({c: float(r) for c, r in (item.split("=") for item in args.rate)}))
+    book = Holdings(positions)
+    try:
+        rates = rates_for(book.currencies)
+    except Exception as e:
+        rates = None
+        print(f"환율 조회 실패 (통화별 합계만 출력): {e}", file=sys.stderr)
+    lots, summary = book.revalue(quote_table([read_result(p) for p in args.result]), rates)
+    if args.out:
+        lots.to_csv(args.out, index=False, encoding="utf-8-sig")
+    print(lots.to_string(index=False, float_format="%.2f"))
+    print()
+    print(summary.to_string(float_format="%.2f"))
+
+
+def cmd_search(args):
+    index = symbol_index(args.market)
+    if index is None:
+        sys.exit(f"{args.market}: 종목 목록을 불러오지 못했습니다.")
+    for ticker, name in index.search(args.query, args.limit):
+        print(f"{ticker}\t{name}")
+
+
+def cmd_watchlist(args):
+    if args.file:
+        name = args.name or os.path.splitext(os.path.basename(args.file))[0]
+        report = import_watchlist(args.file, args.file, args.market, name,
+                                  on_progress=lambda rows: print(f"{rows}행 읽음", file=sys.stderr))
+        if not report.validated: print("⚠️ 종목 목록을 불러오지 못해 검증 없이 저장합니다.", file=sys.stderr)
+        if report.unknown: print(f"종목 목록에 없는 값 {len(report.unknown)}개: {', '.join(report.unknown[:20])}", file=sys.stderr)
+        if not report.tickers: sys.exit("저장할 종목이 없습니다.")
+        print(f"✅ {name}: {len(report.tickers)}개 종목 저장 (중복 {report.duplicates}, 다른 시장 {report.skipped})")
+    for name, count in list_watchlists(args.market):
+        print(f"{name}\t{count}")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        cmd_run(args)
+    elif args.command == "backtest":
+        cmd_backtest(args)
+    elif args.command == "holdings":
+        cmd_holdings(args)
+    elif args.command == "search":
+        cmd_search(args)
+    elif args.command == "watchlist":
+        cmd_watchlist(args)
+
+
+if __name__ == "__main__":
+    main()
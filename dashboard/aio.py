@@ -0,0 +1,214 @@
+"""비동기 수집 파이프라인 (aiohttp): 종목 안의 호출과 종목 간 호출을 하나의 이벤트 루프에서 gather
+
+- 모든 호출 결과는 Outcome(status, value, error)으로 남겨 실패가 0/빈 값으로 묻히지 않도록 함
+- 동시 요청 수는 세마포어로 제한하고, 429 응답은 Retry-After만큼 기다린 뒤 재시도
+- 수집 대상은 동기 경로와 같은 필드 그래프(fields.GRAPH)의 노드: 요청 컬럼에 필요한 노드만 평가하고,
+  노드 값은 같은 키로 공유 캐시에서 재사용/저장 (다른 세션의 동기 수집과 캐시를 공유, 합류는 하지 않음)
+- 뉴스/코인 시세/네이버 페이지처럼 단순 HTTP 노드만 aiohttp로 보내고, 나머지 노드(미국 시세 failover 체인,
+  pykrx/yfinance 등 동기 라이브러리 호출)는 동기 노드 함수를 asyncio.to_thread로 실행
+- 응답 해석은 동기 버전과 같은 parse_* 함수를 사용
+"""
+import asyncio
+
+import aiohttp
+
+from .cache import shared_cache
+from .config import FRESHNESS_BUDGET
+from .engine import new_raw
+from .fields import MISSING, expand_columns, required_nodes
+from .news import news_request, parse_news
+from .providers import crypto_url, parse_crypto_data
+from .sectors import kr_fundamentals
+
+# 호출 결과 상태
+OK = 'ok'
+TIMEOUT = 'timeout'
+RATE_LIMITED = 'rate_limited'
+PARSE_ERROR = 'parse_error'
+HTTP_ERROR = 'http_error'    # 4xx/5xx(429 제외) 또는 연결 실패
+ERROR = 'error'              # 동기 라이브러리(pykrx 등) 호출 중 예외
+
+CONCURRENCY = 100            # 이벤트 루프 전체의 동시 요청 수 상한
+REQUEST_TIMEOUT = 5          # 요청당 제한 시간 (초, 동기 버전과 동일)
+RATE_LIMIT_RETRIES = 2       # 429 응답 재시도 횟수
+DEFAULT_RETRY_AFTER = 1.0    # Retry-After 헤더가 없을 때 대기 시간 (초)
+
+
+class Outcome:
+    """호출 1건의 결과: status가 OK일 때만 value가 유효"""
+    __slots__ = ('status', 'value', 'error')
+
+    def __init__(self, status, value=None, error=None):
+        self.status, self.value, self.error = status, value, error
+
+    @property
+    def ok(self):
+        return self.status == OK
+
+    def __repr__(self):
+        return f"Outcome({self.status!r}, error={self.error!r})"
+
+
+def _retry_after(resp):
+    try: return float(resp.headers.get('Retry-After', DEFAULT_RETRY_AFTER))
+    except ValueError: return DEFAULT_RETRY_AFTER
+
+
+async def fetch(session, sem, url, parse, params=None, headers=None, as_text=False):
+    """GET 요청 + 응답 해석 -> Outcome (예외를 던지지 않음)"""
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        wait = None
+        try:
+            async with sem, session.get(url, params=params, headers=headers) as resp:
+                if resp.status == 429:
+                    wait = _retry_after(resp)
+                elif resp.status >= 400:
+                    return Outcome(HTTP_ERROR, error=f"HTTP {resp.status}")
+                else:
+                    body = await (resp.text() if as_text else resp.json(content_type=None))
+        except asyncio.TimeoutError:
+            return Outcome(TIMEOUT, error=f"{REQUEST_TIMEOUT}초 초과")
+        except ValueError as e:  # JSON 형식 오류
+            return Outcome(PARSE_ERROR, error=str(e))
+        except aiohttp.ClientError as e:
+            return Outcome(HTTP_ERROR, error=f"{type(e).__name__}: {e}")
+
+        if wait is None:
+            try: return Outcome(OK, parse(body))
+            except Exception as e: return Outcome(PARSE_ERROR, error=f"{type(e).__name__}: {e}")
+        if attempt < RATE_LIMIT_RETRIES:
+            await asyncio.sleep(wait)  # 세마포어를 반납한 상태에서 대기
+    return Outcome(RATE_LIMITED, error=f"{RATE_LIMIT_RETRIES}회 재시도 후에도 429")
+
+
+async def run_sync(func, *args):
+    """동기 함수를 스레드에서 실행 -> Outcome"""
+    try: return Outcome(OK, await asyncio.to_thread(func, *args))
+    except Exception as e: return Outcome(ERROR, error=f"{type(e).__name__}: {e}")
+
+
+async def news_node(session, sem, ctx):
+    """뉴스 원문 (한국 주식은 종목명으로 검색)"""
+    query = ctx.get('name')['기업명'] if ctx.market == 'kr' else ctx.ticker
+    url, headers = news_request(query, ctx.market)
+    outcome = await fetch(session, sem, url, lambda res: parse_news(res, ctx.market), headers=headers)
+    if outcome.ok: outcome.value = {'news': outcome.value}
+    return outcome
+
+
+async def crypto_quote_node(session, sem, ctx):
+    outcome = await fetch(session, sem, crypto_url(ctx.ticker), parse_crypto_data)
+    if outcome.ok: outcome.value = {**outcome.value, '기업명': ctx.ticker} if outcome.value else MISSING
+    return outcome
+
+
+async def kr_fundamental_node(session, sem, ctx):
+    """전 종목 테이블에서 조회, 테이블에 없는 종목만 네이버 페이지 (계산 단계에서 파싱)"""
+    outcome = await run_sync(kr_fundamentals, ctx.ticker, ctx.latest_day)
+    if not outcome.ok or outcome.value: return outcome
+    outcome = await fetch(session, sem, f"https://finance.naver.com/item/main.naver?code={ctx.ticker}",
+                          lambda html: html, headers={'User-Agent': 'Mozilla/5.0'}, as_text=True)
+    if outcome.ok: outcome.value = {'html': outcome.value}
+    return outcome
+
+
+# aiohttp로 보내는 노드: (시장, 노드 이름) -> async (session, sem, ctx) -> Outcome (나머지 노드는 동기 함수를 스레드에서 실행)
+ASYNC_NODES = {
+    ('kr', 'fundamentals'): kr_fundamental_node,
+    ('kr', 'news'): news_node,
+    ('us', 'news'): news_node,
+    ('crypto', 'quote'): crypto_quote_node,
+    ('crypto', 'news'): news_node,
+}
+
+
+class AsyncTickerFields:
+    """TickerFields의 비동기 버전: 같은 노드/캐시 키를 쓰고, 의존 노드가 끝난 노드끼리 동시에 평가"""
+
+    def __init__(self, market_fields, ticker):
+        self.shared, self.market, self.ticker = market_fields, market_fields.market, ticker
+        self.values, self.calls = {}, {}  # 노드 값 / 캐시에 없어 새로 호출한 노드의 Outcome
+
+    @property
+    def latest_day(self):
+        return self.shared.get('trading_day')['latest_day']
+
+    @property
+    def one_year_ago(self):
+        return self.shared.get('trading_day')['one_year_ago']
+
+    def get(self, name):
+        """노드 함수(동기)가 의존 노드 값을 읽을 때 사용 (이미 평가된 값만 반환)"""
+        if self.shared.nodes[name].market_scope: return self.shared.get(name)
+        return self.values[name]
+
+    async def evaluate(self, session, sem, name):
+        """공유 캐시에 있으면 재사용, 없으면 호출 후 성공한 값만 캐시에 저장 -> Outcome"""
+        cache, key = shared_cache(), ('field', self.market, self.ticker, self.shared.day(), name)
+        hit, value = await asyncio.to_thread(cache.lookup, key)
+        if hit: return Outcome(OK, value)
+        compute = ASYNC_NODES.get((self.market, name))
+        outcome = await (compute(session, sem, self) if compute else run_sync(self.shared.nodes[name].compute, self))
+        self.calls[name] = outcome
+        if outcome.ok: await asyncio.to_thread(cache.put, key, outcome.value, FRESHNESS_BUDGET[self.market])
+        return outcome
+
+    async def collect(self, session, sem, names):
+        """노드 목록을 의존 단계별로 동시에 평가해 원본 레코드용 dict로 합침
+        optional이 아닌 노드가 실패하거나 None이면 None, optional 노드 실패는 해당 컬럼만 비우고 calls에 남김"""
+        nodes = self.shared.nodes
+        pending = [n for n in names if not nodes[n].market_scope]
+        raw = {}
+        while pending:
+            ready = [n for n in pending if all(nodes[d].market_scope or d in self.values for d in nodes[n].deps)]
+            if not ready: break
+            for name, outcome in zip(ready, await asyncio.gather(*(self.evaluate(session, sem, n) for n in ready))):
+                pending.remove(name)
+                if not outcome.ok or outcome.value is MISSING:
+                    if not nodes[name].optional: return None
+                    continue
+                self.values[name] = outcome.value
+                raw.update(outcome.value)
+            # 선행 노드가 실패한 노드는 평가하지 않음
+            pending = [n for n in pending if all(nodes[d].market_scope or d in self.values or d in pending
+                                                 for d in nodes[n].deps)]
+        return raw
+
+
+def describe_failures(ticker, calls):
+    """OK가 아닌 호출 -> 오류 메시지 (모두 OK면 None)"""
+    failed = [f"{name}={outcome.status}" for name, outcome in calls.items() if not outcome.ok]
+    return f"{ticker} 일부 수집 실패: {', '.join(failed)}" if failed else None
+
+
+async def collect_market_async(tickers, market_fields, columns=None, concurrency=CONCURRENCY, on_collected=None):
+    """시장 전체 종목을 하나의 이벤트 루프에서 동시에 수집 -> [(원본 레코드, 오류 메시지)] (입력 순서 유지)
+    columns는 동기 경로와 같이 필요한 노드만 평가, 시장 단위 노드(개장일)는 먼저 한 번 평가해 공유,
+    on_collected(종목)는 종목 수집이 끝날 때마다 이벤트 루프 스레드에서 호출"""
+    names = required_nodes(market_fields.market, columns)
+    for name in names:
+        if market_fields.nodes[name].market_scope: await asyncio.to_thread(market_fields.get, name)
+    sem = asyncio.Semaphore(concurrency)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async def one(session, ticker):
+        raw, message = await collect_one(session, ticker)
+        if on_collected: on_collected(ticker)
+        return raw, message
+
+    async def collect_one(session, ticker):
+        fields = AsyncTickerFields(market_fields, ticker)
+        try:
+            values = await fields.collect(session, sem, names)
+        except Exception as e:  # 공유 캐시 백엔드 오류 등 노드 밖의 예외
+            return None, f"{ticker} 실패: {type(e).__name__}: {e}"
+        message = describe_failures(ticker, fields.calls)
+        if values is None: return None, message
+        raw = new_raw(ticker, market_fields.market)
+        raw.update(values)
+        raw['columns'] = expand_columns(columns)
+        return raw, message
+
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        return await asyncio.gather(*(one(session, t) for t in tickers))
@@ -0,0 +1,247 @@
+"""알림 엔진: 분석 결과가 갱신될 때마다 규칙을 벡터 연산으로 평가해 기준선 돌파(edge)만 알림
+
+- 규칙: (컬럼, 방향, 기준값, 히스테리시스) -> above/below는 기준선을 넘는 순간 1번 알림하고,
+  히스테리시스 폭만큼 되돌아와야 다시 알림 가능 (기준선 근처에서 오르내릴 때 반복 알림 방지)
+  up/down은 직전 갱신 대비 기준값 넘게 변하면 알림 (투자등급 상향 = 등급 순위 up 0)
+- 상태: (시장, 종목) 위치별 직전 값(float32)과 규칙별 무장 여부(bool) 배열, 규칙 x 종목 행렬로 한 번에 계산
+- 처음 관측한 값은 상태만 기록하고 알림하지 않음 (규칙을 바꾸면 상태를 새로 시작)
+- 전달: 교체 가능한 싱크 (JSON Lines 파일, 웹훅, 화면 토스트용 메모리 큐)
+"""
+import json
+import os
+import pickle
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from . import clients
+from .config import CACHE_DIR
+from .model import GRADE_LABELS
+
+ALERTS_PATH = "alerts.json"                                   # 사용자 정의 규칙
+ALERT_LOG = "alerts.jsonl"                                     # 파일 싱크 기본 경로
+ALERT_STATE = os.path.join(CACHE_DIR, "alerts", "state.pkl")   # 배치 실행 간 상태 (python -m dashboard run --alerts)
+MEMORY_ALERTS = 200                                            # 메모리 싱크가 보관하는 최근 알림 수
+
+OPS = {'above': 1, 'below': -1, 'up': 1, 'down': -1}  # 방향 부호
+CROSS_OPS = ('above', 'below')                        # 기준선 돌파 (히스테리시스 적용), 나머지는 직전 대비 변화
+
+
+class Rule:
+    """알림 규칙 1개 (market이 None이면 모든 시장)"""
+    __slots__ = ('name', 'column', 'op', 'threshold', 'hysteresis', 'market')
+
+    def __init__(self, name, column, op, threshold=0.0, hysteresis=0.0, market=None):
+        if op not in OPS: raise ValueError(f"지원하지 않는 방향: {op} ({'/'.join(OPS)})")
+        self.name, self.column, self.op = name, column, op
+        self.threshold, self.hysteresis, self.market = float(threshold), float(hysteresis), market
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def key(self):
+        return tuple(self.to_dict().values())
+
+
+def default_rules(market, min_drop, min_up, max_rsi=0):
+    """필터 기준에서 만든 기본 규칙: 등급 상향, 하락률/상승여력 기준 도달, RSI 과매도 진입"""
+    rules = [Rule("투자등급 상향", '투자등급', 'up', 0, market=market),
+             Rule(f"고점대비 -{min_drop}% 도달", '고점대비 (%)', 'below', -min_drop, 2, market),
+             Rule(f"상승여력 {min_up}% 도달", '상승여력 (%)', 'above', min_up, 2, market)]
+    if max_rsi: rules.append(Rule(f"RSI {max_rsi} 이하", 'RSI(14)', 'below', max_rsi, 5, market))
+    return rules
+
+
+def load_rules(path=ALERTS_PATH):
+    """사용자 정의 규칙 (파일이 없으면 빈 목록)"""
+    if not os.path.exists(path): return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [Rule(**rule) for rule in json.load(f)]
+
+
+def save_rules(rules, path=ALERTS_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([rule.to_dict() for rule in rules], f, ensure_ascii=False, indent=2)
+
+
+def column_values(df, column):
+    """결과 컬럼 -> float64 배열 (투자등급은 등급 순위 0~4, 값이 없거나 숫자가 아니면 NaN)"""
+    if column not in df: return np.full(len(df), np.nan)
+    if column == '투자등급':
+        codes = pd.Categorical(df[column].astype(object), categories=GRADE_LABELS).codes.astype(np.float64)
+        codes[codes < 0] = np.nan
+        return codes
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+
+
+def format_value(column, value):
+    """알림에 싣는 값 (투자등급은 등급 이름, 나머지는 소수 둘째 자리)"""
+    if value != value: return "N/A"
+    return GRADE_LABELS[int(value)] if column == '투자등급' else round(value, 2)
+
+
+# ==============================================================================
+# 평가
+# ==============================================================================
+class AlertEngine:
+    """규칙 묶음 1개의 상태: 종목 위치(keys), 컬럼별 직전 값(prev), 돌파 규칙별 무장 여부(armed)
+    규칙은 돌파(above/below)와 변화(up/down) 두 묶음으로 나눠 묶음마다 규칙 x 종목 행렬로 계산"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.columns = list(dict.fromkeys(r.column for r in self.rules))
+        self.markets = sorted({r.market for r in self.rules if r.market})
+        self.groups = {}  # 'cross'/'delta' -> 규칙 번호, 컬럼 위치, 부호, 기준값, 히스테리시스, 시장 코드 (열 벡터)
+        for kind, members in [('cross', [i for i, r in enumerate(self.rules) if r.op in CROSS_OPS]),
+                              ('delta', [i for i, r in enumerate(self.rules) if r.op not in CROSS_OPS])]:
+            rules_ = [self.rules[i] for i in members]
+            column = lambda values, dtype=np.float32: np.array(values, dtype=dtype).reshape(-1, 1)
+            self.groups[kind] = {
+                'rules': np.array(members, dtype=np.intp),
+                'col': np.array([self.columns.index(r.column) for r in rules_], dtype=np.intp),
+                'sign': column([OPS[r.op] for r in rules_]), 'threshold': column([r.threshold for r in rules_]),
+                'hysteresis': column([r.hysteresis for r in rules_]),
+                'market': column([self.markets.index(r.market) if r.market else -1 for r in rules_], np.int16),
+                'mask': np.empty((len(members), 0), dtype=bool),  # 시장 일치 여부 (종목이 늘 때만 다시 계산)
+            }
+        self.keys = pd.MultiIndex.from_tuples([], names=['시장', '종목'])
+        self.names = np.empty(0, dtype=object)
+        self.prev = np.empty((len(self.columns), 0), dtype=np.float32)
+        self.armed = np.empty((len(self.groups['cross']['rules']), 0), dtype=bool)
+
+    def key(self):
+        return tuple(r.key() for r in self.rules)
+
+    def _positions(self, df):
+        """결과 행 -> 상태 배열 위치 (처음 보는 종목은 배열 끝에 추가)"""
+        keys = pd.MultiIndex.from_arrays([df['시장'].astype(str).to_numpy(), df['종목'].astype(str).to_numpy()])
+        pos = self.keys.get_indexer(keys)
+        new = pos < 0
+        if new.any():
+            added = keys[new].unique()
+            self.keys = self.keys.append(added)
+            grow = len(added)
+            self.names = np.concatenate([self.names, np.array(added.get_level_values(1), dtype=object)])
+            self.prev = np.hstack([self.prev, np.full((len(self.columns), grow), np.nan, dtype=np.float32)])
+            self.armed = np.hstack([self.armed, np.ones((len(self.armed), grow), dtype=bool)])
+            market = pd.Categorical(self.keys.get_level_values(0), categories=self.markets).codes
+            for group in self.groups.values():
+                group['mask'] = (group['market'] < 0) | (group['market'] == market[None, :])
+            pos = self.keys.get_indexer(keys)
+        return pos
+
+    def evaluate(self, df, now=None):
+        """갱신된 결과 DataFrame(시장/종목 컬럼 필요) -> 새로 발생한 알림 dict 목록 (결과에 없는 종목은 상태 유지)"""
+        if df is None or df.empty or not self.rules: return []
+        pos = self._positions(df)
+        if '기업명' in df: self.names[pos] = df['기업명'].astype(object).to_numpy()
+
+        # 컬럼 x 전체 종목 값 행렬 (이번 결과에 없는 종목은 NaN: 비교 결과가 모두 False라 상태 변화 없음)
+        current = np.full(self.prev.shape, np.nan, dtype=np.float32)
+        for i, column in enumerate(self.columns): current[i, pos] = column_values(df, column)
+        fired = []
+        with np.errstate(invalid='ignore'):
+            # 돌파: 무장 상태에서 기준선을 넘으면 알림 후 해제, 히스테리시스 폭만큼 되돌아오면 다시 무장
+            g = self.groups['cross']
+            if len(g['rules']):
+                distance = g['sign'] * (current[g['col']] - g['threshold'])
+                beyond = distance > 0
+                hit = self.armed & beyond & ~np.isnan(self.prev[g['col']]) & g['mask']  # 처음 관측한 값은 알림 없음
+                self.armed = (self.armed & ~beyond) | (distance < -g['hysteresis'])
+                fired.append((g, hit))
+            # 변화: 직전 갱신 대비 기준값 넘게 오르거나(up) 내리면(down) 알림
+            g = self.groups['delta']
+            if len(g['rules']):
+                fired.append((g, (g['sign'] * (current[g['col']] - self.prev[g['col']]) > g['threshold']) & g['mask']))
+        events = [event for g, hit in fired for event in self._events(g, hit, current, now)]
+        self.prev = np.where(np.isnan(current), self.prev, current)
+        return events
+
+    def _events(self, group, hit, current, now):
+        rows, cols = np.nonzero(hit)
+        if not len(rows): return []
+        at = (now or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+        markets, tickers = self.keys.get_level_values(0).to_numpy()[cols], self.keys.get_level_values(1).to_numpy()[cols]
+        columns = group['col'][rows]
+        values = current[columns, cols].astype(np.float64).tolist()
+        prevs = self.prev[columns, cols].astype(np.float64).tolist()
+        events = []
+        for rule_no, market, ticker, name, value, prev in zip(group['rules'][rows], markets, tickers, self.names[cols], values, prevs):
+            rule = self.rules[rule_no]
+            events.append({'시각': at, '규칙': rule.name, '시장': market, '종목': ticker, '기업명': name, '컬럼': rule.column,
+                           '값': format_value(rule.column, value), '이전값': format_value(rule.column, prev), '기준': rule.threshold})
+        return events
+
+    def save(self, path=ALERT_STATE):
+        """배치 실행 간 상태 저장 (규칙이 같을 때만 load로 이어서 사용)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, rules, path=ALERT_STATE):
+        """저장된 상태가 같은 규칙이면 이어서, 아니면 새 상태"""
+        engine = cls(rules)
+        try:
+            with open(path, "rb") as f: saved = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError): return engine  # 파일 없음/손상, 이전 버전 클래스
+        return saved if isinstance(saved, cls) and saved.key() == engine.key() else engine
+
+
+def alert_message(alert):
+    """알림 dict -> 한 줄 메시지"""
+    return f"{alert['기업명']}({alert['종목']}) {alert['규칙']}: {alert['컬럼']} {alert['이전값']} → {alert['값']}"
+
+
+# ==============================================================================
+# 전달 (싱크): send(alerts)만 구현하면 교체 가능
+# ==============================================================================
+class FileSink:
+    """JSON Lines 파일에 누적"""
+
+    def __init__(self, path=ALERT_LOG):
+        self.path = path
+
+    def send(self, alerts):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for alert in alerts: f.write(json.dumps(alert, ensure_ascii=False, default=str) + "\n")
+
+
+class WebhookSink:
+    """웹훅 URL로 {"alerts": [...]} POST (Slack/Discord 등 수신 측 형식 변환은 중계 서버 몫)"""
+
+    def __init__(self, url, timeout=5):
+        self.url, self.timeout = url, timeout
+
+    def send(self, alerts):
+        clients.get_session().post(self.url, json={'alerts': alerts}, timeout=self.timeout).raise_for_status()
+
+
+class MemorySink:
+    """최근 알림 보관 (화면 토스트/목록 표시용, drain()으로 새 알림만 가져감)"""
+
+    def __init__(self, maxlen=MEMORY_ALERTS):
+        self.recent = deque(maxlen=maxlen)
+        self.pending = []
+
+    def send(self, alerts):
+        self.recent.extend(alerts)
+        self.pending.extend(alerts)
+
+    def drain(self):
+        pending, self.pending = self.pending, []
+        return pending
+
+
+def dispatch(alerts, sinks):
+    """모든 싱크에 전달 -> 실패한 싱크의 오류 메시지 목록 (한 싱크의 실패가 다른 싱크를 막지 않음)"""
+    errors = []
+    if not alerts: return errors
+    for sink in sinks:
+        try:
+            sink.send(alerts)
+        except Exception as e:
+            errors.append(f"{type(sink).__name__} 전달 실패: {e}")
+    return errors
@@ -0,0 +1,139 @@
+"""투자등급 규칙 백테스트: 과거 스냅샷 패널에 classify 규칙을 (파라미터 x 일자 x 종목)으로 벡터화 적용
+
+- 규칙 항목별로 파라미터 값마다 (일자 x 종목) 점수 배열을 한 번만 계산하고, 조합은 배열 합으로 구성
+- 점수는 0.5점 단위를 정수로 다루기 위해 2배(half point)로 저장 -> int8 합산
+- 파라미터 조합은 묶음(chunk)으로 나눠 프로세스 풀에서 병렬 실행 (패널 배열은 워커당 한 번만 전달)
+- 과거 뉴스 감성은 저장되어 있지 않으므로 감성 가점(+0.5)은 제외
+- 순이익률 추세 가점(margin_trend)은 선택 기준(기본 꺼짐)이고 과거 분기 시계열 스냅샷이 없으므로 제외
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from .model import GRADE_LABELS
+
+DEFAULT_GRID = {
+    'max_per': [10, 15, 20, 25],
+    'min_up': [50, 60, 70, 80],
+    'min_drop': [20, 30, 40],
+    'min_div': [2.0, 3.0, 4.0],
+}
+DEFAULT_HORIZONS = [5, 20, 60]  # 보유 기간 (거래일)
+PARAM_CHUNK = 16                # 워커 한 번에 넘기는 파라미터 조합 수
+TOP_GRADE = 2                   # 요약 시 '상위 등급'으로 보는 최소 등급 (🔥🔥 적극 매수 이상)
+
+
+def forward_returns(close, horizon):
+    """horizon 거래일 뒤 수익률 (%) 배열 (기간이 남지 않은 마지막 구간은 NaN)"""
+    out = np.full(close.shape, np.nan, dtype='float32')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[:-horizon] = (close[horizon:] / close[:-horizon] - 1) * 100
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def rule_terms(panel, grid):
+    """규칙 항목별 {파라미터 값: (일자 x 종목) int8 half point 점수} (classify의 한국 주식 규칙과 동일)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drop = np.round(np.where(panel.high != 0, (panel.close / panel.high - 1) * 100, 0), 2)
+        up = np.round(np.where(panel.high != panel.low, (panel.high - panel.close) / (panel.high - panel.low) * 100, 0), 2)
+    per, sec_per, div = np.round(panel.per, 2), np.round(panel.sec_per, 2), np.round(panel.div, 2)
+    below_sector = (per > 0) & (per <= sec_per)
+
+    def half_points(mask, points=2):
+        return np.where(mask, points, 0).astype('int8')
+
+    return {
+        'max_per': {v: np.where(below_sector, 2, half_points((per > 0) & (per <= v), 1)).astype('int8') for v in grid['max_per']},
+        'min_up': {v: half_points(up >= v) for v in grid['min_up']},
+        'min_drop': {v: half_points(drop <= -v) for v in grid['min_drop']},
+        'min_div': {v: half_points(div >= v) for v in grid['min_div']},
+    }
+
+
+def grade_codes(terms, max_per, min_up, min_drop, min_div):
+    """한 파라미터 조합의 (일자 x 종목) 등급 코드 (0=관망 ... 4=초초적극 매수)"""
+    score = terms['max_per'][max_per] + terms['min_up'][min_up] + terms['min_drop'][min_drop] + terms['min_div'][min_div]
+    return np.minimum(score // 2, len(GRADE_LABELS) - 1)
+
+
+# 워커 프로세스 전역 상태 (initializer로 한 번만 채움)
+_TERMS = None
+_TARGETS = None
+
+
+def _init_worker(terms, targets):
+    global _TERMS, _TARGETS
+    _TERMS, _TARGETS = terms, targets
+
+
+def _score_chunk(combos):
+    """파라미터 조합 묶음 -> (조합, 기간, 등급)별 [표본수, 수익률 합, 상승 횟수] 배열"""
+    n_grades = len(GRADE_LABELS)
+    out = np.zeros((len(combos), len(_TARGETS), n_grades, 3))
+    for i, combo in enumerate(combos):
+        grades = grade_codes(_TERMS, *combo).ravel()
+        for j, (index, returns, wins) in enumerate(_TARGETS):
+            g = grades[index]
+            out[i, j, :, 0] = np.bincount(g, minlength=n_grades)
+            out[i, j, :, 1] = np.bincount(g, weights=returns, minlength=n_grades)
+            out[i, j, :, 2] = np.bincount(g, weights=wins, minlength=n_grades)
+    return out
+
+
+def run_backtest(panel, grid=None, horizons=None, processes=0, chunk_size=PARAM_CHUNK):
+    """그리드 전체 백테스트 -> 파라미터 x 기간 x 등급별 표본수/평균수익률/승률 DataFrame"""
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    horizons = horizons or DEFAULT_HORIZONS
+    terms = rule_terms(panel, grid)
+    # 기간별로 수익률이 있는 칸의 평탄화 위치/값/상승 여부만 보관 (조합마다 NaN 마스킹을 반복하지 않음)
+    targets = []
+    for h in horizons:
+        fwd = forward_returns(panel.close, h).ravel()
+        index = np.flatnonzero(~np.isnan(fwd))
+        returns = fwd[index].astype('float64')
+        targets.append((index, returns, (returns > 0).astype('float64')))
+
+    combos = list(product(grid['max_per'], grid['min_up'], grid['min_drop'], grid['min_div']))
+    chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+    if processes > 0:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(terms, targets)) as pool:
+            stats = np.concatenate(list(pool.map(_score_chunk, chunks)))
+    else:
+        _init_worker(terms, targets)
+        stats = np.concatenate([_score_chunk(chunk) for chunk in chunks])
+
+    n_grades = len(GRADE_LABELS)
+    index = pd.MultiIndex.from_product([range(len(combos)), horizons, range(n_grades)], names=['조합', '기간(일)', '등급'])
+    flat = stats.reshape(-1, 3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = pd.DataFrame({
+            '표본수': flat[:, 0].astype('int64'),
+            '평균수익률 (%)': flat[:, 1] / flat[:, 0],
+            '승률 (%)': flat[:, 2] / flat[:, 0] * 100,
+        }, index=index).reset_index()
+    params = pd.DataFrame(combos, columns=['max_per', 'min_up', 'min_drop', 'min_div'])
+    result = params.join(result.set_index('조합'), how='right').reset_index(drop=True)
+    result['투자등급'] = pd.Categorical.from_codes(result.pop('등급'), categories=GRADE_LABELS, ordered=True)
+    return result
+
+
+def summarize(result, horizon):
+    """조합별 상위 등급(TOP_GRADE 이상) 평균수익률과 전체 평균 대비 초과수익 -> 초과수익 내림차순"""
+    df = result[result['기간(일)'] == horizon]
+    keys = ['max_per', 'min_up', 'min_drop', 'min_div']
+    top = df[df['투자등급'].cat.codes >= TOP_GRADE]
+    weighted = df.assign(합=df['평균수익률 (%)'].fillna(0) * df['표본수'])
+    top_weighted = top.assign(합=top['평균수익률 (%)'].fillna(0) * top['표본수'])
+    all_stats = weighted.groupby(keys)[['합', '표본수']].sum()
+    top_stats = top_weighted.groupby(keys)[['합', '표본수']].sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        summary = pd.DataFrame({
+            '상위등급 표본수': top_stats['표본수'],
+            '상위등급 평균수익률 (%)': top_stats['합'] / top_stats['표본수'],
+            '전체 평균수익률 (%)': all_stats['합'] / all_stats['표본수'],
+        })
+    summary['초과수익 (%p)'] = summary['상위등급 평균수익률 (%)'] - summary['전체 평균수익률 (%)']
+    return summary.sort_values('초과수익 (%p)', ascending=False).reset_index()
@@ -0,0 +1,102 @@
+"""종목별 일봉 저장소: 최근 일봉 + 52주 고점/저점 인덱스를 함께 보관하고 마지막 반영일 이후만 증분 수집
+
+- 완성 기준: 시장별 현지 시각으로 그날 봉이 끝난 뒤에만 저장 (미국은 뉴욕 장 마감, 코인은 업비트 일봉 경계 09:00 KST)
+- 마지막으로 확인한 기준일을 함께 보관 -> 주말/휴장일에도 같은 기준일은 다시 조회하지 않음
+"""
+import copy
+import os
+import pickle
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from .config import CACHE_DIR
+from .extremes import RollingExtremes
+from .providers import BAR_COLUMNS, BAR_FETCHERS
+
+BARS_DIR = os.path.join(CACHE_DIR, "bars")
+HISTORY_BARS = 260  # 보관 일봉 수 (약 1년, 가장 긴 지표 구간 60일의 4배 이상)
+
+# 시장별 (시간대, 일봉 날짜 0시부터 봉이 완성되는 시각까지의 간격)
+SESSION_CLOSE = {
+    'kr': ("Asia/Seoul", timedelta(hours=18)),                   # 정규장 15:30 마감 + 시간외 거래 종료
+    'us': ("America/New_York", timedelta(hours=16, minutes=30)),  # 정규장 16:00 마감 + 종가 확정 여유
+    'crypto': ("Asia/Seoul", timedelta(days=1, hours=9)),         # 업비트 D일 일봉은 D+1일 09:00 KST까지
+}
+
+
+def history_path(market, ticker):
+    return os.path.join(BARS_DIR, f"{market}_{ticker}.pkl")
+
+
+def empty_bars():
+    return pd.DataFrame({col: pd.Series(dtype='float64') for col in BAR_COLUMNS}, index=pd.DatetimeIndex([]))
+
+
+def _read(market, ticker):
+    """저장된 (52주 인덱스, 일봉, 마지막 확인 기준일 또는 None) (없거나 형식이 다르면 빈 값)"""
+    try:
+        with open(history_path(market, ticker), "rb") as f:
+            ext, bars, *checked = pickle.load(f)  # 확인 기준일이 없는 이전 형식도 읽음
+        if isinstance(ext, RollingExtremes) and isinstance(bars, pd.DataFrame): return ext, bars, next(iter(checked), None)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        pass
+    return RollingExtremes(), empty_bars(), None
+
+
+def load_history(market, ticker):
+    """저장된 (52주 인덱스, 일봉) 로드 (없거나 형식이 다르면 빈 값)"""
+    return _read(market, ticker)[:2]
+
+
+def save_history(market, ticker, ext, bars, checked=None):
+    """임시 파일에 기록 후 교체 (동시 실행 중 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)"""
+    os.makedirs(BARS_DIR, exist_ok=True)
+    path = history_path(market, ticker)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump((ext, bars, checked), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def last_closed_day(market='kr', now=None):
+    """시장 현지 시각 기준으로 봉이 완성된 마지막 날짜 (장중/미완성 봉은 계속 바뀌므로 보관하지 않음)
+    now: 시간대가 있는 기준 시각 (None이면 현재)"""
+    zone, close = SESSION_CLOSE[market]
+    now = pd.Timestamp.now(tz=zone) if now is None else pd.Timestamp(now).tz_convert(zone)
+    return (now.tz_localize(None) - close).strftime("%Y%m%d")
+
+
+def update_history(market, ticker, latest_day=None, one_year_ago=None):
+    """일봉 저장소를 latest_day(시장의 마지막 완성일로 제한)까지 갱신 -> (RollingExtremes, 최근 일봉 DataFrame)
+    이미 확인한 기준일은 다시 조회하지 않으므로, 같은 기준일 재실행(주말/휴장일 포함)은 시세 API 호출 없이 O(1) 조회
+    미완성 봉을 저장하면 마지막 반영일이 그날이 되어 다시 받지 않으므로 완성된 봉만 저장"""
+    closed = last_closed_day(market)
+    latest_day = min(latest_day or closed, closed)
+    one_year_ago = one_year_ago or (datetime.strptime(latest_day, "%Y%m%d") - timedelta(days=365)).strftime("%Y%m%d")
+    ext, bars, checked = _read(market, ticker)
+    if checked is not None and checked >= latest_day: return ext, bars
+    start = one_year_ago
+    if ext.last_date is not None:
+        start = max(start, (ext.last_date + timedelta(days=1)).strftime("%Y%m%d"))
+    if start <= latest_day:
+        new = BAR_FETCHERS[market](ticker, start, latest_day)
+        if ext.last_date is not None: new = new[new.index > ext.last_date]
+        if ext.extend(new): bars = pd.concat([bars, new.astype('float64')]).iloc[-HISTORY_BARS:]
+    save_history(market, ticker, ext, bars, latest_day)  # 새 봉이 없어도 확인 기준일은 기록 (휴장일 재조회 방지)
+    return ext, bars
+
+
+def update_kr_extremes(ticker, latest_day, one_year_ago):
+    """한국 주식 52주 고점/저점 인덱스 + 일봉 -> (RollingExtremes, 일봉) (시세가 없으면 ValueError)
+    저장소에는 완성된 일봉만 두고, 기준일이 오늘(장중)이면 당일 봉을 매번 새로 받아 반환 값에만 반영 (현재가 = 당일 시세)"""
+    ext, bars = update_history('kr', ticker, latest_day, one_year_ago)
+    if latest_day > last_closed_day('kr'):
+        live = BAR_FETCHERS['kr'](ticker, latest_day, latest_day)
+        if len(live):
+            ext = copy.deepcopy(ext)  # 저장된 인덱스는 그대로 두고 사본에만 당일 봉 추가
+            ext.extend(live)
+            bars = pd.concat([bars, live.astype('float64')]).iloc[-HISTORY_BARS:]
+    if ext.empty:
+        raise ValueError(f"{datetime.strptime(latest_day, '%Y%m%d'):%Y-%m-%d} 이전 1년 시세 없음")
+    return ext, bars
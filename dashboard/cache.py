@@ -0,0 +1,187 @@
+"""세션/프로세스 공유 캐시: 신선도 창(TTL) 안의 같은 요청은 한 번만 수집하고 동시 요청은 하나로 합류
+
+- memory: 프로세스 전역 dict (Streamlit 서버 하나에서 여러 브라우저 세션이 공유)
+- sqlite: 로컬 SQLite 파일 (Streamlit 워커 여러 개가 같은 머신에서 공유), 프로세스 간에도 임대(lease)로 합류
+- off: 캐시 없이 매번 계산
+같은 프로세스 안의 동시 요청은 백엔드와 무관하게 Event로 합류 (single-flight)
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+
+from .config import CACHE_BACKEND, CACHE_DIR
+
+SQLITE_PATH = os.path.join(CACHE_DIR, "shared.sqlite")
+LEASE_SEC = 60          # 다른 프로세스가 계산 중인 키를 기다리는 최대 시간 (계산 프로세스가 죽은 경우 대비)
+POLL_SEC = 0.1          # 다른 프로세스의 계산 완료 확인 간격
+PURGE_EVERY = 200       # 저장 N회마다 만료 항목 정리
+
+
+class SharedCache:
+    """TTL 캐시 + 요청 합류: get_or_compute(key, ttl, compute) (비동기 수집 경로는 lookup/put)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> threading.Event (이 프로세스에서 계산 중)
+        self.stats = {'hit': 0, 'miss': 0, 'coalesced': 0}
+
+    # 백엔드 구현 대상 -------------------------------------------------------
+    def _load(self, key):
+        """-> (적중 여부, 값)"""
+        return False, None
+
+    def _store(self, key, value, ttl):
+        pass
+
+    def _acquire(self, key):
+        """다른 프로세스와의 계산 임대 (프로세스 간 공유가 없는 백엔드는 항상 True)"""
+        return True
+
+    def _release(self, key):
+        pass
+
+    # 공통 로직 ---------------------------------------------------------------
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def lookup(self, key):
+        """-> (적중 여부, 값): 계산/합류 없이 조회만 (비동기 수집 경로에서 사용)"""
+        hit, value = self._load(key)
+        if hit: self._count('hit')
+        return hit, value
+
+    def put(self, key, value, ttl):
+        """lookup에서 빠진 값을 호출자가 직접 수집한 뒤 저장"""
+        self._count('miss')
+        self._store(key, value, ttl)
+
+    def get_or_compute(self, key, ttl, compute):
+        """캐시 값 반환, 없으면 한 호출자만 compute()를 실행하고 나머지는 결과를 기다림 (예외는 저장하지 않음)"""
+        while True:
+            hit, value = self._load(key)
+            if hit:
+                self._count('hit')
+                return value
+            with self._lock:
+                event = self._inflight.get(key)
+                owner = event is None
+                if owner: event = self._inflight[key] = threading.Event()
+            if not owner:
+                self._count('coalesced')
+                event.wait()
+                continue  # 계산한 쪽이 실패했으면 다시 시도
+            try:
+                if not self._acquire(key):
+                    continue  # 다른 프로세스가 먼저 계산 완료 (또는 임대 만료)
+                try:
+                    self._count('miss')
+                    value = compute()
+                    self._store(key, value, ttl)
+                    return value
+                finally:
+                    self._release(key)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key).set()
+
+
+class MemoryCache(SharedCache):
+    """프로세스 전역 메모리 캐시"""
+
+    def __init__(self):
+        super().__init__()
+        self._data = {}
+        self._stores = 0
+
+    def _load(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+        if entry and entry[0] > time.time(): return True, entry[1]
+        return False, None
+
+    def _store(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._data[key] = (now + ttl, value)
+            self._stores += 1
+            if self._stores % PURGE_EVERY == 0:
+                self._data = {k: e for k, e in self._data.items() if e[0] > now}
+
+
+class SQLiteCache(SharedCache):
+    """SQLite 파일 캐시: 값은 pickle, 프로세스 간 계산 중복은 leases 테이블로 방지"""
+
+    def __init__(self, path=SQLITE_PATH):
+        super().__init__()
+        self.path = path
+        self._stores = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, expires REAL, value BLOB)")
+            conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, expires REAL)")
+
+    @contextmanager
+    def _connect(self):
+        """블록이 끝나면 커밋(예외면 롤백)하고 연결을 닫음"""
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            yield conn
+
+    def _load(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM entries WHERE key = ? AND expires > ?", (repr(key), time.time())).fetchone()
+        return (True, pickle.loads(row[0])) if row else (False, None)
+
+    def _store(self, key, value, ttl):
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (repr(key), now + ttl, blob))
+            self._stores += 1
+            if self._stores % PURGE_EVERY == 0:
+                conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+
+    def _acquire(self, key):
+        """임대를 얻으면 True, 다른 프로세스가 계산을 끝냈거나 임대가 만료되면 False (호출자가 다시 조회)"""
+        while True:
+            now = time.time()
+            with self._connect() as conn:
+                conn.execute("DELETE FROM leases WHERE key = ? AND expires <= ?", (repr(key), now))
+                if conn.execute("INSERT OR IGNORE INTO leases VALUES (?, ?)", (repr(key), now + LEASE_SEC)).rowcount:
+                    return True
+            time.sleep(POLL_SEC)
+            if self._load(key)[0]:
+                self._count('coalesced')
+                return False
+
+    def _release(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE key = ?", (repr(key),))
+
+
+class NoCache(SharedCache):
+    """캐시 사용 안 함 (같은 프로세스의 동시 요청 합류만 유지)"""
+
+
+BACKENDS = {'memory': MemoryCache, 'sqlite': SQLiteCache, 'off': NoCache}
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """설정(CACHE_BACKEND)에 맞는 프로세스 전역 캐시"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = BACKENDS.get(CACHE_BACKEND, MemoryCache)()
+        return _shared
+
+
+def use_cache(cache):
+    """공유 캐시 교체 (테스트/배치 실행에서 백엔드 지정용)"""
+    global _shared
+    _shared = cache
@@ -0,0 +1,28 @@
+"""공유 HTTP 세션: 프로세스 전체에서 커넥션 풀을 재사용 (요청마다 TCP/TLS 연결을 새로 맺지 않음)"""
+import requests
+from requests.adapters import HTTPAdapter
+
+_session = None
+
+
+def new_session(pool_size=32):
+    """호스트별 커넥션 풀 크기를 지정한 requests 세션 생성 (병렬 수집 스레드 수 이상 권장)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """공유 세션 반환 (최초 호출 시 생성)"""
+    global _session
+    if _session is None:
+        _session = new_session()
+    return _session
+
+
+def use_session(session):
+    """외부에서 만든 세션을 공유 세션으로 지정 (Streamlit에서는 st.cache_resource로 만든 세션 주입)"""
+    global _session
+    _session = session
@@ -0,0 +1,24 @@
+"""대시보드 공통 설정: API 인증 정보, 로컬 저장 경로, 분석 대상 시장"""
+import os
+
+# API 인증 정보 (환경 변수가 있으면 우선 사용)
+NAVER_CLIENT_ID = os.environ.get("NAVER_CLIENT_ID", "UtJVnNmIIhf5KLF4Wssx")
+NAVER_CLIENT_SECRET = os.environ.get("NAVER_CLIENT_SECRET", "RWqDMr5avj")
+FINNHUB_API_KEY = os.environ.get("FINNHUB_API_KEY", "d5ghto1r01ql4f48gcrgd5ghto1r01ql4f48gcs0")
+
+# 로컬 저장 경로
+HISTORY_DIR = "history"
+CACHE_DIR = "cache"  # 재계산 가능한 데이터 (삭제해도 다음 실행 시 다시 수집)
+
+# 종목 수집 결과 공유 캐시: memory(서버 프로세스 하나) / sqlite(같은 머신의 여러 워커) / off
+CACHE_BACKEND = os.environ.get("DASHBOARD_CACHE", "memory")
+
+# 전체 모드에서 함께 분석하는 시장 (portfolio_{market}.json)
+MARKETS = ['kr', 'us', 'crypto']
+
+# 저장된 분석 결과를 새로 고침 없이 그대로 보여줄 수 있는 시간 (초): 초과 시 먼저 보여주고 백그라운드에서 갱신
+FRESHNESS_BUDGET = {
+    'kr': 30 * 60,      # 일봉/펀더멘털 기반이라 장중에도 변화가 느림
+    'us': 15 * 60,
+    'crypto': 2 * 60,   # 24시간 거래, 변동이 빠름
+}
@@ -0,0 +1,249 @@
+"""분석 엔진: 종목별 수집 -> 점수 산정 -> 투자등급 부여 (Streamlit 의존성 없음)"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+
+import numpy as np
+import pandas as pd
+
+from .fields import MarketFields, TickerFields, expand_columns, required_nodes, trading_day_values
+from .fundamentals import TREND_COLUMNS, trend_columns
+from .indicators import indicator_columns
+from .model import GRADE_LABELS, ResultBuffer, compact_frame
+from .news import extract_keywords, score_news
+from .portfolio import parse_tickers, thresholds_of
+from .providers import parse_kr_indicators
+from .sectors import EMPTY_SECTOR, record_us_observations
+
+
+SCORE_BATCH_SIZE = 16  # 프로세스 풀로 보내는 원본 레코드 묶음 크기 (pickle/IPC 비용 분산)
+
+
+def new_raw(ticker, market):
+    """원본 레코드 기본값 (수집 단계에서 시장별로 채움)"""
+    return {'시장': market, '종목': ticker, 'PER': 0, 'PBR': 0, '배당률 (%)': 0, '24시간 변동률 (%)': 0, 'html': None, 'bars': None,
+            'news': None, 'columns': None, **EMPTY_SECTOR}
+
+
+def collect_ticker(ticker, market, latest_day=None, one_year_ago=None, columns=None, market_fields=None, failures=None):
+    """수집 단계(네트워크 I/O): 필드 그래프에서 요청 컬럼에 필요한 노드만 평가 -> 원본 레코드(dict), 데이터가 없으면 None
+    columns가 None이면 전체 컬럼, market_fields를 주면 개장일 등 시장 단위 노드를 다른 종목과 공유,
+    failures(dict)를 주면 실패해도 분석을 계속하는 노드(뉴스 등)의 오류를 기록"""
+    if market_fields is None:
+        market_fields = MarketFields(market, {'trading_day': trading_day_values(latest_day, one_year_ago)} if latest_day else None)
+    values = TickerFields(market_fields, ticker).collect(required_nodes(market, columns), failures)
+    if values is None: return None
+    raw = new_raw(ticker, market)
+    raw.update(values)
+    raw['columns'] = expand_columns(columns)
+    return raw
+
+
+def finish_ticker(raw):
+    """계산 단계(CPU): 페이지 파싱, 감성 점수, 키워드 추출, 파생 지표 계산 -> 결과 행(dict)"""
+    market, name = raw['시장'], raw['기업명']
+    price, high, low = raw['현재가'], raw['52주 고점'], raw['52주 저점']
+    per, pbr, div, sec_per = raw['PER'], raw['PBR'], raw['배당률 (%)'], raw['업종PER']
+    under_val = "N/A"
+
+    if market == 'kr' and raw['html']:
+        per, pbr, div, sec_per = parse_kr_indicators(raw['html'])
+    if market != 'crypto':
+        # 저평가 여부 로직 (업종 PER이 있는 주식)
+        if per > 0 and sec_per > 0:
+            under_val = "저평가" if per < sec_per else "고평가"
+        elif per > 0 and sec_per == 0 and market == 'kr':
+            under_val = "업종적자"
+
+    # 뉴스 감성 및 핵심 키워드 (뉴스를 수집하지 않았으면 중립, 키워드는 요청된 경우만 추출)
+    want_keywords = raw['columns'] is None or '핵심키워드' in raw['columns']
+    if raw['news'] is None:
+        display_titles, analysis_texts, sentiment_label, s_score = [], [], "N/A", 0
+    else:
+        display_titles, analysis_texts, sentiment_label, s_score = score_news(raw['news'], market)
+    keywords = extract_keywords(analysis_texts, name, market) if want_keywords else []
+
+    # 데이터 취합 (계산 필드 포함)
+    return {
+        '시장': market,
+        '종목': raw['종목'], 
+        '기업명': name, 
+        '현재가': float(price), 
+        '52주 고점': float(high),
+        '52주 저점': float(low),
+        '업종': raw['업종'],
+        'PER': round(float(per), 2), 
+        '업종PER': round(float(sec_per), 2),
+        '저평가여부(PER)': under_val,
+        'PBR': round(float(pbr), 2), 
+        '업종PBR': round(float(raw['업종PBR']), 2),
+        '배당률 (%)': round(float(div), 2),
+        '업종배당률 (%)': round(float(raw['업종배당률 (%)']), 2),
+        '24시간 변동률 (%)': round(float(raw['24시간 변동률 (%)']), 2),
+        '고점대비 (%)': round(((price / high) - 1) * 100, 2) if high != 0 else 0, 
+        '상승여력 (%)': round(((high - price) / (high - low) * 100) if high != low else 0, 2),
+        '뉴스감성': sentiment_label, 
+        '감성점수': s_score, 
+        '최근뉴스': display_titles[0] if display_titles else "최근 뉴스 없음",
+        '핵심키워드': ", ".join(keywords) if keywords else ("데이터 없음" if want_keywords else None)
+    }
+
+
+def analyze_ticker(ticker, market, latest_day=None, one_year_ago=None, columns=None):
+    """단일 종목 분석: 수집 + 계산 -> 결과 행(dict), 데이터가 없으면 None"""
+    raw = collect_ticker(ticker, market, latest_day, one_year_ago, columns)
+    return finish_ticker(raw) if raw else None
+
+
+def _collect_safely(ticker, market, columns, market_fields):
+    """수집 단계 예외를 (원본 레코드, 오류 메시지) 형태로 변환 (일부 노드만 실패했으면 레코드와 실패 노드 목록)
+    (노드 값은 신선도 예산 안에서 세션/워커 간에 공유되고, 동시에 들어온 같은 호출은 한 번만 실행)"""
+    failures = {}
+    try:
+        raw = collect_ticker(ticker, market, columns=columns, market_fields=market_fields, failures=failures)
+    except Exception as e:
+        return None, f"{ticker} 실패: {e}"
+    if not failures: return raw, None
+    return raw, f"{ticker} 일부 수집 실패: {', '.join(f'{name}={error}' for name, error in failures.items())}"
+
+
+def _finish_safely(raw):
+    """계산 단계 예외를 (결과 행, 오류 메시지) 형태로 변환 (프로세스 풀에서 pickle 가능한 최상위 함수)"""
+    if raw is None: return None, None
+    try:
+        return finish_ticker(raw), None
+    except Exception as e:
+        return None, f"{raw['종목']} 실패: {e}"
+
+
+def _reported(tickers, collected, on_progress):
+    """수집 결과를 그대로 넘기면서 종목마다 on_progress 호출 (결과가 나오는 대로, 소비하는 스레드에서)"""
+    for ticker, item in zip(tickers, collected):
+        if on_progress: on_progress(ticker)
+        yield item
+
+
+def analyze_market(tickers, market, on_progress=None, workers=1, score_pool=None, batch_size=SCORE_BATCH_SIZE, use_async=False,
+                   on_row=None, columns=None):
+    """한 시장의 종목들을 분석 -> (결과 DataFrame, 오류 메시지 목록)
+
+    - use_async면 수집 단계를 aiohttp 이벤트 루프 하나에서 실행 (같은 필드 그래프/공유 캐시/미국 시세 failover 체인을 쓰고,
+      호출별 실패 상태가 오류 메시지로 보고됨)
+    - 아니면서 workers > 1이면 수집 단계를 스레드 풀에서 병렬 실행
+    - score_pool(ProcessPoolExecutor)을 주면 계산 단계를 batch_size 단위로 묶어 프로세스 풀에서 실행
+    - 결과와 on_row는 항상 입력 순서, on_progress/on_row는 모두 호출한 스레드에서 호출됨
+    - on_progress(종목)는 그 종목의 수집이 끝날 때마다 호출 (계산 단계/전체 수집 완료를 기다리지 않음)
+      순서: 동기/스레드 풀 수집은 입력 순서 (앞 종목의 수집이 끝나야 보고), 비동기 수집은 수집 완료 순서
+    - on_row는 완성된 결과 행(dict)을 받음 (기술적 지표/추세 컬럼은 전체 종목을 모은 뒤 계산되므로 포함되지 않음)
+    - columns를 주면 그 컬럼(+ 투자등급 산정 입력)에 필요한 수집만 실행하고 나머지 컬럼은 비워 둠
+    """
+    data = ResultBuffer(len(tickers))
+    errors = []
+    # 개장일(pykrx) 등 시장 단위 값은 필요해질 때 한 번만 구해 모든 종목이 공유
+    market_fields = MarketFields(market)
+
+    def collect(ticker):
+        return _collect_safely(ticker, market, columns, market_fields)
+
+    with ExitStack() as stack:
+        if use_async:
+            # 이벤트 루프도 호출한 스레드에서 돌므로 종목 수집이 끝날 때마다 바로 진행 상황 보고 (완료 순서)
+            from .aio import collect_market_async
+            collected = asyncio.run(collect_market_async(tickers, market_fields, columns, on_collected=on_progress))
+        else:
+            if workers > 1:
+                # map은 입력 순서대로 끝나는 대로 내주므로, 풀을 연 채로 아래 루프에서 하나씩 받아 처리
+                pool = stack.enter_context(ThreadPoolExecutor(max_workers=workers))
+                collected = pool.map(collect, tickers)
+            else:
+                collected = map(collect, tickers)
+            collected = _reported(tickers, collected, on_progress)
+
+        if score_pool is not None:
+            # 수집이 끝난 원본을 모아 묶음 단위로 전송 (map은 입력 순서대로 결과 반환)
+            collected = list(collected)
+            finished = score_pool.map(_finish_safely, [raw for raw, _ in collected], chunksize=batch_size)
+            outcomes = zip(collected, finished)
+        else:
+            outcomes = ((c, _finish_safely(c[0])) for c in collected)
+
+        bars_list, done = [], []
+        for ticker, ((raw, collect_error), (row, finish_error)) in zip(tickers, outcomes):
+            if row:
+                data.append(row)
+                bars_list.append(raw['bars'])
+                done.append(ticker)
+                if on_row: on_row(row)
+            if collect_error or finish_error: errors.append(collect_error or finish_error)
+
+    # 기술적 지표는 종목별 루프가 아니라 전체 종목 일봉을 2차원 배열로 쌓아 한 번에 계산 (일봉을 수집한 경우만)
+    if any(bars is not None for bars in bars_list):
+        for col, values in indicator_columns(bars_list).items():
+            data.assign(col, values)
+    # 미국 주식 펀더멘털 추세도 저장된 분기 시계열을 (종목 x 분기) 배열로 쌓아 한 번에 계산
+    wanted = expand_columns(columns)
+    if market == 'us' and done and (wanted is None or wanted & set(TREND_COLUMNS)):
+        for col, values in trend_columns(done).items():
+            data.assign(col, values)
+    df = data.to_frame()
+    if market == 'us':
+        # 이번 분석의 업종/지표를 누적해 다음 분석의 업종 중앙값에 반영
+        try: record_us_observations(df)
+        except (OSError, ValueError) as e:  # 관측값 파일 쓰기 실패/손상: 분석 결과는 그대로 반환
+            errors.append(f"업종 관측값 저장 실패: {type(e).__name__}: {e}")
+    return df, errors
+
+
+def score_pool(processes):
+    """계산 단계용 프로세스 풀 컨텍스트 (processes가 0이면 None을 내주어 현재 프로세스에서 계산)"""
+    return ProcessPoolExecutor(max_workers=processes) if processes > 0 else nullcontext()
+
+
+def analyze_all_markets(portfolios, workers=1, processes=0, use_async=False, columns=None):
+    """시장별 파이프라인을 동시에 실행 -> {market: (결과 DataFrame, 오류 메시지 목록)} (포트폴리오가 없으면 빈 dict)
+    processes > 0이면 세 시장이 하나의 계산용 프로세스 풀을 공유"""
+    if not portfolios: return {}
+    with score_pool(processes) as pool, ThreadPoolExecutor(max_workers=len(portfolios)) as runner:
+        futures = {m: runner.submit(analyze_market, parse_tickers(p['tickers']), m, None, workers, pool,
+                                     use_async=use_async, columns=columns) for m, p in portfolios.items()}
+        return {m: future.result() for m, future in futures.items()}
+
+
+def classify(row, market, max_per, min_up, min_drop, min_div, max_rsi=0, margin_trend=False):
+    """필터 기준 충족 개수로 투자등급 산정 (코인은 PER/배당 기준 제외, max_rsi가 0이면 RSI 기준 미사용,
+    margin_trend가 False이면 순이익률 추세 기준 미사용)"""
+    score = 0
+    if row['고점대비 (%)'] <= -min_drop: score += 1
+    if row['상승여력 (%)'] >= min_up: score += 1
+    if row['감성점수'] > 0: score += 0.5
+    if max_rsi and row.get('RSI(14)', np.nan) <= max_rsi: score += 0.5  # 과매도 구간 가점 (NaN은 비교 결과 False)
+    if margin_trend and row.get('순이익률 추세 (%p)', np.nan) > 0: score += 0.5  # 최근 분기 순이익률 개선 가점 (미국 주식, 이력이 없으면 NaN)
+    
+    if market != 'crypto':
+        # 보강된 로직: PER이 0보다 크고 업종 평균보다 낮으면 가점
+        if 0 < row['PER'] <= row['업종PER']: 
+            score += 1
+        elif 0 < row['PER'] <= max_per: # 업종데이터가 없더라도 설정한 기준보다 낮으면 가점
+            score += 0.5
+        if row['배당률 (%)'] >= min_div: score += 1
+    
+    return GRADE_LABELS[min(int(score), len(GRADE_LABELS) - 1)]
+
+
+def grade_frame(df, market, max_per, min_up, min_drop, min_div, max_rsi=0, margin_trend=False):
+    """시장별 기준으로 투자등급 컬럼 추가 (등급 산정은 dtype 축소 전 float64 원본으로 수행)"""
+    df['투자등급'] = df.apply(classify, axis=1, args=(market, max_per, min_up, min_drop, min_div, max_rsi, margin_trend))
+    return df
+
+
+def run_portfolios(portfolios, workers=1, processes=0, use_async=False, columns=None):
+    """포트폴리오별 분석 + 등급 산정을 한 번에 수행 -> (통합 결과 DataFrame 또는 None, 오류 메시지 목록)
+    각 시장은 해당 포트폴리오 파일에 저장된 기준값으로 등급을 산정"""
+    results = analyze_all_markets(portfolios, workers, processes, use_async, columns)
+    frames, errors = [], []
+    for market, (market_df, market_errors) in results.items():
+        errors += market_errors
+        if not market_df.empty:
+            frames.append(grade_frame(market_df, market, *thresholds_of(portfolios[market], bonus=True)))
+    if not frames: return None, errors
+    return compact_frame(pd.concat(frames, ignore_index=True)), errors
@@ -0,0 +1,116 @@
+"""결과 내보내기: xlsx(스트리밍 작성 + 엑셀 조건부 서식) / CSV / Parquet"""
+import os
+from io import BytesIO
+
+import numpy as np
+
+from .model import GRADE_COLORS
+
+# 형식 키 -> (표시 이름, 파일 확장자, MIME 타입)
+EXPORT_FORMATS = {
+    'xlsx': ("엑셀 (xlsx)", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    'csv': ("CSV", "csv", "text/csv"),
+    'parquet': ("Parquet", "parquet", "application/octet-stream"),
+}
+
+# xlsxwriter가 이름으로 인식하지 못하는 CSS 색상명 -> 16진수 코드
+EXCEL_COLORS = {'darkred': '#8B0000'}
+
+
+def _excel_cell(value):
+    """numpy 스칼라를 xlsxwriter가 기록할 수 있는 파이썬 기본 타입으로 변환"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _add_excel_rules(workbook, sheet, df, thresholds):
+    """필터 기준 하이라이트를 pandas Styler 대신 엑셀 고유의 조건부 서식 규칙으로 추가
+    thresholds: (max_per, min_up, min_drop, min_div) 또는 {시장: 기준값} (시장마다 기준이 다른 전체 결과는 행의 시장 컬럼으로 구분)"""
+    from xlsxwriter.utility import xl_rowcol_to_cell
+
+    last_row = len(df)
+    cols = list(df.columns)
+
+    def add_rule(col, rule):
+        if col in cols:
+            idx = cols.index(col)
+            sheet.conditional_format(1, idx, last_row, idx, rule)
+
+    # 투자등급: 불꽃 개수가 많은 규칙부터 적용하고 일치하면 중단
+    for prefix, (bg, fg) in GRADE_COLORS.items():
+        fmt = workbook.add_format({'bg_color': EXCEL_COLORS.get(bg, bg), 'font_color': fg})
+        add_rule('투자등급', {'type': 'text', 'criteria': 'begins with', 'value': prefix, 'format': fmt, 'stop_if_true': True})
+
+    # 라벨 컬럼: 화면(app.py sentiment_style/UNDERVALUED_STYLES)과 같이 일치 규칙 뒤에 나머지 값의 기본 서식
+    add_rule('뉴스감성', {'type': 'text', 'criteria': 'containing', 'value': '긍정', 'format': workbook.add_format({'bg_color': '#e6f4ea', 'font_color': '#137333'}), 'stop_if_true': True})
+    add_rule('뉴스감성', {'type': 'text', 'criteria': 'containing', 'value': '부정', 'format': workbook.add_format({'bg_color': '#fce8e6', 'font_color': '#c5221f'}), 'stop_if_true': True})
+    add_rule('뉴스감성', {'type': 'no_blanks', 'format': workbook.add_format({'bg_color': '#f1f3f4', 'font_color': '#3c4043'})})
+    add_rule('저평가여부(PER)', {'type': 'text', 'criteria': 'containing', 'value': '저평가', 'format': workbook.add_format({'font_color': 'blue', 'bold': True}), 'stop_if_true': True})
+    add_rule('저평가여부(PER)', {'type': 'text', 'criteria': 'containing', 'value': '고평가', 'format': workbook.add_format({'font_color': 'red'}), 'stop_if_true': True})
+    add_rule('저평가여부(PER)', {'type': 'text', 'criteria': 'containing', 'value': '업종적자', 'format': workbook.add_format({'font_color': '#FFA500'}), 'stop_if_true': True})  # CSS orange (xlsxwriter 'orange'는 #FF6600)
+    add_rule('저평가여부(PER)', {'type': 'no_blanks', 'format': workbook.add_format({'font_color': 'gray'})})
+
+    # 기준값 하이라이트: 시장별 기준이면 규칙마다 시장 조건을 붙임 (시장 컬럼이 없으면 시장별 기준은 적용하지 않음)
+    highlights = {col: workbook.add_format({'bg_color': color}) for col, color in
+                  [('PER', '#d1f7d6'), ('고점대비 (%)', '#d1e0f7'), ('상승여력 (%)', '#fff0b3'), ('배당률 (%)', '#fde2e2')]}
+    market_cell = xl_rowcol_to_cell(1, cols.index('시장'), col_abs=True) if '시장' in cols else None
+    if isinstance(thresholds, dict) and len(thresholds) == 1: thresholds = next(iter(thresholds.values()))  # 단일 시장
+    per_market = thresholds.items() if isinstance(thresholds, dict) else [(None, thresholds)]
+
+    def add_highlight(col, condition, scope):
+        if col in cols:
+            first = xl_rowcol_to_cell(1, cols.index(col))
+            add_rule(col, {'type': 'formula', 'criteria': f'=AND({scope}{condition.format(first)})', 'format': highlights[col]})
+
+    for market, (max_per, min_up, min_drop, min_div) in per_market:
+        if market is not None and market_cell is None: continue
+        scope = "" if market is None else f'{market_cell}="{market}",'
+        add_highlight('PER', f'{{0}}>0,{{0}}<={max_per}', scope)
+        add_highlight('고점대비 (%)', f'{{0}}<={-min_drop}', scope)
+        add_highlight('상승여력 (%)', f'{{0}}>={min_up}', scope)
+        add_highlight('배당률 (%)', f'{{0}}>={min_div}', scope)
+
+
+def build_xlsx(df, thresholds=None):
+    """xlsxwriter constant_memory 모드로 한 행씩 스트리밍 기록 (대용량 결과에서도 메모리 급증 없음)
+    thresholds가 None이 아니면 조건부 서식 추가 (기준값 튜플 또는 {시장: 기준값})"""
+    import xlsxwriter
+
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'nan_inf_to_errors': True})
+    sheet = workbook.add_worksheet('Result')
+    sheet.write_row(0, 0, list(df.columns), workbook.add_format({'bold': True, 'bg_color': '#f0f2f6'}))
+    if thresholds is not None and '저평가여부(PER)' in df:
+        # 화면과 같이 오른쪽 정렬: 정렬은 조건부 서식으로 지정할 수 없어 열 서식으로 (constant_memory라 행 기록 전에 지정)
+        idx = list(df.columns).index('저평가여부(PER)')
+        sheet.set_column(idx, idx, None, workbook.add_format({'align': 'right'}))
+    # constant_memory 모드는 행 순서대로만 기록 가능하므로 itertuples로 위에서부터 순차 작성
+    for r, values in enumerate(df.itertuples(index=False, name=None), start=1):
+        sheet.write_row(r, 0, [_excel_cell(v) for v in values])
+    if thresholds is not None and len(df):
+        _add_excel_rules(workbook, sheet, df, thresholds)
+    sheet.freeze_panes(1, 0)
+    workbook.close()
+    return output.getvalue()
+
+
+def export_bytes(df, fmt, thresholds=None):
+    """결과 DataFrame을 지정 형식(xlsx/csv/parquet)의 파일 내용(bytes)으로 변환"""
+    if fmt == 'xlsx':
+        return build_xlsx(df, thresholds)
+    if fmt == 'csv':
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함 UTF-8
+        return df.to_csv(index=False).encode('utf-8-sig')
+    if fmt == 'parquet':
+        output = BytesIO()
+        df.to_parquet(output, index=False)
+        return output.getvalue()
+    raise ValueError(f"지원하지 않는 형식: {fmt}")
+
+
+def write_result(df, path, thresholds=None):
+    """결과를 파일 확장자에 맞는 형식으로 저장"""
+    fmt = os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} (xlsx/csv/parquet)")
+    with open(path, "wb") as f:
+        f.write(export_bytes(df, fmt, thresholds))
@@ -0,0 +1,89 @@
+"""롤링 52주 고점/저점 인덱스: 단조 덱(monotonic deque)으로 일봉 추가 시 O(1) 상각 갱신"""
+from collections import deque
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+
+WINDOW = timedelta(days=365)  # 52주 구간 (기존 one_year_ago 계산과 동일한 365일, 양끝 포함)
+
+
+class RollingExtremes:
+    """일봉 (날짜, 고가, 저가, 종가)를 순서대로 받아 최근 52주 고점/저점을 유지
+
+    - _max: 고가가 단조 감소하는 (날짜, 고가) 덱 -> 맨 앞이 구간 최고가
+    - _min: 저가가 단조 증가하는 (날짜, 저가) 덱 -> 맨 앞이 구간 최저가
+    - 같은 값이 다시 나오면 최근 날짜를 남겨 '고점 후 경과일'이 가장 최근 고점 기준이 되도록 함
+    """
+    __slots__ = ('window', 'last_date', 'last_close', '_max', '_min')
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.last_date = None
+        self.last_close = None
+        self._max = deque()
+        self._min = deque()
+
+    def append(self, date, high, low, close):
+        """일봉 1개 추가 (이미 반영된 날짜 이전/동일 날짜는 무시하고 False 반환)"""
+        if self.last_date is not None and date <= self.last_date: return False
+        while self._max and self._max[-1][1] <= high: self._max.pop()
+        self._max.append((date, high))
+        while self._min and self._min[-1][1] >= low: self._min.pop()
+        self._min.append((date, low))
+
+        # 구간을 벗어난 값 제거
+        cutoff = date - self.window
+        while self._max[0][0] < cutoff: self._max.popleft()
+        while self._min[0][0] < cutoff: self._min.popleft()
+        self.last_date, self.last_close = date, close
+        return True
+
+    def extend(self, bars):
+        """pykrx OHLCV 형식(고가/저가/종가 컬럼, 날짜 인덱스) DataFrame을 순서대로 추가 -> 추가된 일봉 수"""
+        rows = zip(bars.index, bars['고가'].to_numpy(), bars['저가'].to_numpy(), bars['종가'].to_numpy())
+        return sum(self.append(d, float(h), float(l), float(c)) for d, h, l, c in rows)
+
+    @property
+    def empty(self):
+        return not self._max
+
+    @property
+    def high(self):
+        return self._max[0][1]
+
+    @property
+    def low(self):
+        return self._min[0][1]
+
+    @property
+    def high_date(self):
+        return self._max[0][0]
+
+    @property
+    def low_date(self):
+        return self._min[0][0]
+
+    def days_since_high(self, as_of=None):
+        """52주 고점 이후 경과 일수 (기준일 생략 시 마지막 일봉 날짜)"""
+        return ((as_of or self.last_date) - self.high_date).days
+
+    def drawdown(self, price=None):
+        """52주 고점 대비 하락률 (%) (가격 생략 시 마지막 종가)"""
+        price = self.last_close if price is None else price
+        return (price / self.high - 1) * 100 if self.high else 0.0
+
+
+def extremes_frame(bars, window=WINDOW):
+    """일봉 전체에 대한 롤링 지표 시계열 -> 52주 고점/저점, 고점후경과일, 고점대비 (%) (O(n))"""
+    ext = RollingExtremes(window)
+    n = len(bars)
+    highs, lows, since = np.empty(n), np.empty(n), np.empty(n, dtype=np.int32)
+    for i, (d, h, l, c) in enumerate(zip(bars.index, bars['고가'].to_numpy(), bars['저가'].to_numpy(), bars['종가'].to_numpy())):
+        ext.append(d, float(h), float(l), float(c))
+        highs[i], lows[i], since[i] = ext.high, ext.low, ext.days_since_high()
+    closes = bars['종가'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = np.where(highs > 0, (closes / highs - 1) * 100, 0.0)
+    return pd.DataFrame({'52주 고점': highs, '52주 저점': lows, '고점후경과일': since, '고점대비 (%)': drawdown}, index=bars.index)
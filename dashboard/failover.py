@@ -0,0 +1,167 @@
+"""미국 시세/지표 제공자 체인: 건강도 순 정렬 + 서킷 브레이커 + 헤지(hedged) 요청
+
+- 제공자는 (ticker) -> 시세/지표 dict 또는 None 인 함수 (Finnhub, yfinance, 네이버 해외주식)
+- 건강도: 성공률 EWMA와 최근 응답 시간 p95로 순서 결정, 연속 실패 시 브레이커를 열어 COOLDOWN_SEC 동안 제외
+- 헤지: 1순위가 자신의 p95 예산 안에 응답하지 않으면 2순위를 함께 호출하고 먼저 성공한 결과 사용
+  (늦게 끝난 호출도 끝까지 실행되어 건강도 기록에 반영)
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from .fundamentals import get_finnhub_data
+from .providers import get_naver_us_data, get_yf_data
+
+LATENCY_WINDOW = 50        # p95 계산에 쓰는 최근 응답 수
+MIN_SAMPLES = 5            # p95를 신뢰할 최소 표본 수 (미만이면 HEDGE_DEFAULT_SEC)
+HEDGE_DEFAULT_SEC = 1.0
+HEDGE_MIN_SEC = 0.2        # 헤지 예산 하한/상한 (초)
+HEDGE_MAX_SEC = 3.0
+SUCCESS_ALPHA = 0.2        # 성공률 EWMA 가중치
+FAILURE_THRESHOLD = 3      # 연속 실패 N회 -> 브레이커 열림
+COOLDOWN_SEC = 30          # 열린 브레이커가 시험 호출 1건을 허용하기까지 대기 시간
+CHAIN_WORKERS = 32         # 제공자 호출 스레드 수 (수집 스레드 수 x 동시 호출 제공자 수 이상)
+
+CLOSED, OPEN, HALF_OPEN = '정상', '차단', '시험'
+
+
+class ProviderError(Exception):
+    """체인의 모든 제공자가 실패"""
+
+
+class ProviderHealth:
+    """제공자 1개의 응답 시간/성공률/브레이커 상태"""
+    __slots__ = ('name', 'latencies', 'success', 'failures', 'calls', 'opened_at', 'probing', '_lock')
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.success = 1.0
+        self.failures = self.calls = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def record(self, ok, elapsed):
+        with self._lock:
+            self.calls += 1
+            self.success += SUCCESS_ALPHA * ((1.0 if ok else 0.0) - self.success)
+            self.probing = False
+            if ok:
+                self.latencies.append(elapsed)
+                self.failures, self.opened_at = 0, None
+            else:
+                self.failures += 1
+                if self.failures >= FAILURE_THRESHOLD: self.opened_at = time.monotonic()
+
+    def p95(self):
+        if len(self.latencies) < MIN_SAMPLES: return None
+        return float(np.percentile(self.latencies, 95))
+
+    def hedge_budget(self):
+        p95 = self.p95()
+        return HEDGE_DEFAULT_SEC if p95 is None else min(max(p95, HEDGE_MIN_SEC), HEDGE_MAX_SEC)
+
+    def score(self):
+        """높을수록 우선: 성공률 / (1 + p95)"""
+        return self.success / (1 + (self.p95() or HEDGE_DEFAULT_SEC))
+
+    @property
+    def state(self):
+        if self.opened_at is None: return CLOSED
+        return HALF_OPEN if time.monotonic() - self.opened_at >= COOLDOWN_SEC else OPEN
+
+    def try_acquire(self):
+        """호출 가능 여부 (열린 브레이커는 쿨다운 후 시험 호출 1건만 허용)"""
+        with self._lock:
+            state = self.state
+            if state == CLOSED: return True
+            if state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+
+class ProviderChain:
+    """제공자 체인: fetch(ticker) -> (결과 dict 또는 None, 응답한 제공자 이름)"""
+
+    def __init__(self, providers, workers=CHAIN_WORKERS):
+        self.providers = dict(providers)
+        self.health = {name: ProviderHealth(name) for name in self.providers}
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="provider")
+
+    def ordered(self):
+        """건강도 순 제공자 이름 (열린 브레이커는 뒤로, 같은 점수는 등록 순서)"""
+        return sorted(self.providers, key=lambda n: (self.health[n].state == OPEN, -self.health[n].score()))
+
+    def _call(self, name, ticker):
+        started = time.monotonic()
+        try:
+            result = self.providers[name](ticker)
+        except Exception:
+            self.health[name].record(False, time.monotonic() - started)
+            raise
+        self.health[name].record(True, time.monotonic() - started)
+        return result
+
+    def fetch(self, ticker):
+        """순서대로 호출하되, 진행 중인 호출이 예산을 넘기면 다음 제공자를 헤지로 추가
+        None(종목 없음)은 다음 제공자로 넘어가고, 모두 None이면 None, 모두 예외면 ProviderError"""
+        queue = deque(self.ordered())
+        running, errors, found_none = {}, [], False
+
+        def launch():
+            while queue:
+                name = queue.popleft()
+                if self.health[name].try_acquire():
+                    running[self._pool.submit(self._call, name, ticker)] = name
+                    return self.health[name].hedge_budget()
+                errors.append(f"{name}={OPEN}")
+            return None
+
+        budget = launch()
+        while running:
+            done, _ = wait(running, timeout=budget if queue else None, return_when=FIRST_COMPLETED)
+            if not done:  # 예산 초과 -> 헤지 호출 추가 (기존 호출은 계속 기다림)
+                budget = launch()
+                continue
+            for future in done:
+                name = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(f"{name}={type(e).__name__}")
+                    continue
+                if result: return result, name
+                found_none = True
+            budget = launch()  # 실패/None -> 다음 제공자로 바로 넘어감
+        if found_none: return None, None
+        raise ProviderError(f"미국 시세 제공자 모두 실패: {', '.join(errors) or '사용 가능한 제공자 없음'}")
+
+    def status(self):
+        """제공자별 (이름, 상태, 성공률, p95, 호출 수) 목록 (건강도 순)"""
+        return [(n, self.health[n].state, self.health[n].success, self.health[n].p95(), self.health[n].calls)
+                for n in self.ordered()]
+
+
+US_PROVIDERS = {'finnhub': get_finnhub_data, 'yfinance': get_yf_data, 'naver': get_naver_us_data}
+_us_chain = None
+_us_lock = threading.Lock()
+
+
+def us_chain():
+    """프로세스 전역 미국 제공자 체인 (세션/재실행 간 건강도 기록 유지)"""
+    global _us_chain
+    with _us_lock:
+        if _us_chain is None:
+            _us_chain = ProviderChain(US_PROVIDERS)
+        return _us_chain
+
+
+def use_chain(chain):
+    """체인 교체 (테스트/제공자 구성 변경용)"""
+    global _us_chain
+    _us_chain = chain
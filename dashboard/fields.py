@@ -0,0 +1,221 @@
+"""종목 필드 의존 그래프(DAG): 결과 컬럼 -> 수집 노드 -> 선행 노드를 선언해 두고 필요한 노드만 지연 평가
+
+- 노드 1개 = 수집 함수 1개 (시세, 일봉, 펀더멘털, 업종, 뉴스 등), 결과는 원본 레코드에 합쳐지는 dict
+- 시장 단위 노드(개장일)는 분석 1회에 한 번만 평가해 모든 종목이 공유
+- 종목 단위 노드는 (시장, 종목, 기준일, 노드)로 공유 캐시에 메모이즈 -> 같은 호출은 종목/세션 간에 한 번만 실행
+- 요청한 컬럼과 투자등급 산정에 필요한 컬럼만 거슬러 올라가므로, 쓰지 않는 네트워크 호출은 실행되지 않음
+"""
+import threading
+from datetime import datetime, timedelta
+
+from .bars import update_history, update_kr_extremes
+from .cache import shared_cache
+from .config import FRESHNESS_BUDGET
+from .failover import us_chain
+from .fundamentals import TREND_COLUMNS
+from .indicators import INDICATOR_COLUMNS
+from .news import fetch_news
+from .providers import fetch_kr_page, get_crypto_data, get_safe_trading_day, krx
+from .sectors import kr_fundamentals, us_sector
+
+MISSING = None  # 노드가 None을 돌려주면 종목 데이터 없음 (분석 제외)
+
+# 투자등급 산정(classify)에 쓰이는 컬럼: 투자등급을 요청하면 함께 수집
+GRADE_INPUTS = ['고점대비 (%)', '상승여력 (%)', '감성점수', 'PER', '업종PER', '배당률 (%)', 'RSI(14)', '순이익률 추세 (%p)']
+NEWS_COLUMNS = ['뉴스감성', '감성점수', '최근뉴스', '핵심키워드']
+PRICE_COLUMNS = ['현재가', '52주 고점', '52주 저점', '고점대비 (%)', '상승여력 (%)']
+FUNDAMENTAL_COLUMNS = ['PER', 'PBR', '배당률 (%)']
+SECTOR_COLUMNS = ['업종', '업종PER', '업종PBR', '업종배당률 (%)', '저평가여부(PER)']
+
+
+# ==============================================================================
+# 수집 노드 (ctx: 종목 평가 컨텍스트)
+# ==============================================================================
+def trading_day_values(latest_day, one_year_ago=None):
+    one_year_ago = one_year_ago or (datetime.strptime(latest_day, "%Y%m%d") - timedelta(days=365)).strftime("%Y%m%d")
+    return {'latest_day': latest_day, 'one_year_ago': one_year_ago}
+
+
+def trading_day(ctx):
+    """최근 개장일과 1년 전 날짜 (pykrx 조회, 한국 주식 분석 1회에 한 번)"""
+    return trading_day_values(get_safe_trading_day())
+
+
+def kr_name(ctx):
+    name = krx().get_market_ticker_name(ctx.ticker)
+    return {'기업명': name} if name else MISSING
+
+
+def kr_history(ctx):
+    """52주 고점/저점은 증분 갱신되는 롤링 인덱스에서 O(1) 조회 (새 일봉만 수집)"""
+    ext, bars = update_kr_extremes(ctx.ticker, ctx.latest_day, ctx.one_year_ago)
+    return {'현재가': int(ext.last_close), '52주 고점': ext.high, '52주 저점': ext.low, 'bars': bars}
+
+
+def kr_fundamental(ctx):
+    """PER/PBR/배당률과 업종 중앙값은 전 종목 테이블에서 조회, 테이블에 없는 종목만 네이버 페이지 (계산 단계에서 파싱)"""
+    return kr_fundamentals(ctx.ticker, ctx.latest_day) or {'html': fetch_kr_page(ctx.ticker)}
+
+
+def us_quote(ctx):
+    """Finnhub -> yfinance -> 네이버 순(건강도에 따라 변경)으로 조회, 느린 제공자는 헤지 요청으로 우회"""
+    data, _ = us_chain().fetch(ctx.ticker)
+    return data or MISSING
+
+
+def us_sector_medians(ctx):
+    """이전 분석들에서 누적된 finnhubIndustry별 중앙값 O(1) 조회"""
+    return us_sector(ctx.get('quote').get('업종'))
+
+
+def crypto_quote(ctx):
+    data = get_crypto_data(ctx.ticker)
+    return {**data, '기업명': ctx.ticker} if data else MISSING
+
+
+def history(ctx):
+    """기술적 지표용 일봉 (미국/코인)"""
+    return {'bars': update_history(ctx.market, ctx.ticker)[1]}
+
+
+def news(ctx):
+    """뉴스 원문 (한국 주식은 종목명으로 검색)"""
+    query = ctx.get('name')['기업명'] if ctx.market == 'kr' else ctx.ticker
+    return {'news': fetch_news(query, ctx.market)}
+
+
+class Node:
+    """수집 노드: compute(ctx) -> dict, deps는 먼저 평가할 노드, optional이면 실패해도 분석 계속 (실패는 failures에 기록)"""
+    __slots__ = ('name', 'compute', 'deps', 'market_scope', 'optional')
+
+    def __init__(self, name, compute, deps=(), market_scope=False, optional=False):
+        self.name, self.compute, self.deps = name, compute, tuple(deps)
+        self.market_scope, self.optional = market_scope, optional
+
+
+# 시장별 노드와 컬럼 -> 노드 매핑 (required는 종목 존재 확인용으로 항상 평가)
+GRAPH = {
+    'kr': {
+        'nodes': [Node('trading_day', trading_day, market_scope=True),
+                  Node('name', kr_name),
+                  Node('history', kr_history, deps=['trading_day']),
+                  Node('fundamentals', kr_fundamental, deps=['trading_day'], optional=True),
+                  Node('news', news, deps=['name'], optional=True)],
+        'required': ['name', 'history'],
+        'columns': {**dict.fromkeys(['기업명'], 'name'), **dict.fromkeys(PRICE_COLUMNS + INDICATOR_COLUMNS, 'history'),
+                    **dict.fromkeys(FUNDAMENTAL_COLUMNS + SECTOR_COLUMNS, 'fundamentals'),
+                    **dict.fromkeys(NEWS_COLUMNS, 'news')},
+    },
+    'us': {
+        'nodes': [Node('quote', us_quote),
+                  Node('sector', us_sector_medians, deps=['quote']),
+                  Node('history', history, optional=True),
+                  Node('news', news, optional=True)],
+        'required': ['quote'],
+        # 추세 컬럼은 Finnhub 시세 조회가 채우는 펀더멘털 저장소에서 분석 끝에 일괄 계산
+        'columns': {**dict.fromkeys(['기업명'] + PRICE_COLUMNS + FUNDAMENTAL_COLUMNS + TREND_COLUMNS, 'quote'),
+                    **dict.fromkeys(SECTOR_COLUMNS, 'sector'), **dict.fromkeys(INDICATOR_COLUMNS, 'history'),
+                    **dict.fromkeys(NEWS_COLUMNS, 'news')},
+    },
+    'crypto': {
+        'nodes': [Node('quote', crypto_quote),
+                  Node('history', history, optional=True),
+                  Node('news', news, optional=True)],
+        'required': ['quote'],
+        'columns': {**dict.fromkeys(['기업명', '24시간 변동률 (%)'] + PRICE_COLUMNS, 'quote'),
+                    **dict.fromkeys(INDICATOR_COLUMNS, 'history'), **dict.fromkeys(NEWS_COLUMNS, 'news')},
+    },
+}
+
+
+def expand_columns(columns):
+    """요청 컬럼 -> 계산에 필요한 컬럼 전체 (투자등급은 등급 산정 입력 컬럼 포함, None은 전체)"""
+    if columns is None: return None
+    columns = set(columns)
+    if '투자등급' in columns: columns.update(GRADE_INPUTS)
+    return columns
+
+
+def required_nodes(market, columns=None):
+    """컬럼 목록 -> 평가할 노드 이름 (의존 순서, columns가 None이면 시장의 모든 노드)"""
+    graph = GRAPH[market]
+    nodes = {n.name: n for n in graph['nodes']}
+    columns = expand_columns(columns)
+    targets = list(nodes) if columns is None else \
+        graph['required'] + [graph['columns'][c] for c in sorted(columns) if c in graph['columns']]
+
+    order = []
+    def visit(name):
+        if name in order: return
+        for dep in nodes[name].deps: visit(dep)
+        order.append(name)
+    for name in targets: visit(name)
+    return order
+
+
+# ==============================================================================
+# 평가
+# ==============================================================================
+class MarketFields:
+    """한 번의 시장 분석에서 종목들이 공유하는 시장 단위 노드 (처음 필요할 때 한 번만 평가)"""
+
+    def __init__(self, market, preset=None):
+        self.market = market
+        self.nodes = {n.name: n for n in GRAPH[market]['nodes']}
+        self._values = dict(preset or {})
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            if name not in self._values:
+                self._values[name] = self.nodes[name].compute(self)
+            return self._values[name]
+
+    def day(self):
+        """메모이즈 기준일: 한국 주식은 개장일, 미국/코인은 오늘 (개장일 조회 없음)"""
+        if 'trading_day' in self.nodes: return self.get('trading_day')['latest_day']
+        return datetime.now().strftime("%Y%m%d")
+
+
+class TickerFields:
+    """종목 1개의 노드 값을 지연 평가 + (시장, 종목, 기준일, 노드) 단위 메모이즈"""
+
+    def __init__(self, market_fields, ticker):
+        self.shared, self.market, self.ticker = market_fields, market_fields.market, ticker
+        self._values = {}
+
+    @property
+    def latest_day(self):
+        return self.shared.get('trading_day')['latest_day']
+
+    @property
+    def one_year_ago(self):
+        return self.shared.get('trading_day')['one_year_ago']
+
+    def get(self, name):
+        node = self.shared.nodes[name]
+        if node.market_scope: return self.shared.get(name)
+        if name not in self._values:
+            for dep in node.deps: self.get(dep)
+            key = ('field', self.market, self.ticker, self.shared.day(), name)
+            self._values[name] = shared_cache().get_or_compute(key, FRESHNESS_BUDGET[self.market], lambda: node.compute(self))
+        return self._values[name]
+
+    def collect(self, names, failures=None):
+        """노드 목록을 순서대로 평가해 원본 레코드용 dict로 합침 (필수 노드가 None이면 None)
+        optional 노드의 예외는 failures({노드: 오류})에 남기고 계속, 그 밖의 노드 예외는 그대로 전달"""
+        raw = {}
+        for name in names:
+            node = self.shared.nodes[name]
+            try:
+                values = self.get(name)
+            except Exception as e:
+                if not node.optional: raise
+                # 지표용 일봉/뉴스/네이버 페이지 등: 실패해도 해당 컬럼만 N/A
+                if failures is not None: failures[name] = f"{type(e).__name__}: {e}"
+                continue
+            if values is MISSING:
+                if node.optional: continue
+                return None
+            if not node.market_scope: raw.update(values)
+        return raw
@@ -0,0 +1,209 @@
+"""미국 주식 펀더멘털 이력 저장소: Finnhub stock/metric 응답의 연간/분기 시계열을 (종목, 지표, 기간) 단위로 보관
+
+- stock/metric?metric=all은 스칼라 지표(metric)와 함께 큰 시계열 블록(series)을 돌려주는데, 전에는 스칼라 5개만 쓰고 버렸음
+- 종목별 파일에 시계열을 누적하고 (새 기간 행만 추가), 프로필/스칼라 지표와 조회 시점 시세도 함께 보관
+- 다음 분기 실적이 나올 때까지는 metric/profile 호출을 생략하고, 저장된 지표를 실시간 시세로 환산 (시세 1회 호출)
+- 추세 컬럼(PER 추세, 순이익률 추세)은 전체 종목의 분기 시계열을 (종목 x 분기) 배열로 쌓아 한 번에 계산
+"""
+import os
+import pickle
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from . import clients
+from .config import CACHE_DIR
+from .providers import US_ENDPOINTS, parse_us_data, us_params
+
+FUNDAMENTALS_DIR = os.path.join(CACHE_DIR, "fundamentals")
+RECHECK_SEC = 24 * 3600      # 새 기간을 기다리는 동안 metric 재확인 간격 (초)
+METRIC_MAX_AGE = 30 * 86400  # 새 기간이 없어도 스칼라 지표를 다시 받는 주기 (초, 52주 구간에서 밀려난 고저/배당 변경 반영)
+REPORT_LAG_DAYS = 45         # 분기 말 이후 실적 공시까지 걸리는 기간 (일)
+QUARTER_DAYS = 92            # 다음 분기 말까지의 일수 (넉넉하게)
+TREND_QUARTERS = 4           # 추세 계산 분기 수 (최근 1년)
+TREND_MIN_POINTS = 3         # 추세를 계산할 최소 분기 수 (미만이면 NaN)
+
+# 추세 컬럼 -> (분기 시계열 지표 이름, 배율): 이익률 시계열은 비율(0.25)이므로 %p로 환산
+TREND_METRICS = {'PER 추세': ('pe', 1.0), '순이익률 추세 (%p)': ('netMargin', 100.0)}
+TREND_COLUMNS = list(TREND_METRICS)
+
+# 시세에 비례하는 스칼라 지표: 저장 시점 시세 대비 현재 시세로 환산 (배당률은 반비례)
+PRICE_RATIOS = ['peBasicExclExtraTTM', 'pbAnnual']
+PRICE_YIELDS = ['dividendYieldIndicatedAnnual']
+
+SERIES_COLUMNS = ['주기', '지표', '기간', '값']
+
+
+class Fundamentals:
+    """종목 1개의 저장 내용: 프로필, 스칼라 지표, 지표 조회 시점 시세, 시계열(긴 형식), 조회/확인 시각"""
+    __slots__ = ('profile', 'metric', 'price', 'series', 'fetched', 'checked')
+
+    def __init__(self, profile=None, metric=None, price=0.0, series=None, fetched=0.0, checked=0.0):
+        self.profile, self.metric, self.price = profile or {}, metric or {}, price
+        self.series = empty_series() if series is None else series
+        self.fetched, self.checked = fetched, checked
+
+    def last_period(self, freq='quarterly'):
+        """가장 최근 기간 (YYYY-MM-DD, 시계열이 없으면 None)"""
+        periods = self.series.loc[self.series['주기'] == freq, '기간']
+        return periods.max() if len(periods) else None
+
+
+def empty_series():
+    return pd.DataFrame({'주기': pd.Series(dtype=str), '지표': pd.Series(dtype=str),
+                         '기간': pd.Series(dtype=str), '값': pd.Series(dtype='float64')})
+
+
+def store_path(ticker):
+    return os.path.join(FUNDAMENTALS_DIR, f"us_{ticker}.pkl")
+
+
+def load_fundamentals(ticker):
+    """저장된 펀더멘털 (없거나 형식이 다르면 None)"""
+    try:
+        with open(store_path(ticker), "rb") as f:
+            record = pickle.load(f)
+        if isinstance(record, Fundamentals): return record
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError):  # 파일 없음/손상, 이전 버전 클래스
+        pass
+    return None
+
+
+def save_fundamentals(ticker, record):
+    """임시 파일에 기록 후 교체 (동시 실행 중 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)"""
+    os.makedirs(FUNDAMENTALS_DIR, exist_ok=True)
+    path = store_path(ticker)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+# ==============================================================================
+# 갱신
+# ==============================================================================
+def parse_series(payload):
+    """metric 응답의 series 블록 -> (주기, 지표, 기간) 순으로 정렬한 긴 형식 DataFrame, 값이 없는 기간은 제외"""
+    rows = [(freq, name, point['period'], float(point['v']))
+            for freq, block in ((payload or {}).get('series') or {}).items()
+            for name, points in (block or {}).items()
+            for point in points or [] if point.get('period') and point.get('v') is not None]
+    if not rows: return empty_series()
+    return pd.DataFrame(rows, columns=SERIES_COLUMNS).sort_values(['주기', '지표', '기간'], ignore_index=True)
+
+
+def merge_series(stored, new):
+    """저장된 시계열에 없는 (주기, 지표, 기간) 행만 추가 -> (병합 결과, 추가된 행 수)"""
+    if new.empty: return stored, 0
+    keys = pd.MultiIndex.from_frame(stored[['주기', '지표', '기간']])
+    added = new[~pd.MultiIndex.from_frame(new[['주기', '지표', '기간']]).isin(keys)]
+    if added.empty: return stored, 0
+    merged = pd.concat([stored, added], ignore_index=True).sort_values(['주기', '지표', '기간'], ignore_index=True)
+    return merged, len(added)
+
+
+def needs_refresh(record, now=None):
+    """metric/profile을 다시 받아야 하는지: 저장 내용이 없거나, 다음 분기 실적 공시 예상일이 지났거나, 스칼라 지표가 오래됨
+    공시 예상일이 지났는데 새 기간이 아직 없으면 RECHECK_SEC마다 한 번만 다시 확인"""
+    if record is None: return True
+    now = now or time.time()
+    if now - record.checked < RECHECK_SEC: return False
+    if now - record.fetched >= METRIC_MAX_AGE: return True
+    last = record.last_period()
+    if last is None: return True
+    expected = datetime.strptime(last, "%Y-%m-%d") + timedelta(days=QUARTER_DAYS + REPORT_LAG_DAYS)
+    return datetime.fromtimestamp(now) >= expected
+
+
+def refresh_fundamentals(ticker, record, profile, payload, price, now=None):
+    """새 profile/metric 응답으로 저장 내용 갱신 -> (Fundamentals, 추가된 시계열 행 수)
+    metric 응답이 비어 있으면(조회 실패) 이전 지표를 유지하고 확인 시각만 기록"""
+    now = now or time.time()
+    record = record or Fundamentals()
+    added = 0
+    if payload and payload.get('metric'):
+        record.series, added = merge_series(record.series, parse_series(payload))
+        record.metric, record.price, record.fetched = payload['metric'], price, now
+    if profile: record.profile = profile
+    record.checked = now
+    save_fundamentals(ticker, record)
+    return record, added
+
+
+def live_metric(record, price):
+    """저장된 스칼라 지표를 현재 시세로 환산한 metric dict (parse_us_data 입력 형식)"""
+    metric = dict(record.metric)
+    if record.price and price:
+        scale = price / record.price
+        for key in PRICE_RATIOS:
+            if metric.get(key): metric[key] = metric[key] * scale
+        for key in PRICE_YIELDS:
+            if metric.get(key): metric[key] = metric[key] / scale
+    if price:  # 52주 고점/저점은 지표 조회 이후의 시세로 확장
+        if metric.get('52WeekHigh'): metric['52WeekHigh'] = max(metric['52WeekHigh'], price)
+        if metric.get('52WeekLow'): metric['52WeekLow'] = min(metric['52WeekLow'], price)
+    return {'metric': metric}
+
+
+def get_finnhub_data(ticker):
+    """Finnhub 시세/기업명/지표 수집: 시세는 매번, profile/metric은 저장소가 갱신이 필요할 때만 호출 (시세가 없으면 None)"""
+    session = clients.get_session()
+
+    def call(name):
+        url, extra = US_ENDPOINTS[name]
+        return session.get(url, params=us_params(ticker, extra), timeout=5).json()
+    quote = call('quote')
+    if 'c' not in quote or quote['c'] == 0: return None
+    record = load_fundamentals(ticker)
+    if needs_refresh(record):
+        record, _ = refresh_fundamentals(ticker, record, call('profile'), call('metric'), quote['c'])
+    return parse_us_data(ticker, quote, record.profile, live_metric(record, quote['c']))
+
+
+# ==============================================================================
+# 추세 컬럼 (전체 종목 일괄 계산)
+# ==============================================================================
+def stack_series(records, names, length=TREND_QUARTERS):
+    """종목별 분기 시계열에서 지표마다 최근 length개 기간을 오른쪽 정렬한 {지표: (종목 x 분기) 배열} (부족분은 NaN)
+    저장된 시계열은 (주기, 지표, 기간) 순으로 정렬되어 있으므로 종목마다 마스크 한 번으로 잘라냄"""
+    out = {name: np.full((len(records), length), np.nan) for name in names}
+    for i, record in enumerate(records):
+        if record is None or record.series.empty: continue
+        s = record.series
+        quarterly, metric, values = s['주기'].to_numpy() == 'quarterly', s['지표'].to_numpy(), s['값'].to_numpy('float64')
+        for name in names:
+            recent = values[quarterly & (metric == name)][-length:]
+            out[name][i, length - len(recent):] = recent
+    return out
+
+
+def trend_slopes(values, min_points=TREND_MIN_POINTS):
+    """(종목 x 기간) 배열 -> 종목별 최소제곱 기울기 (기간당 변화량, 값이 있는 기간만 사용, min_points 미만이면 NaN)"""
+    mask = ~np.isnan(values)
+    count = mask.sum(axis=1)
+    x = np.broadcast_to(np.arange(values.shape[1], dtype='float64'), values.shape)
+    y = np.where(mask, values, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = np.where(mask, x, 0.0).sum(axis=1) / count
+        y_mean = y.sum(axis=1) / count
+        dx = np.where(mask, x - x_mean[:, None], 0.0)
+        slope = (dx * (y - y_mean[:, None])).sum(axis=1) / (dx ** 2).sum(axis=1)
+    slope[count < min_points] = np.nan
+    return slope
+
+
+def trend_columns(tickers, records=None):
+    """종목 목록 -> {추세 컬럼: 종목별 값 배열} (저장된 시계열이 없는 종목은 NaN)"""
+    records = [load_fundamentals(t) for t in tickers] if records is None else records
+    stacked = stack_series(records, [name for name, _ in TREND_METRICS.values()])
+    return {col: trend_slopes(stacked[name]) * scale for col, (name, scale) in TREND_METRICS.items()}
+
+
+def load_series(ticker, name, freq='quarterly'):
+    """차트용 한 지표의 시계열 (기간, 값) DataFrame (저장 내용이 없으면 빈 DataFrame)"""
+    record = load_fundamentals(ticker)
+    if record is None: return empty_series()[['기간', '값']]
+    s = record.series
+    return s.loc[(s['주기'] == freq) & (s['지표'] == name), ['기간', '값']].reset_index(drop=True)
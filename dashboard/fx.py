@@ -0,0 +1,172 @@
+"""환율 계층: 통화 -> 기준 통화(KRW) 환율을 일별/장중 이력으로 로컬 저장하고 컬럼 단위로 일괄 환산
+
+- 일별 종가: cache/fx/{통화}{기준}_daily.parquet, 마지막 저장일 이후만 증분 수집 (과거 날짜 환산은 asof 조회)
+- 장중 환율: FX_TTL 안에서는 공유 캐시 값을 재사용, 새로 받을 때마다 _intraday.parquet에 누적 (최근 INTRADAY_DAYS일)
+- 환산은 통화 코드 factorize + 환율 벡터 인덱싱으로 행 수와 무관하게 한 번에 계산
+- 제공자는 교체 가능 (기본 yfinance, 오프라인/테스트용 StaticRates)
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .cache import shared_cache
+from .config import CACHE_DIR
+
+FX_DIR = os.path.join(CACHE_DIR, "fx")
+BASE_CURRENCY = 'KRW'
+MARKET_CURRENCY = {'kr': 'KRW', 'us': 'USD', 'crypto': 'KRW'}  # 시세 통화 (미국: Finnhub USD, 코인: 업비트 원화 마켓)
+FX_TTL = 600          # 장중 환율 재사용 시간 (초)
+INTRADAY_DAYS = 7     # 장중 환율 보관 기간 (일)
+DAILY_LOOKBACK = 365  # 일별 이력이 없을 때 처음 수집하는 기간 (일)
+
+_lock = threading.Lock()
+
+
+# ==============================================================================
+# 환율 제공자
+# ==============================================================================
+class YFinanceRates:
+    """yfinance 환율 (USDKRW=X 형식 심볼, 요청 시점에만 yfinance 로드)"""
+    name = 'yfinance'
+
+    @staticmethod
+    def _ticker(currency, base):
+        import yfinance as yf
+        return yf.Ticker(f"{currency}{base}=X")
+
+    def daily(self, currency, base, start, end):
+        """일별 종가 Series (start, end: YYYYMMDD, 인덱스는 날짜)"""
+        end_next = (datetime.strptime(end, "%Y%m%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        hist = self._ticker(currency, base).history(start=datetime.strptime(start, "%Y%m%d").strftime("%Y-%m-%d"), end=end_next)
+        hist.index = pd.DatetimeIndex(hist.index).tz_localize(None).normalize()
+        return hist['Close'].astype('float64')
+
+    def latest(self, currency, base):
+        """최근 체결 환율 (1분봉 마지막 종가)"""
+        hist = self._ticker(currency, base).history(period="1d", interval="1m")
+        if hist.empty: raise ValueError(f"{currency}/{base} 장중 환율 없음")
+        return float(hist['Close'].iloc[-1])
+
+
+class StaticRates:
+    """고정 환율 제공자 (오프라인 실행/테스트용): rates = {통화: 기준 통화 환산 비율}"""
+    name = 'static'
+
+    def __init__(self, rates):
+        self.rates = dict(rates)
+
+    def daily(self, currency, base, start, end):
+        return pd.Series(self.rates[currency], index=pd.bdate_range(start, end), dtype='float64')
+
+    def latest(self, currency, base):
+        return float(self.rates[currency])
+
+
+_provider = YFinanceRates()
+
+
+def use_provider(provider):
+    """환율 제공자 교체 (오프라인 실행/테스트에서 StaticRates 지정용)"""
+    global _provider
+    _provider = provider
+
+
+# ==============================================================================
+# 일별/장중 이력 저장소
+# ==============================================================================
+def history_path(currency, base, kind):
+    return os.path.join(FX_DIR, f"{currency}{base}_{kind}.parquet")
+
+
+def _read(path):
+    try: return pd.read_parquet(path)['rate']
+    except (OSError, ValueError, KeyError): return pd.Series(dtype='float64', index=pd.DatetimeIndex([]))  # 파일 없음/손상/형식 다름
+
+
+def _write(path, series):
+    os.makedirs(FX_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    series.rename('rate').to_frame().to_parquet(tmp)
+    os.replace(tmp, path)
+
+
+def load_daily(currency, base=BASE_CURRENCY):
+    return _read(history_path(currency, base, 'daily'))
+
+
+def load_intraday(currency, base=BASE_CURRENCY):
+    return _read(history_path(currency, base, 'intraday'))
+
+
+def update_daily(currency, base=BASE_CURRENCY, end=None):
+    """일별 이력을 end까지 갱신 (이미 저장된 날짜는 다시 받지 않음) -> 전체 일별 Series"""
+    end = end or datetime.now().strftime("%Y%m%d")
+    with _lock:
+        daily = load_daily(currency, base)
+        start = (daily.index[-1] + timedelta(days=1)).strftime("%Y%m%d") if len(daily) else \
+            (datetime.strptime(end, "%Y%m%d") - timedelta(days=DAILY_LOOKBACK)).strftime("%Y%m%d")
+        if start <= end:
+            new = _provider.daily(currency, base, start, end).dropna()
+            new = new[new.index > daily.index[-1]] if len(daily) else new
+            if len(new):
+                daily = pd.concat([daily, new]).sort_index()
+                _write(history_path(currency, base, 'daily'), daily)
+    return daily
+
+
+def record_intraday(currency, base, rate, at=None):
+    """장중 환율 1건 누적 (보관 기간이 지난 값은 정리)"""
+    at = pd.Timestamp(at or datetime.now())
+    with _lock:
+        intraday = load_intraday(currency, base)
+        intraday = pd.concat([intraday[intraday.index > at - pd.Timedelta(days=INTRADAY_DAYS)],
+                              pd.Series([rate], index=pd.DatetimeIndex([at]), dtype='float64')])
+        _write(history_path(currency, base, 'intraday'), intraday)
+
+
+# ==============================================================================
+# 환율 조회 및 환산
+# ==============================================================================
+def latest_rate(currency, base=BASE_CURRENCY):
+    """현재 환율 (FX_TTL 안에서는 캐시 재사용, 장중 조회 실패 시 마지막 일별 종가)"""
+    if currency == base: return 1.0
+
+    def fetch():
+        try:
+            rate = _provider.latest(currency, base)
+        except Exception:
+            daily = update_daily(currency, base)
+            if daily.empty: raise
+            return float(daily.iloc[-1])
+        record_intraday(currency, base, rate)
+        return rate
+    return shared_cache().get_or_compute(('fx', _provider.name, currency, base), FX_TTL, fetch)
+
+
+def rates_for(currencies, base=BASE_CURRENCY):
+    """통화 목록 -> {통화: 현재 환율}"""
+    return {c: latest_rate(c, base) for c in dict.fromkeys(currencies)}
+
+
+def convert(values, currencies, rates):
+    """금액 배열 + 같은 길이의 통화 코드 -> 기준 통화 금액 배열 (통화 수만큼만 환율 조회)"""
+    codes, uniques = pd.factorize(np.asarray(currencies))
+    table = np.array([rates[c] for c in uniques], dtype=np.float64)
+    return np.asarray(values, dtype=np.float64) * table[codes]
+
+
+def rates_on(currency, dates, base=BASE_CURRENCY):
+    """날짜 배열 -> 각 날짜 이전 마지막 일별 종가 (이력 이전 날짜는 NaN, 과거 시점 환산용)"""
+    dates = pd.DatetimeIndex(dates)
+    if currency == base: return np.ones(len(dates))
+    daily = load_daily(currency, base)
+    pos = daily.index.searchsorted(dates, side='right') - 1
+    return np.where(pos >= 0, daily.to_numpy()[np.maximum(pos, 0)] if len(daily) else np.nan, np.nan)
+
+
+def market_currency(markets):
+    """시장 코드 배열 -> 시세 통화 배열"""
+    return pd.Series(markets, dtype=object).map(MARKET_CURRENCY).fillna(BASE_CURRENCY).to_numpy()
@@ -0,0 +1,176 @@
+"""보유 종목(포지션) 저장소 + 벡터화 평가: stock_valuation.xlsx의 행별 수식을 분석 시세로 한 번에 재계산
+
+- 포지션은 holdings.json에 (시장, 종목, 기업명, 보유주수, 평단가, 주당 연간 배당금)으로 보관, 엑셀 시트에서 가져오기 지원
+- 시세 우선순위: 분석 결과(현재가/52주 고점/저점) -> 일봉 저장소 -> 시트에 적혀 있던 값
+- 평가는 포지션 순서의 numpy 배열 연산 (시세 정렬 1회 + 열 단위 계산), 합계/비중은 통화별로 산정하고
+  환율(rates)을 주면 기준 통화(KRW) 환산 합계와 전체 비중도 함께 계산
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .bars import load_history
+from .fx import BASE_CURRENCY, market_currency
+from .universe import load_universe
+
+HOLDINGS_PATH = "holdings.json"
+
+# stock_valuation.xlsx 레이아웃: B~P열, 10행부터 국가가 빈 행 직전까지 종목
+SHEET_COLUMNS = ['국가', '기업', '현재가', '평단가', '보유주수', '수익률', '저점', '고점', '고점대비', '변위저점대비',
+                 '상승여력', 'PER', 'PBR', '배당금', '배당률']
+SHEET_FIRST_ROW = 10
+COUNTRY_MARKETS = {'한국': 'kr', '미국': 'us', '코인': 'crypto', '암호화폐': 'crypto'}
+
+POSITION_COLUMNS = ['시장', '종목', '기업명', '보유주수', '평단가', '배당금']
+QUOTE_COLUMNS = ['현재가', '52주 고점', '52주 저점']
+
+
+# ==============================================================================
+# 포지션 저장소
+# ==============================================================================
+def empty_positions():
+    return pd.DataFrame({col: pd.Series(dtype='float64' if col in ('보유주수', '평단가', '배당금') else 'object')
+                         for col in POSITION_COLUMNS + QUOTE_COLUMNS})
+
+
+def load_holdings(path=HOLDINGS_PATH):
+    """저장된 포지션 (파일이 없으면 빈 DataFrame)"""
+    if not os.path.exists(path): return empty_positions()
+    with open(path, "r", encoding="utf-8") as f:
+        return pd.concat([empty_positions(), pd.DataFrame(json.load(f))], ignore_index=True)
+
+
+def save_holdings(positions, path=HOLDINGS_PATH):
+    """포지션 저장 (시트에서 가져온 기준 시세도 함께 보관: 시세를 못 구할 때 대체값)"""
+    records = positions[POSITION_COLUMNS + QUOTE_COLUMNS].astype(object).where(positions.notna(), None).to_dict('records')
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+
+
+def kr_name_index(day=None):
+    """한국 종목명 -> 종목코드 (KOSPI/KOSDAQ 주식 + ETF, 종목 유니버스 목록 재사용)"""
+    symbols = load_universe('kr', day)
+    return dict(zip(symbols['이름'], symbols['종목']))
+
+
+def import_sheet(path, sheet_name=0, kr_codes=None):
+    """stock_valuation.xlsx -> (포지션 DataFrame, 종목코드를 찾지 못한 한국 종목명 목록)
+    한국 종목은 시트에 종목명으로 적혀 있으므로 kr_codes(종목명 -> 코드)로 변환 (생략 시 pykrx로 조회)"""
+    sheet = pd.read_excel(path, sheet_name=sheet_name, header=None, usecols="B:P", skiprows=SHEET_FIRST_ROW - 1)
+    sheet.columns = SHEET_COLUMNS
+    end = sheet['국가'].isna().to_numpy().argmax() if sheet['국가'].isna().any() else len(sheet)
+    sheet = sheet.iloc[:end]
+    sheet = sheet[sheet['국가'].isin(COUNTRY_MARKETS)]
+
+    market = sheet['국가'].map(COUNTRY_MARKETS)
+    names = sheet['기업'].astype(str).str.strip()
+    if kr_codes is None and (market == 'kr').any():
+        kr_codes = kr_name_index()
+    codes = names.str.upper().where(market != 'kr', names.map(kr_codes or {}))
+    unresolved = names[codes.isna()].tolist()
+
+    positions = pd.DataFrame({
+        '시장': market,
+        '종목': codes.fillna(names),
+        '기업명': names,
+        '보유주수': pd.to_numeric(sheet['보유주수'], errors='coerce').fillna(0),
+        '평단가': pd.to_numeric(sheet['평단가'], errors='coerce').fillna(0),
+        '배당금': pd.to_numeric(sheet['배당금'], errors='coerce').fillna(0),
+        '현재가': pd.to_numeric(sheet['현재가'], errors='coerce'),
+        '52주 고점': pd.to_numeric(sheet['고점'], errors='coerce'),
+        '52주 저점': pd.to_numeric(sheet['저점'], errors='coerce'),
+    })
+    return positions.reset_index(drop=True), unresolved
+
+
+# ==============================================================================
+# 시세 조회
+# ==============================================================================
+def quote_table(frames):
+    """분석 결과 DataFrame 목록 -> (시장, 종목) 인덱스의 현재가/52주 고점/저점"""
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames: return pd.DataFrame(columns=QUOTE_COLUMNS, index=pd.MultiIndex.from_tuples([], names=['시장', '종목']))
+    quotes = pd.concat([f.reindex(columns=['시장', '종목', *QUOTE_COLUMNS]) for f in frames], ignore_index=True)
+    quotes['시장'] = quotes['시장'].astype(str)
+    return quotes.drop_duplicates(['시장', '종목'], keep='last').set_index(['시장', '종목'])[QUOTE_COLUMNS]
+
+
+def stored_quotes(positions):
+    """일봉 저장소의 마지막 종가/52주 고점/저점 (포지션 순서, 저장소에 없으면 NaN)"""
+    values = np.full((len(positions), 3), np.nan)
+    for i, (market, ticker) in enumerate(zip(positions['시장'], positions['종목'])):
+        ext, _ = load_history(market, ticker)
+        if not ext.empty: values[i] = ext.last_close, ext.high, ext.low
+    return values
+
+
+# ==============================================================================
+# 벡터화 평가
+# ==============================================================================
+class Holdings:
+    """포지션 배열 묶음: 포지션 구성이 바뀔 때만 생성하고, 시세가 바뀔 때마다 revalue()로 전체 재평가"""
+    __slots__ = ('positions', 'keys', 'shares', 'cost', 'dividend', 'fallback', 'currency', 'currencies')
+
+    def __init__(self, positions, use_stored=True):
+        self.positions = positions.reset_index(drop=True)
+        self.keys = pd.MultiIndex.from_arrays([self.positions['시장'].astype(str), self.positions['종목'].astype(str)])
+        self.shares = self.positions['보유주수'].to_numpy(dtype=np.float64)
+        self.cost = self.positions['평단가'].to_numpy(dtype=np.float64)
+        self.dividend = self.positions['배당금'].to_numpy(dtype=np.float64)
+        # 대체 시세: 일봉 저장소 값, 없으면 시트에 적혀 있던 값
+        self.fallback = self.positions.reindex(columns=QUOTE_COLUMNS).to_numpy(dtype=np.float64)
+        if use_stored:
+            stored = stored_quotes(self.positions)
+            self.fallback = np.where(np.isnan(stored), self.fallback, stored)
+        self.currency, self.currencies = pd.factorize(market_currency(self.positions['시장']))
+
+    def __len__(self):
+        return len(self.shares)
+
+    def align(self, quotes):
+        """(시장, 종목) 인덱스 시세 -> 포지션 순서의 (현재가, 고점, 저점) 배열, 없는 종목은 대체 시세"""
+        values = self.fallback.copy()
+        if quotes is not None and len(quotes):
+            idx = quotes.index.get_indexer(self.keys)
+            found = idx >= 0
+            live = quotes[QUOTE_COLUMNS].to_numpy(dtype=np.float64)[idx[found]]
+            values[found] = np.where(np.isnan(live), values[found], live)
+        return values
+
+    def revalue(self, quotes=None, rates=None):
+        """포지션별 평가 DataFrame + 통화별 합계 DataFrame (엑셀 수식과 같은 정의, 비율은 %)
+        rates({통화: 기준 통화 환율})를 주면 포지션별 기준 통화 평가금액/전체 비중과 합계 행을 추가"""
+        price, high, low = self.align(quotes).T
+        value, invested = price * self.shares, self.cost * self.shares
+        income = self.dividend * self.shares
+        n_cur = len(self.currencies)
+        totals = {name: np.bincount(self.currency, arr, n_cur) for name, arr in
+                  [('매입금액', invested), ('평가금액', np.nan_to_num(value)), ('배당수입', income)]}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lots = pd.DataFrame({
+                '시장': self.positions['시장'], '종목': self.positions['종목'], '기업명': self.positions['기업명'],
+                '통화': self.currencies[self.currency],
+                '보유주수': self.shares, '평단가': self.cost, '현재가': price,
+                '매입금액': invested, '평가금액': value, '평가손익': value - invested,
+                '수익률 (%)': np.where(self.cost > 0, (price - self.cost) / self.cost * 100, 0.0),  # IFERROR(..., 0)
+                '고점대비 (%)': np.where(high > 0, (price / high - 1) * 100, np.nan),
+                '변위저점대비 (%)': np.where(high != low, (price - low) / (high - low) * 100, np.nan),
+                '상승여력 (%)': np.where(high != low, (high - price) / (high - low) * 100, np.nan),
+                '배당수입': income,
+                '배당률 (%)': np.where(price > 0, self.dividend / price * 100, np.nan),
+                '비중 (%)': np.where(totals['평가금액'][self.currency] > 0, value / totals['평가금액'][self.currency] * 100, 0.0),
+            })
+            summary = pd.DataFrame(totals, index=pd.Index(self.currencies, name='통화'))
+            if rates is not None:
+                rate = np.array([rates[c] for c in self.currencies], dtype=np.float64)
+                base_value = np.nan_to_num(value) * rate[self.currency]
+                lots[f'평가금액 ({BASE_CURRENCY})'] = base_value
+                lots['전체비중 (%)'] = base_value / base_value.sum() * 100 if base_value.sum() > 0 else 0.0
+                summary.loc[f'합계 ({BASE_CURRENCY})'] = summary.mul(rate, axis=0).sum()
+            summary['평가손익'] = summary['평가금액'] - summary['매입금액']
+            summary['수익률 (%)'] = np.where(summary['매입금액'] > 0, summary['평가손익'] / summary['매입금액'] * 100, 0.0)
+            summary['배당수익률 (%)'] = np.where(summary['평가금액'] > 0, summary['배당수입'] / summary['평가금액'] * 100, 0.0)
+        return lots, summary
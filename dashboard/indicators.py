@@ -0,0 +1,77 @@
+"""기술적 지표 엔진: 전체 종목의 일봉을 (종목 x 일자) 2차원 배열로 쌓아 NumPy 한 번의 연산으로 계산"""
+import numpy as np
+
+MA_SHORT = 20         # 단기 이동평균 (약 1개월)
+MA_LONG = 60          # 장기 이동평균 (약 3개월)
+RSI_PERIOD = 14       # RSI 계산 구간 (Wilder 평활 계수 1/14)
+RSI_BARS = 120        # RSI 평활에 쓰는 최근 일봉 수 (첫 값의 남은 가중치 (13/14)^119 ≈ 0.02%)
+VOL_WINDOW = 20       # 변동성(연율화 표준편차) 계산 구간
+VOLUME_WINDOW = 20    # 거래량 Z점수 기준 구간 (당일 제외)
+TRADING_DAYS = 252    # 연율화 기준 거래일 수
+
+# 결과 테이블에 추가되는 지표 컬럼 (일봉이 부족한 종목은 NaN)
+INDICATOR_COLUMNS = ['MA20 이격도 (%)', 'MA60 이격도 (%)', 'RSI(14)', '변동성 (%)', '거래량 Z']
+
+
+def stack_bars(bars_list, column, length):
+    """종목별 일봉에서 한 컬럼을 골라 최근 length일을 오른쪽 정렬한 (종목 x 일자) 배열 (부족분은 NaN)"""
+    out = np.full((len(bars_list), length), np.nan)
+    for i, bars in enumerate(bars_list):
+        if bars is None or not len(bars): continue
+        values = bars[column].to_numpy(dtype='float64')[-length:]
+        out[i, length - len(values):] = values
+    return out
+
+
+def _window_mean(values):
+    """구간 평균 (구간 안에 NaN이 있으면 NaN)"""
+    return np.where(np.isnan(values).any(axis=1), np.nan, values.mean(axis=1))
+
+
+def _wilder_mean(values):
+    """Wilder 평활 최신 값 (pandas ewm(alpha=1/RSI_PERIOD, adjust=False, ignore_na=True)와 같음)
+    종목마다 첫 유효 값에서 시작하고 NaN인 날은 건너뜀, 유효 값이 RSI_PERIOD개 미만이면 NaN"""
+    alpha = 1 / RSI_PERIOD
+    out = np.full(len(values), np.nan)
+    for column in values.T:  # 일자 방향 재귀, 종목 방향은 한 번에
+        valid = ~np.isnan(column)
+        out = np.where(valid, np.where(np.isnan(out), column, out + alpha * (column - out)), out)
+    out[(~np.isnan(values)).sum(axis=1) < RSI_PERIOD] = np.nan
+    return out
+
+
+def compute_indicators(close, volume):
+    """(종목 x 일자) 종가/거래량 배열 -> {지표 컬럼: 종목별 최신 값 배열}"""
+    last = close[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ma_short = _window_mean(close[:, -MA_SHORT:])
+        ma_long = _window_mean(close[:, -MA_LONG:])
+
+        # RSI: Wilder 평활 상승폭 / 하락폭 (하락이 없으면 100, 변동이 없으면 50)
+        diff = np.diff(close[:, -RSI_BARS:], axis=1)
+        gain = _wilder_mean(np.clip(diff, 0, None))
+        loss = _wilder_mean(np.clip(-diff, 0, None))
+        rsi = np.where(loss > 0, 100 - 100 / (1 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+        rsi[np.isnan(gain)] = np.nan
+
+        returns = np.diff(np.log(close[:, -(VOL_WINDOW + 1):]), axis=1)
+        volatility = np.where(np.isnan(returns).any(axis=1), np.nan, returns.std(axis=1, ddof=1)) * np.sqrt(TRADING_DAYS) * 100
+
+        base = volume[:, -(VOLUME_WINDOW + 1):-1]
+        mean, std = _window_mean(base), base.std(axis=1)
+        volume_z = np.where(std > 0, (volume[:, -1] - mean) / std, 0.0)
+        volume_z[np.isnan(mean) | np.isnan(volume[:, -1])] = np.nan
+
+        return {
+            'MA20 이격도 (%)': (last / ma_short - 1) * 100,
+            'MA60 이격도 (%)': (last / ma_long - 1) * 100,
+            'RSI(14)': rsi,
+            '변동성 (%)': volatility,
+            '거래량 Z': volume_z,
+        }
+
+
+def indicator_columns(bars_list):
+    """종목별 일봉 목록 -> 지표 컬럼 배열 (입력 순서 유지)"""
+    length = max(MA_LONG, RSI_BARS, VOL_WINDOW + 1, VOLUME_WINDOW + 1)
+    return compute_indicators(stack_bars(bars_list, '종가', length), stack_bars(bars_list, '거래량', length))
@@ -0,0 +1,103 @@
+"""분석 결과 데이터 모델: 컬럼형 버퍼, 메모리 절감 dtype, 투자등급 라벨/색상"""
+import numpy as np
+import pandas as pd
+
+# 결과 테이블 스키마: 컬럼명 -> 최종 저장 dtype
+#  - 반복되는 라벨 컬럼은 category (정수 코드 + 라벨 사전으로 저장)
+#  - 비율/지표 컬럼은 float32 (소수 둘째 자리 표시에 충분한 정밀도)
+#  - 가격 컬럼은 원화 코인 가격(1억 이상)까지 정확해야 하므로 float64 유지
+RESULT_SCHEMA = {
+    '시장': 'category',
+    '종목': 'object',
+    '기업명': 'object',
+    '현재가': 'float64',
+    '52주 고점': 'float64',
+    '52주 저점': 'float64',
+    '업종': 'category',
+    'PER': 'float32',
+    '업종PER': 'float32',
+    '저평가여부(PER)': 'category',
+    'PBR': 'float32',
+    '업종PBR': 'float32',
+    '배당률 (%)': 'float32',
+    '업종배당률 (%)': 'float32',
+    '24시간 변동률 (%)': 'float32',
+    '고점대비 (%)': 'float32',
+    '상승여력 (%)': 'float32',
+    'MA20 이격도 (%)': 'float32',
+    'MA60 이격도 (%)': 'float32',
+    'RSI(14)': 'float32',
+    '변동성 (%)': 'float32',
+    '거래량 Z': 'float32',
+    'PER 추세': 'float32',
+    '순이익률 추세 (%p)': 'float32',
+    '뉴스감성': 'category',
+    '감성점수': 'int16',
+    '최근뉴스': 'object',
+    '핵심키워드': 'object',
+}
+
+# 투자등급은 순서형 category: 낮은 등급 -> 높은 등급 순으로 정의하여 정렬 시 그대로 사용
+GRADE_LABELS = ['👀 관망', '🔥 매수', '🔥🔥 적극 매수', '🔥🔥🔥 초적극 매수', '🔥🔥🔥🔥 초초적극 매수']
+
+# 투자등급 배경/글자색: 불꽃 개수가 많은 접두어부터 검사
+GRADE_COLORS = {
+    '🔥🔥🔥🔥': ('darkred', 'white'),
+    '🔥🔥🔥': ('#ff4b4b', 'white'),
+    '🔥🔥': ('green', 'white'),
+    '🔥': ('#DAA520', 'black'),
+}
+
+
+class ResultBuffer:
+    """분석 결과를 종목 수만큼 미리 할당한 컬럼 배열에 제자리로 채우는 버퍼 (행마다 dict를 보관하지 않음)"""
+    __slots__ = ('columns', 'size')
+
+    def __init__(self, capacity):
+        self.columns = {
+            col: np.empty(capacity, dtype=object) if dtype in ('object', 'category') else np.full(capacity, np.nan)
+            for col, dtype in RESULT_SCHEMA.items()
+        }
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, fields):
+        """한 종목의 결과(컬럼명 -> 값)를 다음 빈 행에 기록 (스키마에 없는 컬럼은 KeyError)"""
+        for col, value in fields.items():
+            self.columns[col][self.size] = value
+        self.size += 1
+
+    def assign(self, col, values):
+        """채워진 행 전체에 한 컬럼 값을 일괄 기록 (종목 전체를 모아 계산하는 지표용)"""
+        self.columns[col][:self.size] = values
+
+    def to_frame(self):
+        """채워진 행만 잘라 DataFrame으로 변환 (등급 산정 전이므로 float64 유지)"""
+        return pd.DataFrame({col: arr[:self.size] for col, arr in self.columns.items()})
+
+
+def compact_frame(df):
+    """스키마에 맞춰 dtype을 축소: 라벨 -> category, 지표 -> float32, 투자등급 -> 순서형 category"""
+    dtypes = {col: dtype for col, dtype in RESULT_SCHEMA.items() if col in df.columns and dtype != 'object'}
+    df = df.astype(dtypes)
+    if '투자등급' in df.columns:
+        df['투자등급'] = pd.Categorical(df['투자등급'], categories=GRADE_LABELS, ordered=True)
+    return df
+
+
+def format_memory_usage(df):
+    """DataFrame의 실제 메모리 사용량(문자열 포함)을 읽기 쉬운 단위로 반환"""
+    size = float(df.memory_usage(deep=True).sum())
+    for unit in ['B', 'KB', 'MB']:
+        if size < 1024: return f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} GB"
+
+
+def grade_color(grade):
+    """투자등급 라벨 -> (배경색, 글자색)"""
+    for prefix, colors in GRADE_COLORS.items():
+        if str(grade).startswith(prefix): return colors
+    return '#f0f2f6', 'black'
@@ -0,0 +1,118 @@
+"""뉴스 수집, 감성 분석 및 핵심 키워드 추출"""
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+
+from . import clients
+from .config import FINNHUB_API_KEY, NAVER_CLIENT_ID, NAVER_CLIENT_SECRET
+
+# ==============================================================================
+# [1] 뉴스 수집 및 감성 분석 엔진
+# ==============================================================================
+def get_sentiment_score(text, market='kr'):
+    """텍스트 내 키워드를 매칭하여 감성 점수 산출 (단순 키워드 카운팅 방식)"""
+    # 긍정/부정 사전 정의 (한/영 통합)
+    pos_kr = ['상승', '돌파', '수익', '호재', '성장', '매수', '긍정', '신고가', '최고', '증가', '성공', '반등', '실적개선', '우수']
+    neg_kr = ['하락', '감소', '악재', '손실', '우려', '매도', '부정', '급락', '쇼크', '폭락', '실패', '약세', '부진']
+    pos_en = ['up', 'rise', 'growth', 'gain', 'positive', 'buy', 'bullish', 'high', 'jump', 'surpass', 'beat', 'success', 'dividend']
+    neg_en = ['down', 'fall', 'loss', 'drop', 'negative', 'sell', 'bearish', 'low', 'slump', 'miss', 'fail', 'concern', 'risk']
+    
+    score = 0
+    text_lower = text.lower()
+    pos_words = pos_kr + pos_en
+    neg_words = neg_kr + neg_en
+    
+    for word in pos_words:
+        if word in text_lower: score += 1
+    for word in neg_words:
+        if word in text_lower: score -= 1
+    return score
+
+def news_request(query, market='us'):
+    """뉴스 API 요청 정보 -> (URL, 헤더)"""
+    if market == 'us':
+        # Finnhub API: 최근 3일간의 기업 뉴스 수집
+        url = f"https://finnhub.io/api/v1/company-news?symbol={query}&from={(datetime.now()-timedelta(days=3)).strftime('%Y-%m-%d')}&to={datetime.now().strftime('%Y-%m-%d')}&token={FINNHUB_API_KEY}"
+        return url, {}
+    # Naver 뉴스 검색 API: 관련도 높은 뉴스 3건 수집
+    url = f"https://openapi.naver.com/v1/search/news.json?query={query}&display=3&sort=sim"
+    return url, {"X-Naver-Client-Id": NAVER_CLIENT_ID, "X-Naver-Client-Secret": NAVER_CLIENT_SECRET}
+
+def parse_news(res, market='us'):
+    """뉴스 API 응답(JSON) -> [(제목, 본문)] (형식이 다르면 KeyError/AttributeError)"""
+    if market == 'us':
+        return [(item.get('headline', ''), item.get('summary', '')) for item in res[:3]]
+    return [(item['title'], item['description']) for item in res.get('items', [])]
+
+def fetch_news(query, market='us'):
+    """수집 단계: Finnhub(미국) 또는 Naver(한국/코인) API에서 뉴스 원문 [(제목, 본문)] 수집
+    (연결 실패는 requests.RequestException, 응답 형식 오류는 ValueError/KeyError/AttributeError -> 필드 그래프가 오류로 기록)"""
+    url, headers = news_request(query, market)
+    return parse_news(clients.get_session().get(url, headers=headers, timeout=5).json(), market)
+
+def score_news(items, market='us'):
+    """계산 단계: 뉴스 원문 정제 + 감성 점수 합산 -> (표시용 제목, 분석용 텍스트, 감성 라벨, 감성 점수)"""
+    news_display, full_text_list, total_sentiment = [], [], 0
+    for title, body in items:
+        if market != 'us':
+            # Naver 검색 결과는 <b> 등 HTML 태그 포함
+            title = re.sub(r'<[^>]*>', '', title)
+            body = re.sub(r'<[^>]*>', '', body)
+        news_display.append(title)
+        full_text_list.append(f"{title} {body}")
+        total_sentiment += get_sentiment_score(title + body, 'us' if market == 'us' else 'kr')
+    
+    label = "🙂 긍정" if total_sentiment > 0 else "😟 부정" if total_sentiment < 0 else "🧐 중립"
+    return news_display, full_text_list, label, total_sentiment
+
+def get_stock_news(query, market='us'):
+    """시장에 따라 Finnhub(미국) 또는 Naver(한국/코인) API를 호출하여 뉴스 수집 및 감성 분석"""
+    return score_news(fetch_news(query, market), market)
+
+
+# ==============================================================================
+# [2] 핵심 키워드 추출 로직
+# ==============================================================================
+def extract_keywords(full_texts, ticker_name, market='kr'):
+    """뉴스 텍스트에서 불용어를 제외하고 가장 빈도가 높은 주요 단어 3개 추출"""
+    # 필터링할 무의미한 단어 집합 (Stopwords)
+    stop_words = {
+        '이번엔', '달라', '스토리', '이슈들', '최대', '올해', '때문', '통해', '대해', '위해',
+        '관련', '진행', '이후', '이상', '이하', '기대', '전망', '분석', '기사', '뉴스', '오늘',
+        '등', '및', '위한', '기존', '확인', '중', '것', '이', '가', '에', '의', '를', '은', '는',
+        '로', '으로', '과', '와', '도', '까지', '부터', '에서', '이다', '입니다', '하고',
+        '종목', '주식', '코인', '시장', '투자', '투자자', '거래', '분석', '상승', '하락', 
+        '전망', '분기', '실적', '주가', '가격', '비중', '목표', '추천', '매수', '매도', 
+        '상황', '이유', '속보', '특징주', '전문가', '전략', '포인트',
+        'the', 'and', 'for', 'with', 'from', 'into', 'during', 'including', 'until',
+        'against', 'among', 'throughout', 'despite', 'towards', 'upon', 'concerning',
+        'about', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+        'could', 'would', 'will', 'also', 'their', 'this', 'that', 'its', 'it', 'to',
+        'what', 'which', 'who', 'whom', 'whose', 'when', 'where', 'why', 'how', 'than',
+        'stock', 'stocks', 'market', 'markets', 'share', 'shares', 'price', 'prices', 
+        'investing', 'investor', 'investors', 'trading', 'coin', 'coins', 'crypto', 
+        'cryptocurrency', 'bitcoin', 'ethereum', 'daily', 'report', 'analysis', 
+        'forecast', 'update', 'today', 'says', 'said', 'expected', 'likely', 'potential',
+        'announced', 'latest', 'breaking', 'news', 'brief', 'summary', 'outlook'
+    }
+
+    combined_text = " ".join(full_texts).lower()
+    clean_text = re.sub(r'&[a-z]+;', ' ', combined_text)
+    clean_text = re.sub(r'[^\w\s]', ' ', clean_text)
+    words = clean_text.split()
+    
+    filtered_words = []
+    ticker_parts = set(ticker_name.lower().split())
+    
+    for w in words:
+        # 필터링 조건: 3글자 이상, 숫자가 아님, 불용어 아님, 티커명 미포함
+        if len(w) >= 3 and not w.isdigit() and w not in stop_words:
+            if not any(part in w for part in ticker_parts if len(part) >= 2):
+                filtered_words.append(w)
+    
+    counts = Counter(filtered_words)
+    most_common = counts.most_common(3)
+    
+    if market == 'us':
+        return [word.capitalize() for word, count in most_common]
+    return [word for word, count in most_common]
@@ -0,0 +1,55 @@
+"""포트폴리오 파일(portfolio_{market}.json) 입출력 및 종목 문자열 파싱
+
+종목이 많은 포트폴리오는 "watchlist"에 관심 목록 이름을 적어 두고, 읽을 때 저장소의 종목으로 "tickers"를 채움
+"""
+import json
+import os
+import re
+
+from .watchlist import load_watchlist
+
+
+def portfolio_path(market):
+    """포트폴리오 파일명 생성 (시장별 별도 관리)"""
+    return f"portfolio_{market}.json"
+
+
+def load_portfolio(market):
+    """시장별 포트폴리오 파일 로드 (파일이 없으면 None)"""
+    return read_portfolio(portfolio_path(market))
+
+
+def read_portfolio(path, market=None):
+    """포트폴리오 파일 읽기 (파일이 없으면 None), 관심 목록을 참조하면 그 종목으로 "tickers"를 채움"""
+    if not os.path.exists(path): return None
+    with open(path, "r", encoding="utf-8") as f:
+        portfolio = json.load(f)
+    market = market or market_from_path(path)
+    if portfolio.get("watchlist") and market:
+        portfolio["tickers"] = ", ".join(load_watchlist(portfolio["watchlist"], market))
+    return portfolio
+
+
+def save_portfolio(market, data):
+    """시장별 포트폴리오 파일 저장"""
+    with open(portfolio_path(market), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def market_from_path(path):
+    """파일명(portfolio_kr.json 등)에서 시장 코드 추출 (형식이 다르면 None)"""
+    match = re.search(r'portfolio_(kr|us|crypto)\.json$', os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def parse_tickers(text):
+    """콤마로 구분된 종목 코드 문자열 -> 대문자 종목 코드 목록"""
+    return [t.strip().upper() for t in text.split(",") if t.strip()]
+
+
+def thresholds_of(portfolio, bonus=False):
+    """포트폴리오에 저장된 필터 기준 -> (max_per, min_up, min_drop, min_div)
+    bonus=True이면 선택 가점 기준 (max_rsi, margin_trend)까지 붙여 grade_frame 인자 순서로 반환 (없으면 사용 안 함)"""
+    thresholds = portfolio["max_per"], portfolio["min_up"], portfolio["min_drop"], portfolio["min_div"]
+    if not bonus: return thresholds
+    return (*thresholds, portfolio.get("max_rsi", 0), portfolio.get("margin_trend", False))
@@ -0,0 +1,217 @@
+"""시장별 데이터 래퍼: pykrx/네이버(한국), Finnhub(미국), 업비트(암호화폐) API 통신 및 전처리"""
+import re
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from . import clients
+from .config import FINNHUB_API_KEY
+
+
+def krx():
+    """pykrx stock 모듈 지연 로딩: matplotlib 등 무거운 의존성을 한국 주식 분석 시에만 로드"""
+    from pykrx import stock
+    return stock
+
+
+def get_safe_trading_day():
+    """최근 개장일 확인: 주말/공휴일을 고려하여 데이터가 존재하는 가장 가까운 영업일 반환"""
+    for i in range(10):
+        target_day = (datetime.now() - timedelta(days=i)).strftime("%Y%m%d")
+        df = krx().get_market_ohlcv_by_date(target_day, target_day, "005930")
+        if not df.empty: return target_day
+    return datetime.now().strftime("%Y%m%d")
+
+def fetch_kr_page(ticker):
+    """수집 단계: 네이버 금융 종목 메인 페이지 HTML (연결/시간 초과 시 requests.RequestException)"""
+    url = f"https://finance.naver.com/item/main.naver?code={ticker}"
+    return clients.get_session().get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=5).text
+
+def parse_kr_indicators(res):
+    """계산 단계: 네이버 금융 페이지 HTML에서 (PER, PBR, 배당률, 동일업종 PER) 추출"""
+    if not res:
+        return 0.0, 0.0, 0.0, 0.0
+
+    def parse_value(pattern, text):
+        match = re.search(pattern, text, re.DOTALL)
+        if match:
+            raw_data = match.group(1).strip()
+            # N/A 또는 마이너스 표시(-)가 있으면 0.0 반환 (적자 업종/종목 처리)
+            if 'N/A' in raw_data.upper() or not raw_data or raw_data == '-':
+                return 0.0
+            
+            # 숫자, 소수점, 콤마, 마이너스 기호만 남기고 제거
+            val_str = re.sub(r'[^\d,.\-]', '', raw_data).replace(',', '')
+            try:
+                val = float(val_str)
+                # 업종 PER이 10,000 이상인 경우 데이터 오류 혹은 비정상치로 보고 0.0 처리
+                return val if -1000 < val < 10000 else 0.0
+            except ValueError:  # 숫자가 아닌 표기 ('1.2.3' 등)
+                return 0.0
+        return 0.0
+
+    per = parse_value(r'id="_per">(.+?)<', res)
+    pbr = parse_value(r'id="_pbr">(.+?)<', res)
+    div = parse_value(r'배당수익률.*?<em.*?>(.+?)</em>', res)
+    sec_per = parse_value(r'동일업종 PER.*?<em.*?>([\d,.\-\s]+).*?</em>', res)
+
+    return per, pbr, div, sec_per
+
+def get_kr_indicators(ticker):
+    """네이버 금융에서 한국 주식 (PER, PBR, 배당률, 동일업종 PER) 수집"""
+    return parse_kr_indicators(fetch_kr_page(ticker))
+
+
+def crypto_url(ticker):
+    return f"https://api.upbit.com/v1/ticker?markets=KRW-{ticker}"
+
+def parse_crypto_data(res):
+    """업비트 ticker 응답(JSON) -> 시세 dict (빈 응답이면 None, 필드 누락 시 KeyError)"""
+    if not res: return None
+    data = res[0]
+    return {
+        '현재가': data['trade_price'],
+        '52주 고점': data['highest_52_week_price'],
+        '52주 저점': data['lowest_52_week_price'],
+        '24시간 변동률 (%)': round(data['signed_change_rate'] * 100, 2)
+    }
+
+def get_crypto_data(ticker):
+    """업비트 Public API를 사용하여 암호화폐 시세 및 52주 고/저점 데이터 수집
+    (없는 마켓이면 None, 연결 실패는 requests.RequestException, 응답 형식 오류는 ValueError/KeyError)"""
+    res = clients.get_session().get(crypto_url(ticker), timeout=5).json()
+    if isinstance(res, dict) and 'error' in res:  # 없는 마켓: {"error": {"name": "404", ...}}
+        return None
+    return parse_crypto_data(res)
+
+# Finnhub 호출 목록: 이름 -> (URL, 추가 파라미터)
+US_ENDPOINTS = {
+    'quote': ("https://finnhub.io/api/v1/quote", {}),
+    'profile': ("https://finnhub.io/api/v1/stock/profile2", {}),
+    'metric': ("https://finnhub.io/api/v1/stock/metric", {'metric': 'all'}),
+}
+
+def us_params(ticker, extra=None):
+    return {'token': FINNHUB_API_KEY, 'symbol': ticker, **(extra or {})}
+
+def parse_us_data(ticker, q, p, f):
+    """Finnhub quote/profile2/metric 응답(JSON) -> 시세/지표 dict (시세가 없으면 None)"""
+    if 'c' not in q or q['c'] == 0: return None
+    price = q['c']
+    return {
+        '기업명': p.get('name', ticker),
+        '업종': p.get('finnhubIndustry') or None,
+        '현재가': price,
+        '52주 고점': f['metric'].get('52WeekHigh', price) or price,
+        '52주 저점': f['metric'].get('52WeekLow', price) or price,
+        'PER': f['metric'].get('peBasicExclExtraTTM', 0) or 0,
+        'PBR': f['metric'].get('pbAnnual', 0) or 0,
+        '배당률 (%)': f['metric'].get('dividendYieldIndicatedAnnual', 0) or 0,
+    }
+
+
+# 미국 주식 대체 제공자 (Finnhub 장애/지연 시 failover 체인에서 사용)
+# 업종은 finnhubIndustry와 분류 체계가 달라 업종 중앙값 누적을 오염시키므로 None으로 둠
+def get_yf_data(ticker):
+    """yfinance Ticker.info로 시세/지표 수집 (시세가 없으면 None, 429 등은 예외)"""
+    import yfinance as yf
+    info = yf.Ticker(ticker).info
+    price = info.get('currentPrice') or info.get('regularMarketPrice')
+    if not price: return None
+    return {
+        '기업명': info.get('shortName') or ticker,
+        '업종': None,
+        '현재가': price,
+        '52주 고점': info.get('fiftyTwoWeekHigh') or price,
+        '52주 저점': info.get('fiftyTwoWeekLow') or price,
+        'PER': info.get('trailingPE') or 0,
+        'PBR': info.get('priceToBook') or 0,
+        '배당률 (%)': (info.get('dividendRate') or 0) / price * 100,
+    }
+
+
+NAVER_WORLD_URL = "https://m.stock.naver.com/worldstock/api/stock/{code}/integration"
+NAVER_SUFFIXES = ['.O', '.N', '.K', '']  # 로이터 코드 거래소 접미사 (나스닥, 뉴욕, 아멕스, 기타)
+_naver_codes = {}  # 종목 -> 확인된 로이터 코드
+
+
+def naver_number(value):
+    """'1,234.5' / '12.3배' / '0.44%' -> float (변환 불가 시 0)"""
+    try: return float(re.sub(r'[^\d.\-]', '', str(value)) or 0)
+    except ValueError: return 0.0
+
+
+def parse_naver_us_data(ticker, res):
+    """네이버 해외주식 integration 응답 -> 시세/지표 dict (종목 정보가 없으면 None)"""
+    if not res or not res.get('stockName'): return None
+    infos = {item.get('code'): item.get('value') for item in res.get('totalInfos') or []}
+
+    def pick(*keys):
+        for key in keys:
+            value = res.get(key, infos.get(key))
+            if value not in (None, '', '-'): return naver_number(value)
+        return 0.0
+    price = pick('closePrice', 'lastClosePrice')
+    if not price: return None
+    return {
+        '기업명': res['stockName'],
+        '업종': None,
+        '현재가': price,
+        '52주 고점': pick('high52Weeks', 'highPriceOf52Weeks') or price,
+        '52주 저점': pick('low52Weeks', 'lowPriceOf52Weeks') or price,
+        'PER': pick('per'),
+        'PBR': pick('pbr'),
+        '배당률 (%)': pick('dividendYieldRatio', 'dividendYield'),
+    }
+
+
+def get_naver_us_data(ticker):
+    """네이버 해외주식 API로 시세/지표 수집 (로이터 코드 접미사는 처음 찾은 것을 기억)"""
+    headers = {'User-Agent': 'Mozilla/5.0', 'Referer': 'https://m.stock.naver.com/'}
+    codes = [_naver_codes[ticker]] if ticker in _naver_codes else [f"{ticker}{s}" for s in NAVER_SUFFIXES]
+    for code in codes:
+        res = clients.get_session().get(NAVER_WORLD_URL.format(code=code), headers=headers, timeout=5)
+        if res.status_code == 404: continue
+        res.raise_for_status()
+        data = parse_naver_us_data(ticker, res.json())
+        if data:
+            _naver_codes[ticker] = code
+            return data
+    return None
+
+
+# ==============================================================================
+# 일봉 수집 (지표 계산용): 컬럼은 pykrx 형식(고가/저가/종가/거래량), 인덱스는 날짜
+# ==============================================================================
+BAR_COLUMNS = ['고가', '저가', '종가', '거래량']
+
+
+def fetch_kr_bars(ticker, start, end):
+    """pykrx 일봉 (start, end: YYYYMMDD)"""
+    return krx().get_market_ohlcv_by_date(start, end, ticker)[BAR_COLUMNS]
+
+
+def fetch_us_bars(ticker, start, end):
+    """yfinance 일봉 (요청 시점에만 yfinance 로드)"""
+    import yfinance as yf
+    end_next = (datetime.strptime(end, "%Y%m%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    hist = yf.Ticker(ticker).history(start=datetime.strptime(start, "%Y%m%d").strftime("%Y-%m-%d"), end=end_next, auto_adjust=False)
+    hist.index = pd.DatetimeIndex(hist.index).tz_localize(None).normalize()
+    return hist.rename(columns={'High': '고가', 'Low': '저가', 'Close': '종가', 'Volume': '거래량'})[BAR_COLUMNS]
+
+
+def fetch_crypto_bars(ticker, start, end):
+    """업비트 일봉 캔들 (한 번에 최대 200개, 최신순 응답을 날짜순으로 정렬)"""
+    count = min(200, (datetime.now() - datetime.strptime(start, "%Y%m%d")).days + 1)
+    url = f"https://api.upbit.com/v1/candles/days?market=KRW-{ticker}&count={count}"
+    res = clients.get_session().get(url, timeout=5).json()
+    bars = pd.DataFrame({
+        '고가': [c['high_price'] for c in res],
+        '저가': [c['low_price'] for c in res],
+        '종가': [c['trade_price'] for c in res],
+        '거래량': [c['candle_acc_trade_volume'] for c in res],
+    }, index=pd.DatetimeIndex([c['candle_date_time_kst'][:10] for c in res])).sort_index()
+    return bars[(bars.index >= start) & (bars.index <= end)]
+
+
+BAR_FETCHERS = {'kr': fetch_kr_bars, 'us': fetch_us_bars, 'crypto': fetch_crypto_bars}
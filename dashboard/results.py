@@ -0,0 +1,168 @@
+"""분석 결과 캐시 + stale-while-revalidate: 마지막 결과를 즉시 보여주고 백그라운드 스레드에서 갱신
+
+- 결과는 포트폴리오(시장 + 종목 목록)별로 등급 산정 전 원본을 저장 -> 현재 필터 기준으로 다시 등급 산정
+- 저장 시각이 시장별 신선도 예산(FRESHNESS_BUDGET)을 넘으면 백그라운드 갱신 대상
+- 갱신 스레드는 Streamlit API를 호출하지 않고, 도착한 행만 모아 둠 (UI가 poll로 가져감)
+- 종목별 행은 시장 단위 행 저장소에도 갱신 시각과 함께 보관 -> 종목 목록이 바뀌면 추가/만료된 종목만 다시 분석
+"""
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+
+from .config import CACHE_DIR, FRESHNESS_BUDGET
+from .engine import analyze_market
+from .fields import expand_columns
+from .model import ResultBuffer
+
+RESULT_DIR = os.path.join(CACHE_DIR, "results")
+ROW_META = ['갱신시각', '수집컬럼']  # 행 저장소 전용 컬럼 (분석 시각, 요청 컬럼 서명: 빈 문자열은 전체)
+_rows_lock = threading.Lock()
+
+
+def result_path(market, tickers):
+    key = hashlib.sha1(",".join(tickers).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(RESULT_DIR, f"{market}_{key}.parquet")
+
+
+def save_result(market, tickers, df, saved_at=None):
+    """등급 산정 전 결과 저장 (저장 시각은 파일 수정 시각, 재사용한 행이 있으면 가장 오래된 행의 시각)"""
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    path = result_path(market, tickers)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.drop(columns=['투자등급'], errors='ignore').to_parquet(tmp)
+    os.replace(tmp, path)
+    if saved_at: os.utime(path, (saved_at, saved_at))
+    return saved_at or time.time()
+
+
+def load_result(market, tickers):
+    """저장된 결과 -> (DataFrame, 저장 시각), 없거나 읽을 수 없으면 (None, None)"""
+    path = result_path(market, tickers)
+    try:
+        return pd.read_parquet(path), os.path.getmtime(path)
+    except (OSError, ValueError):  # 파일 없음/손상 (pyarrow ArrowInvalid는 ValueError)
+        return None, None
+
+
+def is_stale(market, saved_at, now=None):
+    return saved_at is None or (now or time.time()) - saved_at > FRESHNESS_BUDGET.get(market, 0)
+
+
+def age_label(saved_at, now=None):
+    """저장 시각 -> '방금 전' / 'N분 전' / 'N시간 전' / 'N일 전'"""
+    seconds = max(0, (now or time.time()) - saved_at)
+    if seconds < 60: return "방금 전"
+    for unit, size in [("일", 86400), ("시간", 3600), ("분", 60)]:
+        if seconds >= size: return f"{int(seconds // size)}{unit} 전"
+
+
+def merge_rows(base, rows, tickers):
+    """이전 결과에 새로 도착한 행(dict 목록 또는 DataFrame)을 덮어쓰고 포트폴리오 종목 순서로 정렬"""
+    fresh = pd.DataFrame(rows)
+    if base is None or base.empty: merged = fresh
+    elif fresh.empty: merged = base
+    else: merged = pd.concat([base[~base['종목'].isin(fresh['종목'])], fresh], ignore_index=True)
+    order = {t: i for i, t in enumerate(tickers)}
+    return merged.sort_values('종목', key=lambda s: s.map(order)).reset_index(drop=True)
+
+
+# ==============================================================================
+# 종목별 행 저장소: 종목 목록 변경 시 증분 재분석
+# ==============================================================================
+def rows_path(market):
+    return os.path.join(RESULT_DIR, f"{market}_rows.parquet")
+
+
+def columns_key(columns):
+    columns = expand_columns(columns)
+    return "" if columns is None else ",".join(sorted(columns))
+
+
+def load_rows(market):
+    try: return pd.read_parquet(rows_path(market))
+    except (OSError, ValueError): return None  # 파일 없음/손상 (pyarrow ArrowInvalid는 ValueError)
+
+
+def save_rows(market, df, columns=None, now=None):
+    """분석한 행을 시장별 행 저장소에 반영 (같은 종목은 새 행으로 교체)"""
+    if df.empty: return
+    rows = df.drop(columns=['투자등급'], errors='ignore').assign(**{'갱신시각': now or time.time(), '수집컬럼': columns_key(columns)})
+    with _rows_lock:
+        stored = load_rows(market)
+        if stored is not None:
+            rows = pd.concat([stored[~stored['종목'].isin(rows['종목'])], rows], ignore_index=True)
+        os.makedirs(RESULT_DIR, exist_ok=True)
+        path = rows_path(market)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        rows.to_parquet(tmp)
+        os.replace(tmp, path)
+
+
+def reusable_rows(market, tickers, columns=None, now=None):
+    """종목 목록과 행 저장소 비교 -> (재사용할 행 DataFrame 또는 None, 그중 가장 오래된 갱신 시각, 새로 분석할 종목 목록)
+    신선도 예산 안이고, 전체 컬럼 또는 같은 컬럼으로 분석한 행만 재사용 (목록에서 빠진 종목은 자연히 제외)"""
+    stored = load_rows(market)
+    if stored is None: return None, None, list(tickers)
+    now = now or time.time()
+    key = columns_key(columns)
+    fresh = stored[stored['종목'].isin(tickers) & (now - stored['갱신시각'] <= FRESHNESS_BUDGET.get(market, 0))
+                   & stored['수집컬럼'].isin(["", key])]
+    reused = set(fresh['종목'])
+    missing = [t for t in tickers if t not in reused]
+    if fresh.empty: return None, None, missing
+    return fresh.drop(columns=ROW_META).reset_index(drop=True), float(fresh['갱신시각'].min()), missing
+
+
+def analyze_incremental(tickers, market, columns=None, on_row=None, **analyze_kwargs):
+    """추가/만료된 종목만 분석하고 나머지는 행 저장소에서 재사용 -> (결과, 오류 목록, 새로 분석한 종목, 가장 오래된 행의 시각)
+    결과는 입력 종목 순서를 유지"""
+    base, oldest, missing = reusable_rows(market, tickers, columns)
+    fresh, errors = ResultBuffer(0).to_frame(), []
+    if missing:
+        now = time.time()
+        fresh, errors = analyze_market(missing, market, on_row=on_row, columns=columns, **analyze_kwargs)
+        save_rows(market, fresh, columns, now)
+        if not fresh.empty: oldest = min(oldest or now, now)
+    if base is None: return fresh, errors, missing, oldest
+    return merge_rows(base, fresh, tickers), errors, missing, oldest
+
+
+class BackgroundRefresh:
+    """한 시장의 포트폴리오를 데몬 스레드에서 다시 분석(추가/만료된 종목만)하고, 도착한 행을 버전 번호와 함께 보관"""
+    __slots__ = ('market', 'tickers', 'rows', 'errors', 'result', 'saved_at', 'version', '_lock', '_thread')
+
+    def __init__(self, market, tickers, **analyze_kwargs):
+        self.market, self.tickers = market, list(tickers)
+        self.rows, self.errors = [], []
+        self.result = self.saved_at = None
+        self.version = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, kwargs=analyze_kwargs, daemon=True)
+        self._thread.start()
+
+    def _add(self, row):
+        with self._lock:
+            self.rows.append(row)
+            self.version += 1
+
+    def _run(self, **analyze_kwargs):
+        try:
+            df, errors, _, oldest = analyze_incremental(self.tickers, self.market, on_row=self._add, **analyze_kwargs)
+            saved_at = save_result(self.market, self.tickers, df, oldest) if not df.empty else None
+        except Exception as e:
+            df, errors, saved_at = None, [f"{self.market} 갱신 실패: {e}"], None
+        with self._lock:
+            self.result, self.errors, self.saved_at = df, errors, saved_at
+            self.version += 1
+
+    @property
+    def done(self):
+        return not self._thread.is_alive()
+
+    def poll(self):
+        """(버전, 지금까지 도착한 행, 완료 시 최종 결과 또는 None, 오류 메시지 목록)"""
+        with self._lock:
+            return self.version, list(self.rows), self.result, list(self.errors)
@@ -0,0 +1,215 @@
+"""포트폴리오 위험 분석: 일봉 저장소의 시장별 일봉으로 일간 수익률 행렬을 맞춰 상관/공분산, 종목별/포트폴리오 변동성 계산
+
+- 날짜: 전 시장 합집합 달력, 각 종목의 수익률은 그 종목의 거래일에만 정의 (휴장일은 마스크, 0으로 채우지 않음)
+- 통계: 종목 쌍의 공통 거래일 합계(N, ΣX, ΣX², ΣXY)를 행렬로 보관 -> 새 날짜는 더하고 기간 밖으로 밀려난 날짜는 빼는 증분 갱신
+- 시장마다 일봉이 갱신되는 시각이 달라, 모든 시장에 일봉이 들어온 날짜까지만 반영 (늦게 들어온 일봉을 건너뛰지 않도록)
+- 순서: 상관 거리(1 - ρ)의 평균 연결 계층 군집 잎 순서 (scipy 없이 NumPy로 계산)
+- 종목 키는 "시장:종목" (시장이 달라도 종목 코드가 같을 수 있으므로), 수익률은 각 시장의 현지 통화 기준 (원화/달러 혼합)
+"""
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from .bars import load_history
+from .config import CACHE_DIR
+from .indicators import TRADING_DAYS
+
+RISK_DIR = os.path.join(CACHE_DIR, "risk")
+RISK_WINDOW = 120      # 상관/변동성 계산 기간 (합집합 달력 날짜 수)
+MIN_OVERLAP = 20       # 상관계수/변동성을 신뢰할 최소 공통 거래일 수 (미만이면 NaN)
+STALE_DAYS = 7         # 마지막 일봉이 가장 최근 종목보다 이만큼 오래되면 반영 기준일 계산에서 제외 (거래 정지 등)
+REBUILD_EVERY = 30     # 증분 갱신을 이 횟수만큼 한 뒤에는 전체 재계산 (더하고 빼는 부동소수점 오차 누적 방지)
+HIGH_CORR = 0.8        # 쏠림 경고 상관계수
+
+
+def name_key(market, ticker):
+    """행렬/보고서의 종목 키 ("시장:종목")"""
+    return f"{market}:{ticker}"
+
+
+def returns_frame(names):
+    """[(시장, 종목)] -> 저장된 종가의 일간 로그 수익률 (날짜 합집합 x "시장:종목"), 종목의 비거래일은 NaN"""
+    columns = {}
+    for market, ticker in names:
+        _, bars = load_history(market, ticker)
+        columns[name_key(market, ticker)] = np.log(bars['종가'].astype('float64')).diff()
+    frame = pd.DataFrame(columns, columns=[name_key(m, t) for m, t in names])
+    return frame.sort_index().dropna(how='all')
+
+
+def complete_until(frame):
+    """모든 종목(거래 정지 등 STALE_DAYS 이상 멈춘 종목 제외)의 일봉이 들어온 마지막 날짜 (없으면 None)"""
+    last = frame.apply(pd.Series.last_valid_index).dropna()
+    if last.empty: return None
+    last = pd.DatetimeIndex(last)
+    return last[last >= last.max() - pd.Timedelta(days=STALE_DAYS)].min()
+
+
+class RiskMatrix:
+    """최근 window개 날짜의 종목 쌍별 공통 거래일 합계: 날짜 단위로 더하고 빼서 갱신, 공분산/상관/변동성은 합계에서 바로 계산"""
+    __slots__ = ('names', 'window', 'dates', 'returns', 'mask', 'n', 'sx', 'sxx', 'sxy', 'updates')
+
+    def __init__(self, names, window=RISK_WINDOW):
+        k = len(names)
+        self.names, self.window = list(names), window
+        self.dates = pd.DatetimeIndex([])
+        self.returns, self.mask = np.empty((0, k)), np.empty((0, k), dtype=bool)
+        # [i, j]: 종목 i, j가 모두 거래한 날의 일수 / i 수익률 합 / i 수익률 제곱합 / i x j 수익률 곱의 합
+        self.n, self.sx, self.sxx, self.sxy = (np.zeros((k, k)) for _ in range(4))
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _accumulate(self, x, mask, sign):
+        m = mask.astype('float64')
+        self.n += sign * (m.T @ m)
+        self.sx += sign * (x.T @ m)
+        self.sxx += sign * ((x * x).T @ m)
+        self.sxy += sign * (x.T @ x)
+
+    def update(self, frame):
+        """수익률 DataFrame(날짜 x 종목)에서 마지막 반영일 이후 + 모든 시장 일봉이 들어온 날짜까지만 더하고,
+        window 밖으로 밀려난 날짜는 뺌 -> 반영한 날짜 수"""
+        until = complete_until(frame)
+        if until is None: return 0
+        frame = frame.reindex(columns=self.names).loc[:until]
+        if len(self.dates): frame = frame[frame.index > self.dates[-1]]
+        frame = frame.dropna(how='all').iloc[-self.window:]
+        if frame.empty: return 0
+
+        values = frame.to_numpy(dtype='float64')
+        mask = ~np.isnan(values)
+        x = np.where(mask, values, 0.0)
+        self._accumulate(x, mask, 1)
+        self.dates = self.dates.append(frame.index)
+        self.returns, self.mask = np.vstack([self.returns, x]), np.vstack([self.mask, mask])
+        drop = len(self.dates) - self.window
+        if drop > 0:
+            self._accumulate(self.returns[:drop], self.mask[:drop], -1)
+            self.dates, self.returns, self.mask = self.dates[drop:], self.returns[drop:], self.mask[drop:]
+        self.updates += 1
+        return len(frame)
+
+    def covariance(self):
+        """쌍별 공통 거래일 기준 일간 수익률 공분산 행렬 (공통 거래일이 MIN_OVERLAP 미만이면 NaN)"""
+        n = self.n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = (self.sxy - self.sx * self.sx.T / n) / (n - 1)
+        cov[n < MIN_OVERLAP] = np.nan
+        return cov
+
+    def correlation(self):
+        """쌍별 상관계수 행렬 (각 종목의 분산도 그 쌍의 공통 거래일로 계산 -> -1 ~ 1 범위 유지)"""
+        n = self.n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = (self.sxx - self.sx ** 2 / n) / (n - 1)
+            corr = np.clip(self.covariance() / np.sqrt(var * var.T), -1.0, 1.0)
+        corr[n < MIN_OVERLAP] = np.nan
+        return corr
+
+    def volatility(self):
+        """종목별 연율화 변동성 (%)"""
+        return np.sqrt(np.clip(np.diag(self.covariance()), 0, None) * TRADING_DAYS) * 100
+
+    def portfolio_volatility(self, weights=None):
+        """포트폴리오 연율화 변동성 (%) (weights가 None이면 동일 비중, 변동성을 구할 수 없는 종목은 제외 후 비중 재조정)
+        공통 거래일이 부족한 쌍은 상관 0으로 취급"""
+        cov = self.covariance()
+        valid = ~np.isnan(np.diag(cov))
+        w = np.ones(len(self.names)) if weights is None else np.asarray(weights, dtype='float64').copy()
+        w[~valid] = 0
+        if w.sum() <= 0: return np.nan
+        w /= w.sum()
+        var = w @ np.nan_to_num(cov) @ w
+        return float(np.sqrt(max(var, 0.0) * TRADING_DAYS) * 100)
+
+
+def cluster_order(corr):
+    """상관 거리(1 - ρ) 평균 연결 계층 군집의 잎 순서 (비슷하게 움직이는 종목끼리 붙도록, ρ가 NaN이면 거리 1)"""
+    n = len(corr)
+    if n <= 2: return np.arange(n)
+    dist = 1 - np.nan_to_num(np.asarray(corr, dtype='float64'), nan=0.0)
+    np.fill_diagonal(dist, np.inf)
+    sizes = np.ones(n)
+    leaves = [[i] for i in range(n)]
+    for _ in range(n - 1):
+        a, b = divmod(int(np.argmin(dist)), n)
+        merged = (dist[a] * sizes[a] + dist[b] * sizes[b]) / (sizes[a] + sizes[b])  # 평균 연결 (Lance-Williams)
+        dist[a, :], dist[:, a] = merged, merged
+        dist[b, :], dist[:, b] = np.inf, np.inf
+        dist[a, a] = np.inf
+        sizes[a] += sizes[b]
+        leaves[a] += leaves[b]
+    return np.array(leaves[a])
+
+
+# ==============================================================================
+# 저장소
+# ==============================================================================
+def matrix_path(names, window):
+    digest = hashlib.sha1(repr((sorted(names), window)).encode()).hexdigest()[:16]
+    return os.path.join(RISK_DIR, f"{digest}.pkl")
+
+
+def load_matrix(names, window=RISK_WINDOW):
+    """저장된 행렬 (없거나 종목 구성이 다르면 None)"""
+    try:
+        with open(matrix_path(names, window), "rb") as f:
+            matrix = pickle.load(f)
+        if isinstance(matrix, RiskMatrix) and matrix.names == [name_key(m, t) for m, t in names]: return matrix
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError):  # 파일 없음/손상, 이전 버전 클래스
+        pass
+    return None
+
+
+def save_matrix(names, matrix):
+    """임시 파일에 기록 후 교체"""
+    os.makedirs(RISK_DIR, exist_ok=True)
+    path = matrix_path(names, matrix.window)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(matrix, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def risk_matrix(names, window=RISK_WINDOW):
+    """[(시장, 종목)]의 위험 행렬: 저장된 행렬에 새 날짜만 반영 (종목 구성이 바뀌었거나 REBUILD_EVERY회 갱신했으면 새로 계산)"""
+    names = list(dict.fromkeys(names))
+    matrix = load_matrix(names, window)
+    if matrix is None or matrix.updates >= REBUILD_EVERY:
+        matrix = RiskMatrix([name_key(m, t) for m, t in names], window)
+    if matrix.update(returns_frame(names)): save_matrix(names, matrix)
+    return matrix
+
+
+class RiskReport:
+    """화면/리포트용 위험 요약: 군집 순서로 정렬한 상관 행렬, 종목별 변동성, 포트폴리오 변동성, 고상관 쌍"""
+    __slots__ = ('corr', 'volatility', 'portfolio', 'average', 'pairs', 'days')  # average: 종목 쌍 평균 상관계수
+
+    def __init__(self, matrix, weights=None):
+        corr = matrix.correlation()
+        order = cluster_order(corr)
+        names = [matrix.names[i] for i in order]
+        self.corr = pd.DataFrame(corr[np.ix_(order, order)], index=names, columns=names)
+        self.volatility = pd.Series(matrix.volatility()[order], index=names, name='변동성 (%)')
+        self.portfolio = matrix.portfolio_volatility(weights)
+        upper = np.triu(np.ones(corr.shape, dtype=bool), 1)
+        self.average = float(np.nanmean(corr[upper])) if upper.any() and not np.isnan(corr[upper]).all() else np.nan
+        i, j = np.nonzero(upper & (np.nan_to_num(corr) >= HIGH_CORR))
+        self.pairs = pd.DataFrame({'종목 1': [matrix.names[k] for k in i], '종목 2': [matrix.names[k] for k in j],
+                                   '상관계수': corr[i, j]}).sort_values('상관계수', ascending=False, ignore_index=True)
+        self.days = len(matrix)
+
+
+def analyze_risk(names, weights=None, window=RISK_WINDOW):
+    """[(시장, 종목)] + 종목별 비중(names와 같은 순서, None이면 동일 비중) -> RiskReport
+    일봉 저장소에 없는 종목은 변동성/상관 NaN, 같은 종목이 여러 번 있으면 비중을 합산 (보고서의 종목 키는 "시장:종목")"""
+    matrix = risk_matrix(names, window)
+    if weights is not None:
+        weights = pd.Series(np.asarray(weights, dtype='float64'), index=[name_key(m, t) for m, t in names])
+        weights = weights.groupby(level=0).sum().reindex(matrix.names).fillna(0).to_numpy()
+    return RiskReport(matrix, weights)
@@ -0,0 +1,162 @@
+"""업종 상대가치 테이블: 전 종목 펀더멘털로 업종별 중앙값 PER/PBR/배당률을 하루 한 번 계산해 O(1) 조회
+
+- 한국 주식: pykrx 업종 분류 + 마지막 완성 개장일 스냅샷(PER/PBR/DIV) -> 종목별 (업종, 자체 지표, 업종 중앙값) 테이블
+  (장중 스냅샷은 값이 계속 바뀌므로 당일 스냅샷으로 만든 테이블을 하루 동안 쓰지 않음)
+- 미국 주식: Finnhub profile2의 finnhubIndustry와 지표를 분석할 때마다 누적 -> 업종별 중앙값
+  전 종목 지표를 받을 무료 API가 없어 지금까지 분석한 종목만 표본이 되므로, 업종당 SECTOR_MIN_COUNT개가 모이기
+  전까지는 업종 지표가 0(N/A) -> 화면에 표본 수를 함께 표시 (us_coverage)
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from .bars import last_closed_day
+from .config import CACHE_DIR
+from .providers import krx
+from .snapshots import load_snapshot
+
+SECTOR_DIR = os.path.join(CACHE_DIR, "sectors")
+US_OBSERVATIONS = os.path.join(SECTOR_DIR, "us_observations.parquet")
+SECTOR_MIN_COUNT = 3  # 중앙값을 신뢰할 최소 종목 수 (미만이면 업종 지표 0 = N/A)
+KR_MARKETS = ['KOSPI', 'KOSDAQ']
+HOLIDAY_LOOKBACK = 10  # 마지막 개장일을 찾을 때 거슬러 올라가는 최대 일수 (연휴 고려)
+RETRY_SEC = 300        # 테이블 생성 실패 후 다시 시도하기까지 대기 시간 (장애 중 종목마다 전 종목 스냅샷을 다시 조회하지 않도록)
+
+# 종목 지표 컬럼 -> 업종 중앙값 컬럼
+SECTOR_COLUMNS = {'PER': '업종PER', 'PBR': '업종PBR', '배당률 (%)': '업종배당률 (%)'}
+EMPTY_SECTOR = {'업종': None, '업종PER': 0.0, '업종PBR': 0.0, '업종배당률 (%)': 0.0}
+
+_lock = threading.Lock()  # _tables/_key_locks 접근과 미국 관측값 파일 갱신을 함께 보호
+_key_locks = {}
+_tables = {}  # (market, 기준일) -> {종목 또는 업종: 조회 결과 dict}
+_failed = {}  # (market, 기준일) -> 마지막 생성 실패 시각
+
+
+def sector_medians(df):
+    """종목별 (업종, PER, PBR, 배당률 (%)) -> 업종별 중앙값 (PER/PBR은 적자/자본잠식 제외 양수만, 배당률은 무배당 포함)"""
+    values = df[list(SECTOR_COLUMNS)].copy()
+    values[['PER', 'PBR']] = values[['PER', 'PBR']].where(values[['PER', 'PBR']] > 0)
+    grouped = values.groupby(df['업종'], observed=True)
+    medians = grouped.median().where(grouped.count() >= SECTOR_MIN_COUNT).fillna(0).round(2)
+    return medians.rename(columns=SECTOR_COLUMNS)
+
+
+def _cached(key, build):
+    """하루 단위 테이블을 프로세스 안에서 한 번만 생성 (동시 수집 스레드는 생성 완료를 기다림, build가 None이면 실패)
+    실패하면 빈 dict를 돌려주고 RETRY_SEC 동안은 다시 생성하지 않음, 생성은 키별 잠금으로 직렬화하고, _tables 조회/저장은 _lock 안에서만 (record_us_observations의 무효화와 경합 방지)"""
+    with _lock:
+        table = _tables.get(key)
+        if table is not None: return table
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        with _lock:
+            table = _tables.get(key)
+        if table is None:
+            if time.monotonic() - _failed.get(key, -RETRY_SEC) < RETRY_SEC: return {}
+            table = build()
+            if table is None:
+                _failed[key] = time.monotonic()
+                return {}
+            with _lock:
+                _tables[key] = table
+    return table
+
+
+# ==============================================================================
+# 한국 주식: 전 종목 업종 테이블
+# ==============================================================================
+def kr_table_path(day):
+    return os.path.join(SECTOR_DIR, f"kr_{day}.parquet")
+
+
+def build_kr_table(day):
+    """업종 분류 + 당일 스냅샷 -> 종목별 업종/PER/PBR/배당률 + 업종 중앙값 DataFrame"""
+    stock = krx()
+    sectors = pd.concat([stock.get_market_sector_classifications(day, m)['업종명'] for m in KR_MARKETS])
+    snapshot = load_snapshot(day)
+    df = snapshot[['PER', 'PBR', 'DIV']].rename(columns={'DIV': '배당률 (%)'}).join(sectors.rename('업종'), how='inner')
+    df.index.name = '종목'
+    return df.join(sector_medians(df), on='업종')
+
+
+def closed_session(day):
+    """day(오늘이면 전일)부터 거슬러 올라가 스냅샷이 비어 있지 않은 마지막 개장일 (찾지 못하면 None)"""
+    start = datetime.strptime(min(day, last_closed_day('kr')), "%Y%m%d")
+    for i in range(HOLIDAY_LOOKBACK):
+        session = (start - timedelta(days=i)).strftime("%Y%m%d")
+        if not load_snapshot(session).empty: return session
+    return None
+
+
+def load_kr_table(day):
+    """당일 테이블 로드 (없으면 생성 후 저장, 이전 날짜 파일은 삭제)"""
+    path = kr_table_path(day)
+    if os.path.exists(path): return pd.read_parquet(path)
+    df = build_kr_table(day)
+    os.makedirs(SECTOR_DIR, exist_ok=True)
+    df.to_parquet(path)
+    for name in os.listdir(SECTOR_DIR):
+        if name.startswith("kr_") and name != os.path.basename(path): os.remove(os.path.join(SECTOR_DIR, name))
+    return df
+
+
+def kr_fundamentals(ticker, day):
+    """한국 종목의 (업종, PER, PBR, 배당률, 업종 중앙값) dict (테이블에 없거나 생성 실패 시 None)
+    테이블은 day 기준 마지막 완성 개장일 스냅샷으로 만들고, 캐시 키는 day (날짜가 바뀌면 새로 생성)"""
+    def build():
+        try:
+            session = closed_session(day)
+            return load_kr_table(session).to_dict('index') if session else None
+        except (OSError, ValueError, KeyError, AttributeError):  # pykrx 조회 실패/빈 응답, 저장 파일 손상
+            return None
+    return _cached(('kr', day), build).get(ticker)
+
+
+# ==============================================================================
+# 미국 주식: 분석 결과 누적 -> 업종 중앙값
+# ==============================================================================
+def read_us_observations():
+    if not os.path.exists(US_OBSERVATIONS):
+        return pd.DataFrame({'업종': pd.Series(dtype='object'), **{col: pd.Series(dtype='float64') for col in SECTOR_COLUMNS}},
+                            index=pd.Index([], name='종목'))
+    return pd.read_parquet(US_OBSERVATIONS)
+
+
+def us_sector(industry, day=None):
+    """미국 업종(finnhubIndustry)의 중앙값 dict (누적 종목이 부족하면 0)"""
+    day = day or datetime.now().strftime("%Y%m%d")
+
+    def build():
+        try: return sector_medians(read_us_observations()).to_dict('index')
+        except (OSError, ValueError): return None  # 관측값 파일 손상
+    medians = _cached(('us', day), build).get(industry) if industry else None
+    return {**EMPTY_SECTOR, '업종': industry or None, **(medians or {})}
+
+
+def us_coverage():
+    """미국 업종 중앙값의 표본 현황 -> (누적 종목 수, 중앙값을 낸 업종 수 = SECTOR_MIN_COUNT개 이상 모인 업종)"""
+    try: observed = read_us_observations()
+    except (OSError, ValueError): return 0, 0
+    counts = observed['업종'].value_counts()
+    return len(observed), int((counts >= SECTOR_MIN_COUNT).sum())
+
+
+def record_us_observations(df):
+    """분석 결과의 (종목, 업종, PER, PBR, 배당률 (%))를 누적 저장 (같은 종목은 최신 값으로 교체)"""
+    rows = df.loc[df['업종'].notna(), ['종목', '업종', *SECTOR_COLUMNS]].set_index('종목')
+    if rows.empty: return
+    with _lock:
+        merged = rows.astype({col: 'float64' for col in SECTOR_COLUMNS})
+        if os.path.exists(US_OBSERVATIONS):
+            merged = pd.concat([pd.read_parquet(US_OBSERVATIONS), merged])
+            merged = merged[~merged.index.duplicated(keep='last')]
+        os.makedirs(SECTOR_DIR, exist_ok=True)
+        tmp = f"{US_OBSERVATIONS}.{os.getpid()}.tmp"
+        merged.to_parquet(tmp)
+        os.replace(tmp, US_OBSERVATIONS)
+        # 같은 날 다음 분석부터 새 관측값을 반영하도록 중앙값 캐시 무효화
+        for key in [key for key in _tables if key[0] == 'us']: del _tables[key]
+        for key in [key for key in _failed if key[0] == 'us']: del _failed[key]
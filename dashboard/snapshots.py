@@ -0,0 +1,94 @@
+"""일별 전 종목 시세/펀더멘털 스냅샷 저장소 (pykrx, 한국 주식): 백테스트용 (일자 x 종목) 패널 구성"""
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .config import CACHE_DIR
+from .providers import krx
+
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+SNAPSHOT_COLUMNS = ['고가', '저가', '종가', '거래량', 'PER', 'PBR', 'DIV']
+LOOKBACK_DAYS = 365  # 52주 고점/저점 계산을 위해 시작일 이전에 추가로 읽는 기간
+
+
+def snapshot_path(day):
+    return os.path.join(SNAPSHOT_DIR, f"{day}.parquet")
+
+
+def fetch_snapshot(day):
+    """하루치 전 종목 시세 + 펀더멘털 (휴장일이면 빈 DataFrame)"""
+    stock = krx()
+    ohlcv = stock.get_market_ohlcv(day, market="ALL")
+    if ohlcv.empty or (ohlcv['종가'] == 0).all():
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS, dtype='float32')
+    fundamental = stock.get_market_fundamental(day, market="ALL")
+    df = ohlcv[['고가', '저가', '종가', '거래량']].join(fundamental[['PER', 'PBR', 'DIV']], how='left')
+    df.index.name = '종목'
+    return df.fillna(0).astype('float32')
+
+
+def load_snapshot(day):
+    """하루치 스냅샷 (저장본이 없으면 수집 후 저장)"""
+    path = snapshot_path(day)
+    if os.path.exists(path): return pd.read_parquet(path)
+    df = fetch_snapshot(day)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    df.to_parquet(path)
+    return df
+
+
+def update_snapshots(start, end, on_progress=None):
+    """start~end(YYYYMMDD) 평일 중 저장되지 않은 날짜만 수집 (휴장일은 빈 파일로 기록해 다시 조회하지 않음) -> 새로 받은 일수"""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    fetched = 0
+    for day in pd.bdate_range(start, end).strftime("%Y%m%d"):
+        if os.path.exists(snapshot_path(day)): continue
+        fetch_snapshot(day).to_parquet(snapshot_path(day))
+        fetched += 1
+        if on_progress: on_progress(day)
+    return fetched
+
+
+def read_snapshots(start, end):
+    """저장된 스냅샷을 (일자, 종목) 인덱스의 긴 DataFrame으로 결합 (휴장일 제외)"""
+    frames = {}
+    for day in pd.bdate_range(start, end).strftime("%Y%m%d"):
+        if not os.path.exists(snapshot_path(day)): continue
+        df = pd.read_parquet(snapshot_path(day))
+        if not df.empty: frames[pd.Timestamp(day)] = df
+    if not frames: return None
+    return pd.concat(frames, names=['일자', '종목'])
+
+
+class Panel:
+    """(일자 x 종목) float32 배열 묶음: 종가, 52주 고점/저점, PER, 업종PER, 배당률"""
+    __slots__ = ('dates', 'tickers', 'close', 'high', 'low', 'per', 'sec_per', 'div')
+
+    def __init__(self, dates, tickers, close, high, low, per, div, sec_per=None):
+        self.dates, self.tickers = dates, tickers
+        self.close, self.high, self.low = close, high, low
+        self.per, self.div = per, div
+        self.sec_per = np.zeros_like(per) if sec_per is None else sec_per  # 과거 업종PER이 없으면 0 (업종적자와 동일 취급)
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+
+def load_panel(start, end):
+    """저장된 스냅샷으로 패널 구성 (52주 고점/저점은 시작일 이전 1년까지 읽어 롤링 계산)"""
+    lookback = (datetime.strptime(start, "%Y%m%d") - timedelta(days=LOOKBACK_DAYS)).strftime("%Y%m%d")
+    long = read_snapshots(lookback, end)
+    if long is None: return None
+    wide = {col: long[col].unstack('종목') for col in ['고가', '저가', '종가', 'PER', 'DIV']}
+    # 시간 기반 롤링 창: 달력 기준 365일 (기존 one_year_ago 계산과 동일)
+    high = wide['고가'].rolling(f"{LOOKBACK_DAYS}D").max()
+    low = wide['저가'].rolling(f"{LOOKBACK_DAYS}D").min()
+    keep = wide['종가'].index >= pd.Timestamp(start)
+
+    def arr(frame):
+        return frame.loc[keep].to_numpy(dtype='float32')
+
+    return Panel(wide['종가'].index[keep], wide['종가'].columns, arr(wide['종가']), arr(high), arr(low), arr(wide['PER']), arr(wide['DIV']))
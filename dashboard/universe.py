@@ -0,0 +1,187 @@
+"""종목 유니버스 색인: 시장별 전체 종목 목록으로 자동완성 검색과 입력 종목 사전 검증
+
+- 한국: pykrx KOSPI/KOSDAQ 주식 + ETF 코드/종목명, 미국: Finnhub 심볼 목록, 코인: 업비트 원화 마켓 (한글/영문명)
+- 목록은 cache/universe/{market}_{날짜}.parquet로 하루 한 번만 수집, 프로세스 안에서는 색인을 한 번만 생성
+- 접두어 검색: 정규화한 (코드, 이름, 영문명) 키를 정렬해 두고 bisect로 O(log n) 조회
+- 부분 문자열 검색: 이름 바이그램(2글자) 역색인의 후보 교집합만 확인 ('전자' -> 삼성전자, LG전자 ...)
+- 목록을 받을 수 없으면 색인 None -> 검증/검색 생략 (분석은 기존처럼 진행)
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from . import clients
+from .config import CACHE_DIR, FINNHUB_API_KEY
+from .providers import krx
+
+UNIVERSE_DIR = os.path.join(CACHE_DIR, "universe")
+US_SYMBOLS_URL = "https://finnhub.io/api/v1/stock/symbol"
+UPBIT_MARKETS_URL = "https://api.upbit.com/v1/market/all"
+SEARCH_LIMIT = 10  # 자동완성 후보 수
+RETRY_SEC = 300    # 목록 수집 실패 후 다시 시도하기까지 대기 시간 (오프라인에서 매 화면 갱신마다 대기하지 않도록)
+KR_MARKETS = ['KOSPI', 'KOSDAQ']
+
+UNIVERSE_COLUMNS = ['종목', '이름', '영문명']
+
+_lock = threading.Lock()
+_key_locks = {}
+_indexes = {}  # (market, 날짜) -> SymbolIndex
+_failed = {}   # (market, 날짜) -> 마지막 실패 시각
+
+
+# ==============================================================================
+# 시장별 종목 목록 수집
+# ==============================================================================
+def kr_symbols(day):
+    """한국 주식/ETF (종목코드, 종목명) -> DataFrame (같은 이름은 주식이 ETF보다 뒤에 와서 우선)"""
+    stock = krx()
+    codes = list(stock.get_etf_ticker_list(day))
+    names = [stock.get_etf_ticker_name(t) for t in codes]
+    for market in KR_MARKETS:
+        market_codes = list(stock.get_market_ticker_list(day, market=market))
+        codes += market_codes
+        names += [stock.get_market_ticker_name(t) for t in market_codes]
+    return pd.DataFrame({'종목': codes, '이름': names, '영문명': ""})
+
+
+def us_symbols(day):
+    """Finnhub 미국 거래소 전체 심볼 (심볼, 회사명)"""
+    res = clients.get_session().get(US_SYMBOLS_URL, params={'exchange': 'US', 'token': FINNHUB_API_KEY}, timeout=30).json()
+    df = pd.DataFrame(res, columns=['symbol', 'description'])
+    return pd.DataFrame({'종목': df['symbol'].str.upper(), '이름': df['description'].fillna(""), '영문명': ""})
+
+
+def crypto_symbols(day):
+    """업비트 원화 마켓 (KRW- 접두어를 뺀 코드, 한글명, 영문명)"""
+    res = clients.get_session().get(UPBIT_MARKETS_URL, params={'isDetails': 'false'}, timeout=10).json()
+    df = pd.DataFrame(res, columns=['market', 'korean_name', 'english_name'])
+    df = df[df['market'].str.startswith("KRW-")]
+    return pd.DataFrame({'종목': df['market'].str[4:], '이름': df['korean_name'], '영문명': df['english_name']})
+
+
+SYMBOL_FETCHERS = {'kr': kr_symbols, 'us': us_symbols, 'crypto': crypto_symbols}
+
+
+def universe_path(market, day):
+    return os.path.join(UNIVERSE_DIR, f"{market}_{day}.parquet")
+
+
+def load_universe(market, day=None):
+    """당일 종목 목록 로드 (없으면 수집 후 저장, 이전 날짜 파일은 삭제)"""
+    day = day or datetime.now().strftime("%Y%m%d")
+    path = universe_path(market, day)
+    if os.path.exists(path): return pd.read_parquet(path)
+    df = SYMBOL_FETCHERS[market](day)[UNIVERSE_COLUMNS].astype(str).reset_index(drop=True)
+    os.makedirs(UNIVERSE_DIR, exist_ok=True)
+    df.to_parquet(path)
+    for name in os.listdir(UNIVERSE_DIR):
+        if name.startswith(f"{market}_") and name != os.path.basename(path): os.remove(os.path.join(UNIVERSE_DIR, name))
+    return df
+
+
+# ==============================================================================
+# 색인
+# ==============================================================================
+def normalize(text):
+    """검색 키 정규화: 공백 제거 + 대소문자 무시"""
+    return "".join(str(text).split()).casefold()
+
+
+def bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class SymbolIndex:
+    """종목 목록 1개의 접두어(bisect) + 바이그램 색인"""
+    __slots__ = ('symbols', 'codes', 'by_name', 'keys', 'rows', 'names', 'postings')
+
+    def __init__(self, symbols):
+        self.symbols = symbols.reset_index(drop=True)
+        self.codes = frozenset(self.symbols['종목'])
+        self.by_name = {normalize(name): code for col in ['이름', '영문명']
+                        for name, code in zip(self.symbols[col], self.symbols['종목']) if name}
+        entries = sorted({(normalize(value), row) for col in UNIVERSE_COLUMNS
+                          for row, value in enumerate(self.symbols[col]) if value})
+        self.keys = [key for key, _ in entries]
+        self.rows = [row for _, row in entries]
+        # 부분 문자열 검색 대상: 이름 + 영문명 (정규화)
+        self.names = [normalize(f"{name} {english}") for name, english in zip(self.symbols['이름'], self.symbols['영문명'])]
+        postings = {}
+        for row, name in enumerate(self.names):
+            for gram in bigrams(name): postings.setdefault(gram, []).append(row)
+        self.postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, ticker):
+        return ticker in self.codes
+
+    def prefix_rows(self, query, limit):
+        """정규화 키가 query로 시작하는 행 번호 (키 순서, 중복 제거)"""
+        found, i = {}, bisect_left(self.keys, query)
+        while i < len(self.keys) and self.keys[i].startswith(query) and len(found) < limit:
+            found.setdefault(self.rows[i], None)
+            i += 1
+        return list(found)
+
+    def substring_rows(self, query, limit):
+        """이름/영문명에 query가 들어 있는 행 번호 (바이그램 후보 교집합 후 확인)"""
+        grams = bigrams(query)
+        if not grams: return []
+        lists = sorted((self.postings.get(g) for g in grams), key=lambda a: 0 if a is None else len(a))
+        if lists[0] is None: return []
+        candidates = lists[0]
+        for other in lists[1:]:
+            candidates = np.intersect1d(candidates, other, assume_unique=True)
+            if not len(candidates): return []
+        return [row for row in candidates.tolist() if query in self.names[row]][:limit]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """자동완성 후보 [(종목, 이름)]: 코드 일치 -> 접두어 일치 -> 부분 문자열 일치 순"""
+        query = normalize(query)
+        if not query: return []
+        rows = dict.fromkeys(self.prefix_rows(query, limit))
+        if len(rows) < limit:
+            rows.update(dict.fromkeys(self.substring_rows(query, limit)))
+        codes = self.symbols['종목']
+        ordered = sorted(list(rows)[:limit], key=lambda r: normalize(codes[r]) != query)
+        return [(codes[r], self.symbols['이름'][r]) for r in ordered]
+
+    def resolve(self, text):
+        """코드 또는 종목명(정확히 일치, 공백/대소문자 무시) -> 종목 코드 (없으면 None)"""
+        return text if text in self.codes else self.by_name.get(normalize(text))
+
+    def validate(self, tickers):
+        """종목 목록 -> (유효한 종목, 목록에 없는 종목), 입력 순서 유지"""
+        return [t for t in tickers if t in self.codes], [t for t in tickers if t not in self.codes]
+
+
+def symbol_index(market, day=None):
+    """시장의 당일 색인 (프로세스 안에서 한 번만 생성, 목록을 받을 수 없으면 None을 돌려주고 RETRY_SEC 후 재시도)"""
+    day = day or datetime.now().strftime("%Y%m%d")
+    key = (market, day)
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        if key not in _indexes:
+            if time.monotonic() - _failed.get(key, -RETRY_SEC) < RETRY_SEC: return None
+            try: symbols = load_universe(market, day)
+            except (OSError, ValueError, KeyError, AttributeError): symbols = None  # 네트워크/pykrx 실패, 빈 응답, 저장 파일 손상
+            if symbols is None or symbols.empty:
+                _failed[key] = time.monotonic()
+                return None
+            _indexes[key] = SymbolIndex(symbols)
+    return _indexes[key]
+
+
+def validate_tickers(market, tickers):
+    """입력 종목 사전 검증 -> (분석할 종목, 목록에 없는 종목), 색인을 만들 수 없으면 전부 분석 대상"""
+    index = symbol_index(market)
+    if index is None: return list(tickers), []
+    return index.validate(tickers)
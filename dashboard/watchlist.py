@@ -0,0 +1,177 @@
+"""관심 목록 일괄 가져오기: 수천 종목의 CSV/xlsx를 청크 단위로 읽어 검증/중복 제거 후 SQLite 저장소에 보관
+
+- 입력: 종목 컬럼이 있는 CSV/xlsx (history/의 분석 결과 파일, stock_valuation.xlsx 포함)
+  머리글 행에서 종목 컬럼(종목/종목코드/티커/기업 등)과 시장 컬럼(시장/국가)을 찾고, 다른 시장의 행은 건너뜀
+- 파일 전체를 DataFrame으로 읽지 않음: CSV는 read_csv(chunksize), xlsx는 openpyxl read_only 행 반복
+- 종목 목록 색인(universe)으로 코드 검증, 코드가 아닌 값은 종목명으로 코드 변환 (한국 종목명 등)
+- 저장소: watchlists.sqlite (목록 이름 + 시장 -> 순서 있는 종목 목록), 포트폴리오 파일은 "watchlist"로 목록을 참조
+"""
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from itertools import chain, islice
+
+import pandas as pd
+
+from .holdings import COUNTRY_MARKETS
+from .universe import symbol_index
+
+WATCHLIST_PATH = "watchlists.sqlite"
+CHUNK_ROWS = 500  # 한 번에 읽어 검증하는 행 수
+
+# 머리글 이름 -> 값 종류 (앞쪽이 우선: 코드 컬럼이 있으면 기업명 컬럼보다 먼저 사용)
+SYMBOL_HEADERS = ['종목', '종목코드', '티커', 'ticker', 'symbol', 'code', '기업', '기업명', 'name']
+MARKET_HEADERS = ['시장', '국가', 'market']
+
+
+class ImportReport:
+    """가져오기 결과: 저장한 종목, 중복/다른 시장 행 수, 찾지 못한 값"""
+    __slots__ = ('tickers', 'rows', 'duplicates', 'skipped', 'unknown', 'validated')
+
+    def __init__(self):
+        self.tickers, self.unknown = [], []
+        self.rows = self.duplicates = self.skipped = 0
+        self.validated = True  # 종목 목록 색인을 쓸 수 없으면 False (입력값을 그대로 저장)
+
+
+# ==============================================================================
+# 스트리밍 읽기
+# ==============================================================================
+def _find_header(row):
+    """머리글 행 -> (종목 컬럼 위치, 시장 컬럼 위치 또는 None), 머리글이 아니면 None"""
+    names = [str(v).strip().casefold() if v is not None else "" for v in row]
+    symbol = next((names.index(h) for h in SYMBOL_HEADERS if h in names), None)
+    if symbol is None: return None
+    market = next((names.index(h) for h in MARKET_HEADERS if h in names), None)
+    return symbol, market
+
+
+def _rows_with_header(rows):
+    """행 반복자 -> (종목 값, 시장 값) 반복자 (시장 컬럼이 없으면 시장 값 None, 빈 칸은 "")
+    처음 CHUNK_ROWS 행 안의 머리글 행 다음부터 읽고, 머리글이 없으면 첫 컬럼을 종목으로 보고 처음부터 읽음"""
+    rows = iter(rows)
+    head = list(islice(rows, CHUNK_ROWS))
+    pos = next((i for i, row in enumerate(head) if _find_header(row)), None)
+    symbol, market = (0, None) if pos is None else _find_header(head[pos])
+    for row in chain(head[0 if pos is None else pos + 1:], rows):
+        if not row or symbol >= len(row): continue
+        if market is None: yield row[symbol], None
+        else: yield row[symbol], (row[market] if market < len(row) and row[market] is not None else "")
+
+
+def iter_csv(file):
+    """CSV -> 행 반복자 (CHUNK_ROWS 행씩 읽음, 모든 값은 문자열)"""
+    for chunk in pd.read_csv(file, header=None, dtype=str, chunksize=CHUNK_ROWS, encoding="utf-8-sig",
+                             skip_blank_lines=True, keep_default_na=False):
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def iter_xlsx(file, sheet_name=0):
+    """xlsx -> 행 반복자 (openpyxl read_only: 시트 전체를 메모리에 올리지 않음)"""
+    from openpyxl import load_workbook
+    book = load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = book.worksheets[sheet_name] if isinstance(sheet_name, int) else book[sheet_name]
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        book.close()
+
+
+def iter_symbols(file, filename):
+    """업로드 파일(또는 경로) -> (종목 값, 시장 값) 반복자 (확장자로 형식 결정)"""
+    rows = iter_xlsx(file) if filename.lower().endswith((".xlsx", ".xlsm")) else iter_csv(file)
+    return _rows_with_header(rows)
+
+
+# ==============================================================================
+# 검증
+# ==============================================================================
+def normalize_symbol(value, market):
+    """셀 값 -> 종목 코드 후보 (엑셀이 숫자로 바꾼 한국 종목코드 5930 -> 005930)"""
+    if value is None: return ""
+    if isinstance(value, float) and value.is_integer(): value = int(value)
+    text = str(value).strip()
+    if market == 'kr' and text.isdigit(): return text.zfill(6)
+    return text.upper()
+
+
+def row_market(value):
+    """시장 컬럼 값 -> 시장 코드 (kr/us/crypto 또는 한국/미국/코인)"""
+    text = str(value).strip()
+    return COUNTRY_MARKETS.get(text, text.lower())
+
+
+def collect(symbols, market, on_progress=None):
+    """(종목 값, 시장 값) 반복자 -> ImportReport (CHUNK_ROWS 행마다 on_progress(읽은 행 수) 호출)"""
+    report, seen = ImportReport(), set()
+    index = symbol_index(market)
+    report.validated = index is not None
+    for value, value_market in symbols:
+        report.rows += 1
+        if on_progress and report.rows % CHUNK_ROWS == 0: on_progress(report.rows)
+        text = normalize_symbol(value, market)
+        if not text: continue
+        if value_market is not None and row_market(value_market) != market:  # 다른 시장 또는 시장이 빈 행 (시트의 다른 표 등)
+            report.skipped += 1
+            continue
+        ticker = text if index is None else index.resolve(text)
+        if ticker is None:
+            report.unknown.append(str(value).strip())
+        elif ticker in seen:
+            report.duplicates += 1
+        else:
+            seen.add(ticker)
+            report.tickers.append(ticker)
+    return report
+
+
+def import_watchlist(file, filename, market, name, path=None, on_progress=None):
+    """파일을 읽어 검증한 종목을 관심 목록 name으로 저장 -> ImportReport"""
+    report = collect(iter_symbols(file, filename), market, on_progress)
+    if report.tickers: save_watchlist(name, market, report.tickers, path)
+    return report
+
+
+# ==============================================================================
+# 저장소
+# ==============================================================================
+@contextmanager
+def _connect(path=None):
+    """저장소 연결: 블록이 끝나면 커밋(예외면 롤백)하고 연결을 닫음"""
+    with closing(sqlite3.connect(path or WATCHLIST_PATH, timeout=30)) as conn, conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS watchlists (name TEXT, market TEXT, updated REAL, PRIMARY KEY (name, market))")
+        conn.execute("CREATE TABLE IF NOT EXISTS members (name TEXT, market TEXT, pos INTEGER, ticker TEXT, "
+                     "PRIMARY KEY (name, market, pos))")
+        yield conn
+
+
+def save_watchlist(name, market, tickers, path=None):
+    """관심 목록 저장 (같은 이름은 교체)"""
+    with _connect(path) as conn:
+        conn.execute("DELETE FROM members WHERE name = ? AND market = ?", (name, market))
+        conn.executemany("INSERT INTO members VALUES (?, ?, ?, ?)", ((name, market, i, t) for i, t in enumerate(tickers)))
+        conn.execute("INSERT OR REPLACE INTO watchlists VALUES (?, ?, ?)", (name, market, time.time()))
+
+
+def load_watchlist(name, market, path=None):
+    """관심 목록의 종목 (저장 순서, 없으면 빈 목록)"""
+    if not os.path.exists(path or WATCHLIST_PATH): return []
+    with _connect(path) as conn:
+        rows = conn.execute("SELECT ticker FROM members WHERE name = ? AND market = ? ORDER BY pos", (name, market)).fetchall()
+    return [t for t, in rows]
+
+
+def list_watchlists(market, path=None):
+    """시장의 관심 목록 [(이름, 종목 수)] (최근 저장 순)"""
+    if not os.path.exists(path or WATCHLIST_PATH): return []
+    with _connect(path) as conn:
+        return conn.execute("SELECT w.name, COUNT(m.ticker) FROM watchlists w LEFT JOIN members m "
+                            "ON m.name = w.name AND m.market = w.market WHERE w.market = ? "
+                            "GROUP BY w.name ORDER BY MAX(w.updated) DESC", (market,)).fetchall()
+
+
+def delete_watchlist(name, market, path=None):
+    with _connect(path) as conn:
+        conn.execute("DELETE FROM members WHERE name = ? AND market = ?", (name, market))
+        conn.execute("DELETE FROM watchlists WHERE name = ? AND market = ?", (name, market))
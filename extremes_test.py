@@ -0,0 +1,119 @@
+"""롤링 52주 고점/저점 인덱스 점검: 단조 덱 결과가 구간별 max()/min() 재계산과 일치하는지, 장중 재실행 시 당일 봉을 새로 반영하는지,
+시장별 봉 완성 시각, 휴장일 재실행 시 시세 재조회 생략 확인
+
+    python extremes_test.py        # 결과 출력
+    python -m pytest extremes_test.py
+"""
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from dashboard import bars as bar_store
+from dashboard.extremes import RollingExtremes, extremes_frame
+
+
+def sample_bars(days=700, seed=0):
+    """임의 보행 일봉 (pykrx OHLCV 컬럼 형식)"""
+    close = 100 + np.random.default_rng(seed).normal(size=days).cumsum()
+    return pd.DataFrame({'고가': close + 1, '저가': close - 1, '종가': close}, index=pd.bdate_range('2023-01-02', periods=days))
+
+
+def brute_force(bars, i):
+    """기존 방식: 1년 구간을 잘라 매번 max()/min()"""
+    day = bars.index[i]
+    window = bars[(bars.index >= day - pd.Timedelta(days=365)) & (bars.index <= day)]
+    return window['고가'].max(), window['저가'].min(), (day - window['고가'][::-1].idxmax()).days
+
+
+def test_matches_brute_force():
+    bars = sample_bars()
+    frame = extremes_frame(bars)
+    for i in range(0, len(bars), 7):
+        high, low, since = brute_force(bars, i)
+        assert np.isclose(frame['52주 고점'].iloc[i], high) and np.isclose(frame['52주 저점'].iloc[i], low)
+        assert frame['고점후경과일'].iloc[i] == since
+
+
+def test_incremental_append():
+    bars = sample_bars()
+    ext = RollingExtremes()
+    assert ext.extend(bars.iloc[:400]) == 400
+    assert ext.extend(bars.iloc[350:]) == len(bars) - 400  # 이미 반영된 날짜는 무시
+    high, low, _ = brute_force(bars, len(bars) - 1)
+    assert np.isclose(ext.high, high) and np.isclose(ext.low, low)
+    assert np.isclose(ext.drawdown(), (bars['종가'].iloc[-1] / high - 1) * 100)
+
+
+def test_same_day_rerun_uses_live_bar():
+    """장중 재실행: 당일 봉은 저장하지 않고 매번 새로 받아 현재가/고저에 반영"""
+    today = datetime.now().strftime("%Y%m%d")
+    history = sample_bars(300)
+    history.index = pd.bdate_range(end=datetime.now() - timedelta(days=1), periods=300).normalize()
+    live_close = [100.0]
+
+    def fetch(ticker, start, end):
+        if start == end == today:
+            c = live_close[0]
+            return pd.DataFrame({'고가': [c], '저가': [c], '종가': [c], '거래량': [1.0]}, index=pd.DatetimeIndex([pd.Timestamp(today)]))
+        days = history[(history.index >= pd.Timestamp(start)) & (history.index <= pd.Timestamp(end))]
+        return days.assign(거래량=1.0)
+    saved = bar_store.BARS_DIR, bar_store.BAR_FETCHERS['kr'], bar_store.last_closed_day
+    bar_store.BARS_DIR, bar_store.BAR_FETCHERS['kr'] = tempfile.mkdtemp(), fetch
+    bar_store.last_closed_day = lambda market='kr': (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")  # 장중
+    try:
+        one_year_ago = (datetime.now() - timedelta(days=365)).strftime("%Y%m%d")
+        ext, _ = bar_store.update_kr_extremes('000000', today, one_year_ago)
+        assert ext.last_close == 100.0
+        live_close[0] = 1_000.0  # 같은 날 시세 변동
+        ext, bars = bar_store.update_kr_extremes('000000', today, one_year_ago)
+        assert ext.last_close == 1_000.0 and ext.high == 1_000.0 and bars['종가'].iloc[-1] == 1_000.0
+        stored_ext, stored = bar_store.load_history('kr', '000000')  # 저장소에는 전일까지의 완성된 봉만
+        assert stored.index[-1] < pd.Timestamp(today) and stored_ext.last_date < pd.Timestamp(today)
+        assert bar_store.update_history('kr', '000000', today)[1].index[-1] < pd.Timestamp(today)
+    finally:
+        bar_store.BARS_DIR, bar_store.BAR_FETCHERS['kr'], bar_store.last_closed_day = saved
+
+
+def test_last_closed_day_per_market():
+    at = lambda text: pd.Timestamp(text, tz="Asia/Seoul")
+    # 5일(금) 밤 미국 장은 한국 시각 6일 05:00에도 진행 중(서머타임 아님), 07:00이면 마감
+    assert bar_store.last_closed_day('us', at("2024-01-06 05:00")) == "20240104"
+    assert bar_store.last_closed_day('us', at("2024-01-06 07:00")) == "20240105"
+    # 업비트 5일 일봉은 6일 09:00 KST까지 진행
+    assert bar_store.last_closed_day('crypto', at("2024-01-06 08:59")) == "20240104"
+    assert bar_store.last_closed_day('crypto', at("2024-01-06 09:00")) == "20240105"
+    assert bar_store.last_closed_day('kr', at("2024-01-05 15:40")) == "20240104"
+    assert bar_store.last_closed_day('kr', at("2024-01-05 18:00")) == "20240105"
+
+
+def test_holiday_rerun_skips_fetch():
+    """휴장일: 새 봉이 없어도 확인한 기준일을 기록해 같은 기준일 재실행은 시세를 다시 조회하지 않음"""
+    history = sample_bars(300).assign(거래량=1.0)
+    calls = []
+
+    def fetch(ticker, start, end):
+        calls.append((start, end))
+        return history[(history.index >= pd.Timestamp(start)) & (history.index <= pd.Timestamp(end))]
+    saturday = (history.index[-1] + pd.Timedelta(days=1)).strftime("%Y%m%d")
+    one_year_ago = (history.index[-1] - pd.Timedelta(days=365)).strftime("%Y%m%d")
+    saved = bar_store.BARS_DIR, bar_store.BAR_FETCHERS['us']
+    bar_store.BARS_DIR, bar_store.BAR_FETCHERS['us'] = tempfile.mkdtemp(), fetch
+    try:
+        friday = history.index[-1].strftime("%Y%m%d")
+        bar_store.update_history('us', 'AAA', friday, one_year_ago)
+        bar_store.update_history('us', 'AAA', saturday, one_year_ago)  # 새 봉 없음
+        _, bars = bar_store.update_history('us', 'AAA', saturday, one_year_ago)
+        assert len(calls) == 2 and calls[1] == (saturday, saturday) and bars.index[-1] == history.index[-1]
+    finally:
+        bar_store.BARS_DIR, bar_store.BAR_FETCHERS['us'] = saved
+
+
+if __name__ == "__main__":
+    test_matches_brute_force()
+    test_incremental_append()
+    test_same_day_rerun_uses_live_bar()
+    test_last_closed_day_per_market()
+    test_holiday_rerun_skips_fetch()
+    print("✅ 통과")
@@ -0,0 +1,80 @@
+"""미국 제공자 체인 점검: 헤지 요청으로 느린 1순위 우회, 실패 시 다음 제공자, 서킷 브레이커, 건강도 순서 확인
+
+    python failover_test.py        # 결과 출력
+    python -m pytest failover_test.py
+"""
+import time
+
+from dashboard import failover
+from dashboard.failover import CLOSED, OPEN, ProviderChain, ProviderError
+from dashboard.providers import parse_naver_us_data
+
+FAST, SLOW = 0.02, 1.0  # 정상 응답 / 지연 응답 시간 (초)
+
+
+def provider(name, delay=FAST, fail=False, calls=None):
+    def fetch(ticker):
+        if calls is not None: calls.append(name)
+        time.sleep(delay)
+        if fail: raise ConnectionError(f"{name} down")
+        return {'현재가': 1.0, '제공자': name}
+    return fetch
+
+
+def test_hedged_request_cuts_tail_latency():
+    delays = iter([FAST] * failover.MIN_SAMPLES + [SLOW])  # 1순위가 p95를 쌓은 뒤 한 번 지연
+    chain = ProviderChain({'primary': lambda t: provider('primary', next(delays))(t), 'secondary': provider('secondary', FAST * 2)})
+    for _ in range(failover.MIN_SAMPLES):
+        assert chain.fetch('AAPL')[1] == 'primary'
+    started = time.perf_counter()
+    result, name = chain.fetch('AAPL')
+    elapsed = time.perf_counter() - started
+    assert name == 'secondary' and elapsed < SLOW / 2, f"{elapsed:.2f}초"
+
+
+def test_failover_and_circuit_breaker():
+    calls = []
+    chain = ProviderChain({'finnhub': provider('finnhub', fail=True, calls=calls), 'naver': provider('naver', calls=calls)})
+    assert chain.fetch('AAPL')[1] == 'naver' and calls == ['finnhub', 'naver']  # 실패 -> 다음 제공자
+    assert chain.ordered()[0] == 'naver'  # 건강도가 낮아진 제공자는 뒤로
+    for _ in range(failover.FAILURE_THRESHOLD - 1):
+        try: chain._call('finnhub', 'AAPL')
+        except ConnectionError: pass
+    assert chain.health['finnhub'].state == OPEN
+    calls.clear()
+    chain.providers['naver'] = lambda t: calls.append('naver')  # 종목 없음(None) -> 다음 제공자 차례
+    assert chain.fetch('AAPL') == (None, None) and calls == ['naver']  # 열린 브레이커는 호출하지 않음
+
+    chain.health['finnhub'].opened_at -= failover.COOLDOWN_SEC  # 쿨다운 경과 -> 시험 호출 1건
+    chain.providers['finnhub'] = provider('finnhub', calls=calls)
+    assert chain.health['finnhub'].try_acquire() and not chain.health['finnhub'].try_acquire()
+    chain._call('finnhub', 'AAPL')
+    assert chain.health['finnhub'].state == CLOSED
+
+
+def test_all_failed_or_missing():
+    chain = ProviderChain({'a': provider('a', fail=True), 'b': provider('b', fail=True)})
+    try:
+        chain.fetch('AAPL')
+        assert False, "ProviderError 예상"
+    except ProviderError as e:
+        assert 'a=ConnectionError' in str(e) and 'b=ConnectionError' in str(e)
+    assert ProviderChain({'a': lambda t: None, 'b': lambda t: None}).fetch('ZZZZ') == (None, None)
+
+
+def test_parse_naver():
+    res = {'stockName': '엔비디아', 'closePrice': '1,094.50',
+           'totalInfos': [{'code': 'highPriceOf52Weeks', 'value': '1,200.00'}, {'code': 'per', 'value': '55.21배'},
+                          {'code': 'dividendYieldRatio', 'value': '0.01%'}]}
+    data = parse_naver_us_data('NVDA', res)
+    assert data['현재가'] == 1094.5 and data['52주 고점'] == 1200.0 and data['52주 저점'] == 1094.5
+    assert data['PER'] == 55.21 and data['배당률 (%)'] == 0.01
+    assert parse_naver_us_data('NONE', {'stockName': None}) is None
+
+
+if __name__ == "__main__":
+    test_hedged_request_cuts_tail_latency()
+    test_failover_and_circuit_breaker()
+    test_all_failed_or_missing()
+    test_parse_naver()
+    print("✅ 통과")
@@ -0,0 +1,132 @@
+"""필드 의존 그래프 점검: 요청 컬럼에 필요한 노드만 평가, 시장 단위 노드 1회 평가, 종목 노드 메모이즈,
+optional 노드 실패 보고, 비동기 수집의 컬럼/공유 캐시 사용, 수집 중 종목별 진행 보고 확인
+
+    python fields_test.py        # 결과 출력
+    python -m pytest fields_test.py
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from dashboard import aio, cache, engine, fields
+from dashboard.cache import MemoryCache, use_cache
+from dashboard.extremes import RollingExtremes
+
+calls = Counter()
+FAKED = ['get_safe_trading_day', 'krx', 'update_kr_extremes', 'kr_fundamentals', 'get_crypto_data', 'update_history', 'fetch_news']
+
+
+def fake_bars():
+    close = np.linspace(100, 120, 80)
+    return pd.DataFrame({'고가': close + 1, '저가': close - 1, '종가': close, '거래량': 1000.0},
+                        index=pd.bdate_range('2025-01-01', periods=80))
+
+
+def counted(name, value):
+    def fn(*args):
+        calls[name] += 1
+        return value(*args) if callable(value) else value
+    return fn
+
+
+@contextmanager
+def fakes():
+    """수집 함수를 호출 횟수를 세는 가짜로, 공유 캐시를 새 메모리 캐시로 교체 (끝나면 원래 함수/캐시로 복원)"""
+    saved = {name: getattr(fields, name) for name in FAKED}, aio.kr_fundamentals, cache._shared
+    calls.clear()
+    use_cache(MemoryCache())
+    ext = RollingExtremes()
+    ext.extend(fake_bars())
+    fields.get_safe_trading_day = counted('trading_day', '20250421')
+    fields.krx = lambda: type('K', (), {'get_market_ticker_name': staticmethod(counted('name', lambda t: f"종목{t}"))})
+    fields.update_kr_extremes = counted('kr_history', (ext, fake_bars()))
+    fields.kr_fundamentals = counted('fundamentals', {'PER': 8.0, 'PBR': 0.9, '배당률 (%)': 3.0, '업종': '은행',
+                                                      '업종PER': 10.0, '업종PBR': 1.0, '업종배당률 (%)': 4.0})
+    fields.get_crypto_data = counted('crypto_quote', {'현재가': 100.0, '52주 고점': 150.0, '52주 저점': 50.0, '24시간 변동률 (%)': 1.0})
+    fields.update_history = counted('history', (None, fake_bars()))
+    fields.fetch_news = counted('news', [("호재 상승", "호재 상승 돌파")])
+    try:
+        yield
+    finally:
+        for name, fn in saved[0].items(): setattr(fields, name, fn)
+        aio.kr_fundamentals = saved[1]
+        use_cache(saved[2])
+
+
+def test_required_nodes():
+    assert fields.required_nodes('crypto') == ['quote', 'history', 'news']
+    assert fields.required_nodes('kr', ['현재가']) == ['name', 'trading_day', 'history']
+    assert set(fields.required_nodes('us', ['투자등급'])) == {'quote', 'sector', 'history', 'news'}  # 등급 입력: 업종PER, RSI, 감성
+    assert 'news' not in fields.required_nodes('crypto', ['현재가', 'RSI(14)'])
+
+
+def test_lazy_evaluation_and_sharing():
+    with fakes():
+        df, errors = engine.analyze_market(['BTC', 'ETH'], 'crypto', columns=['현재가', '상승여력 (%)'])
+        assert not errors and len(df) == 2
+        assert calls == Counter(crypto_quote=2)  # 일봉/뉴스/개장일 조회 없음
+        assert df['핵심키워드'].isna().all() and df['RSI(14)'].isna().all()
+
+        df, errors = engine.analyze_market(['005930', '000660', '035420'], 'kr', workers=3, columns=['현재가', 'PER'])
+        assert not errors and df['PER'].tolist() == [8.0] * 3
+        assert calls['trading_day'] == 1 and calls['kr_history'] == 3 and calls['news'] == 0
+
+
+def test_memoized_per_ticker_and_day():
+    with fakes():
+        engine.analyze_market(['BTC'], 'crypto')
+        df, _ = engine.analyze_market(['BTC'], 'crypto')   # 같은 날 재분석 -> 모든 노드 캐시 적중
+        assert calls == Counter(crypto_quote=1, history=1, news=1)
+        assert df['뉴스감성'].notna().all() and df['핵심키워드'].notna().all()
+
+
+def test_optional_failure_reported():
+    with fakes():
+        def down(*args): raise ConnectionError("news down")
+        fields.fetch_news = down
+        df, errors = engine.analyze_market(['BTC'], 'crypto')
+        assert errors == ["BTC 일부 수집 실패: news=ConnectionError: news down"]
+        assert len(df) == 1 and df['뉴스감성'].tolist() == ['N/A']  # 뉴스 컬럼만 비우고 분석 계속
+
+
+def test_async_uses_columns_and_cache():
+    with fakes():
+        aio.kr_fundamentals = fields.kr_fundamentals
+        engine.analyze_market(['005930'], 'kr', columns=['현재가', 'PER'])
+        before = Counter(calls)
+        df, errors = engine.analyze_market(['005930', '000660'], 'kr', use_async=True, columns=['현재가', 'PER'])
+        assert not errors and df['PER'].tolist() == [8.0, 8.0] and df['핵심키워드'].isna().all()
+        # 005930은 동기 수집이 남긴 캐시 재사용, 000660만 새로 수집 (뉴스는 요청하지 않아 호출 없음)
+        assert calls - before == Counter(trading_day=1, name=1, kr_history=1, fundamentals=1) and calls['news'] == 0
+
+
+def test_progress_reported_during_collection():
+    with fakes():
+        first_reported, seen_before_last = threading.Event(), []
+
+        def quote(ticker):
+            if ticker == 'D': seen_before_last.append(first_reported.wait(2))  # 마지막 종목 수집 중에 앞 종목 진행 보고가 나와야 함
+            return {'현재가': 100.0, '52주 고점': 150.0, '52주 저점': 50.0, '24시간 변동률 (%)': 1.0}
+        fields.get_crypto_data = quote
+        reported = []
+
+        def on_progress(ticker):
+            reported.append(ticker)
+            first_reported.set()
+        df, _ = engine.analyze_market(list('ABCD'), 'crypto', workers=2, columns=['현재가'], on_progress=on_progress)
+        assert seen_before_last == [True] and reported == list('ABCD') and len(df) == 4
+
+
+if __name__ == "__main__":
+    for market in fields.GRAPH:
+        print(f"{market}: 전체 {fields.required_nodes(market)} / 현재가만 {fields.required_nodes(market, ['현재가'])}")
+    test_required_nodes()
+    test_lazy_evaluation_and_sharing()
+    test_memoized_per_ticker_and_day()
+    test_optional_failure_reported()
+    test_async_uses_columns_and_cache()
+    test_progress_reported_during_collection()
+    print("✅ 통과")
@@ -0,0 +1,124 @@
+"""미국 펀더멘털 저장소 점검: metric 시계열 누적(새 기간만 추가), 공시 예상일 전 호출 생략 + 시세 환산, 추세 컬럼 일괄 계산,
+순이익률 추세 가점은 margin_trend를 켤 때만 적용되는지 확인
+
+    python fundamentals_test.py        # 결과 출력
+    python -m pytest fundamentals_test.py
+"""
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from dashboard import clients, fundamentals
+from dashboard.engine import classify
+from dashboard.fundamentals import Fundamentals, merge_series, needs_refresh, parse_series, trend_columns
+
+N_TICKERS = 500        # 추세 계산 종목 수
+TREND_BUDGET = 0.5     # 추세 컬럼 일괄 계산 허용 시간 (초)
+
+
+def payload(periods, pe=20.0):
+    """분기 말 periods의 pe/netMargin 시계열 + 스칼라 지표 (분기마다 PER -1, 순이익률 +1%p)"""
+    return {
+        'metric': {'52WeekHigh': 120.0, '52WeekLow': 80.0, 'peBasicExclExtraTTM': pe, 'pbAnnual': 5.0,
+                   'dividendYieldIndicatedAnnual': 2.0},
+        'series': {'quarterly': {'pe': [{'period': p, 'v': pe + i} for i, p in enumerate(periods)],
+                                 'netMargin': [{'period': p, 'v': 0.20 - 0.01 * i} for i, p in enumerate(periods)]},
+                   'annual': {'pe': [{'period': periods[-1], 'v': pe}]}},
+    }
+
+
+PERIODS = ['2025-09-30', '2025-06-30', '2025-03-31', '2024-12-31']  # Finnhub 응답처럼 최신 기간이 먼저
+
+
+class FakeResponse:
+    def __init__(self, data): self.data = data
+    def json(self): return self.data
+
+
+class FakeSession:
+    """Finnhub 엔드포인트별 호출 횟수를 세는 세션"""
+    def __init__(self, price=100.0):
+        self.price, self.calls = price, []
+
+    def get(self, url, params=None, timeout=None):
+        name = url.rsplit('/', 1)[-1]
+        self.calls.append(name)
+        if name == 'quote': return FakeResponse({'c': self.price})
+        if name == 'profile2': return FakeResponse({'name': "Apple Inc", 'finnhubIndustry': "Technology"})
+        return FakeResponse(payload(PERIODS))
+
+
+def test_merge_adds_only_new_periods():
+    stored = parse_series(payload(PERIODS[1:]))
+    merged, added = merge_series(stored, parse_series(payload(PERIODS)))
+    assert added == 2  # 새 분기의 pe/netMargin 두 행
+    assert len(merged) == len(stored) + 2
+    assert merge_series(merged, parse_series(payload(PERIODS)))[1] == 0
+
+
+def test_metric_fetched_only_when_due():
+    saved = fundamentals.FUNDAMENTALS_DIR, clients._session
+    fundamentals.FUNDAMENTALS_DIR = tempfile.mkdtemp()
+    session = FakeSession()
+    clients.use_session(session)
+    try:
+        first = fundamentals.get_finnhub_data('AAPL')
+        assert session.calls == ['quote', 'profile2', 'metric'] and first['PER'] == 20.0 and first['업종'] == "Technology"
+
+        # 다음 조회는 시세만 호출하고 저장된 지표를 현재 시세로 환산
+        session.calls, session.price = [], 125.0
+        second = fundamentals.get_finnhub_data('AAPL')
+        assert session.calls == ['quote'] and second['기업명'] == "Apple Inc"
+        assert second['PER'] == 25.0 and second['배당률 (%)'] == 1.6 and second['52주 고점'] == 125.0
+
+        record = fundamentals.load_fundamentals('AAPL')
+        day = lambda text: datetime.strptime(text, "%Y-%m-%d").timestamp()
+        record.checked = record.fetched = day('2025-11-10')
+        assert not needs_refresh(record, day('2025-12-01'))    # 다음 분기(12월 말) 실적 공시 전
+        assert needs_refresh(record, day('2025-12-20'))        # 스칼라 지표가 METRIC_MAX_AGE보다 오래됨
+        record.fetched = day('2026-02-10')
+        assert needs_refresh(record, day('2026-02-16'))        # 12월 말 분기 실적 공시 예상일이 지남
+        record.checked = day('2026-02-16')
+        assert not needs_refresh(record, day('2026-02-16') + 3600)  # 아직 새 기간이 없으면 하루 뒤에 다시 확인
+    finally:  # 이후 테스트가 가짜 세션/임시 저장소를 쓰지 않도록 복원
+        fundamentals.FUNDAMENTALS_DIR = saved[0]
+        clients.use_session(saved[1])
+
+
+def test_trend_columns():
+    records = [Fundamentals(series=parse_series(payload(PERIODS))), None,
+               Fundamentals(series=parse_series(payload(PERIODS[:2])))]
+    trends = trend_columns(['A', 'B', 'C'], records)
+    assert np.isclose(trends['PER 추세'][0], -1.0) and np.isclose(trends['순이익률 추세 (%p)'][0], 1.0)
+    assert np.isnan(trends['PER 추세'][1:]).all()  # 이력 없음 / 분기 수 부족
+
+
+def test_margin_trend_bonus_is_opt_in():
+    row = {'고점대비 (%)': -40.0, '상승여력 (%)': 10.0, '감성점수': 1, 'PER': 0.0, '업종PER': 0.0, '배당률 (%)': 0.0,
+           '순이익률 추세 (%p)': 1.0}
+    off = classify(row, 'us', 20, 50, 30, 4.0)
+    assert classify(row, 'us', 20, 50, 30, 4.0, margin_trend=True) != off  # 1.5점 + 0.5점 -> 등급 상승
+    assert classify({**row, '순이익률 추세 (%p)': np.nan}, 'us', 20, 50, 30, 4.0, margin_trend=True) == off
+
+
+def measure_trends(n=N_TICKERS):
+    records = [Fundamentals(series=parse_series(payload(PERIODS, pe=10.0 + i % 20))) for i in range(n)]
+    started = time.perf_counter()
+    trend_columns([f"T{i}" for i in range(n)], records)
+    return time.perf_counter() - started
+
+
+def test_trend_speed():
+    assert measure_trends() < TREND_BUDGET
+
+
+if __name__ == "__main__":
+    print(f"{N_TICKERS}개 종목 추세 컬럼 계산: {measure_trends() * 1000:.1f}ms")
+    test_merge_adds_only_new_periods()
+    test_metric_fetched_only_when_due()
+    test_trend_columns()
+    test_margin_trend_bonus_is_opt_in()
+    test_trend_speed()
+    print("✅ 통과")
@@ -0,0 +1,97 @@
+"""환율 계층 점검: 일별 이력 증분 수집, 장중 조회 실패 시 일별 종가 대체, 컬럼 일괄 환산, 보유 종목 원화 합계 확인
+
+    python fx_test.py        # 결과 출력
+    python -m pytest fx_test.py
+"""
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard import fx
+from dashboard.cache import MemoryCache, use_cache
+from dashboard.holdings import Holdings
+
+N_ROWS = 1_000_000     # 일괄 환산 행 수
+CONVERT_BUDGET = 0.2   # 허용 시간 (초)
+
+
+class CountingRates(fx.StaticRates):
+    """호출 횟수를 세고, 장중 조회는 실패하도록 설정 가능한 고정 환율"""
+    def __init__(self, rates, latest_fails=False):
+        super().__init__(rates)
+        self.calls, self.latest_fails = [], latest_fails
+
+    def daily(self, currency, base, start, end):
+        self.calls.append((start, end))
+        return super().daily(currency, base, start, end)
+
+    def latest(self, currency, base):
+        if self.latest_fails: raise ConnectionError("offline")
+        return super().latest(currency, base)
+
+
+def setup(provider):
+    fx.FX_DIR = tempfile.mkdtemp()
+    fx.use_provider(provider)
+    use_cache(MemoryCache())
+
+
+def test_daily_history_is_incremental():
+    provider = CountingRates({'USD': 1400.0})
+    setup(provider)
+    fx.update_daily('USD', end='20250110')
+    fx.update_daily('USD', end='20250110')   # 이미 저장된 구간 -> 수집 없음
+    fx.update_daily('USD', end='20250117')   # 이후 구간만 수집
+    assert len(provider.calls) == 2 and provider.calls[1][0] == '20250111'
+    rates = fx.rates_on('USD', ['2025-01-11', '2023-01-01'])  # 토요일 -> 금요일 종가, 이력 이전 -> NaN
+    assert rates[0] == 1400.0 and np.isnan(rates[1])
+
+
+def test_latest_rate_cache_and_fallback():
+    setup(CountingRates({'USD': 1350.0}))
+    assert fx.latest_rate('USD') == 1350.0 and fx.latest_rate('KRW') == 1.0
+    assert len(fx.load_intraday('USD')) == 1
+    fx.latest_rate('USD')                    # FX_TTL 안 -> 캐시 재사용, 이력 추가 없음
+    assert len(fx.load_intraday('USD')) == 1
+
+    setup(CountingRates({'USD': 1380.0}, latest_fails=True))
+    assert fx.latest_rate('USD') == 1380.0   # 장중 실패 -> 일별 종가
+
+
+def measure_convert():
+    values = np.random.default_rng(0).uniform(1, 1000, N_ROWS)
+    currencies = np.where(np.arange(N_ROWS) % 3 == 0, 'USD', 'KRW')
+    started = time.perf_counter()
+    converted = fx.convert(values, currencies, {'USD': 1400.0, 'KRW': 1.0})
+    return time.perf_counter() - started, values, currencies, converted
+
+
+def test_convert_vectorized():
+    elapsed, values, currencies, converted = measure_convert()
+    assert np.allclose(converted, values * np.where(currencies == 'USD', 1400.0, 1.0))
+    assert elapsed < CONVERT_BUDGET, f"{N_ROWS}행 환산 {elapsed:.3f}초"
+
+
+def test_holdings_base_total():
+    positions = pd.DataFrame({
+        '시장': ['kr', 'us'], '종목': ['005930', 'AAPL'], '기업명': ['삼성전자', 'Apple'],
+        '보유주수': [10, 2], '평단가': [50000, 150], '배당금': [1444, 1],
+        '현재가': [60000, 200], '52주 고점': [80000, 260], '52주 저점': [50000, 160],
+    })
+    lots, summary = Holdings(positions, use_stored=False).revalue(rates={'KRW': 1.0, 'USD': 1400.0})
+    total = summary.loc['합계 (KRW)']
+    assert total['평가금액'] == 600000 + 400 * 1400 and total['매입금액'] == 500000 + 300 * 1400
+    assert np.isclose(total['수익률 (%)'], (1160000 - 920000) / 920000 * 100)
+    assert np.isclose(lots['전체비중 (%)'].sum(), 100)
+
+
+if __name__ == "__main__":
+    elapsed = measure_convert()[0]
+    print(f"{N_ROWS:,}행 원화 환산: {elapsed * 1000:.1f}ms")
+    test_daily_history_is_incremental()
+    test_latest_rate_cache_and_fallback()
+    test_convert_vectorized()
+    test_holdings_base_total()
+    print("✅ 통과")
@@ -0,0 +1,88 @@
+"""보유 종목 평가 점검: stock_valuation.xlsx 가져오기, 엑셀 수식과 같은 값, 통화별 합계/비중, 재평가 속도 확인
+
+    python holdings_test.py        # 결과 출력
+    python -m pytest holdings_test.py
+"""
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from dashboard.holdings import Holdings, import_sheet
+
+SHEET = "stock_valuation.xlsx"
+KR_CODES = {'현대차': '005380', '기아': '000270', '삼성전자': '005930', 'TIGER미국배당다우': '458730'}
+N_LOTS = 500           # 재평가 속도 측정 포지션 수
+REVALUE_BUDGET = 0.01  # 시세 1회 재평가 허용 시간 (초)
+
+
+def load_sheet():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # openpyxl 조건부 서식 확장 경고
+        positions, unresolved = import_sheet(SHEET, kr_codes=KR_CODES)
+        sheet = pd.read_excel(SHEET, header=None, usecols="B:P", skiprows=9, nrows=len(positions))
+    return positions, unresolved, sheet
+
+
+def test_import_matches_sheet_formulas():
+    positions, unresolved, sheet = load_sheet()
+    assert not unresolved and len(positions) == 22
+    assert positions.loc[positions['기업명'] == '삼성전자', '종목'].item() == '005930'
+    assert set(positions['시장']) == {'us', 'kr'}
+
+    lots, _ = Holdings(positions, use_stored=False).revalue()
+    # 시트 캐시 값(J: 고점대비, K: 변위저점대비, L: 상승여력, P: 배당률)과 일치
+    for col, sheet_col in [('고점대비 (%)', 9), ('변위저점대비 (%)', 10), ('상승여력 (%)', 11), ('배당률 (%)', 15)]:
+        assert np.allclose(lots[col], sheet[sheet_col].astype(float) * 100), col
+
+
+def test_totals_and_live_quotes():
+    positions = pd.DataFrame({
+        '시장': ['kr', 'kr', 'us'], '종목': ['005930', '000660', 'AAPL'], '기업명': ['삼성전자', 'SK하이닉스', 'Apple'],
+        '보유주수': [10, 5, 4], '평단가': [50000, 100000, 200], '배당금': [1444, 1200, 1],
+        '현재가': [60000, 90000, 250], '52주 고점': [80000, 200000, 260], '52주 저점': [50000, 80000, 160],
+    })
+    quotes = pd.DataFrame({'현재가': [70000.0], '52주 고점': [80000.0], '52주 저점': [50000.0]},
+                          index=pd.MultiIndex.from_tuples([('kr', '005930')], names=['시장', '종목']))
+    lots, summary = Holdings(positions, use_stored=False).revalue(quotes)
+    assert lots['현재가'].tolist() == [70000, 90000, 250]  # 분석 시세 우선, 없으면 시트 값
+    assert summary.loc['KRW', '평가금액'] == 70000 * 10 + 90000 * 5
+    assert summary.loc['KRW', '평가손익'] == 200000 - 50000
+    assert summary.loc['USD', '배당수입'] == 4
+    assert np.isclose(lots.loc[lots['통화'] == 'KRW', '비중 (%)'].sum(), 100)
+    assert lots.loc[2, '비중 (%)'] == 100 and lots.loc[2, '수익률 (%)'] == 25
+
+
+def measure_revalue():
+    rng = np.random.default_rng(0)
+    markets = rng.choice(['kr', 'us', 'crypto'], N_LOTS)
+    tickers = [f"T{i}" for i in range(N_LOTS)]
+    price = rng.uniform(10, 1000, N_LOTS)
+    positions = pd.DataFrame({'시장': markets, '종목': tickers, '기업명': tickers, '보유주수': rng.integers(1, 100, N_LOTS),
+                              '평단가': price, '배당금': price * 0.02, '현재가': price, '52주 고점': price * 1.3,
+                              '52주 저점': price * 0.7})
+    book = Holdings(positions, use_stored=False)
+    quotes = positions.set_index(['시장', '종목'])[['현재가', '52주 고점', '52주 저점']]
+    book.revalue(quotes)
+    started = time.perf_counter()
+    for _ in range(20):
+        quotes['현재가'] *= 1.001
+        book.revalue(quotes)
+    return (time.perf_counter() - started) / 20
+
+
+def test_revalue_speed():
+    elapsed = measure_revalue()
+    assert elapsed < REVALUE_BUDGET, f"{N_LOTS}개 포지션 재평가 {elapsed * 1000:.1f}ms"
+
+
+if __name__ == "__main__":
+    positions, _, _ = load_sheet()
+    lots, summary = Holdings(positions, use_stored=False).revalue()
+    print(lots[['기업명', '현재가', '고점대비 (%)', '상승여력 (%)', '배당률 (%)']].head().to_string(index=False))
+    print(f"{N_LOTS}개 포지션 재평가: {measure_revalue() * 1000:.2f}ms")
+    test_import_matches_sheet_formulas()
+    test_totals_and_live_quotes()
+    test_revalue_speed()
+    print("✅ 통과")
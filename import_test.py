@@ -0,0 +1,39 @@
+"""임포트 시간 예산 점검: 분석 엔진 import가 무거운 의존성을 끌어오지 않고 예산 안에 끝나는지 확인
+
+    python import_test.py        # 결과 출력
+    python -m pytest import_test.py
+"""
+import subprocess
+import sys
+
+IMPORT_BUDGET_SEC = 1.5                       # 새 인터프리터에서 dashboard 패키지 import 허용 시간
+LAZY_MODULES = ['pykrx', 'altair', 'xlsxwriter']  # 사용 시점에만 로드되어야 하는 모듈
+
+PROBE = f"""
+import sys, time
+started = time.perf_counter()
+import dashboard
+elapsed = time.perf_counter() - started
+loaded = [m for m in {LAZY_MODULES!r} if m in sys.modules]
+print(f"{{elapsed:.3f}}|{{','.join(loaded)}}")
+"""
+
+
+def measure_import():
+    """새 파이썬 프로세스에서 dashboard import 시간과 미리 로드된 지연 모듈 목록 측정"""
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True).stdout
+    elapsed, loaded = out.strip().splitlines()[-1].split("|")
+    return float(elapsed), [m for m in loaded.split(",") if m]
+
+
+def test_import_budget():
+    elapsed, loaded = measure_import()
+    assert not loaded, f"지연 로딩 대상이 import 시점에 로드됨: {loaded}"
+    assert elapsed < IMPORT_BUDGET_SEC, f"import {elapsed:.2f}초 > 예산 {IMPORT_BUDGET_SEC}초"
+
+
+if __name__ == "__main__":
+    elapsed, loaded = measure_import()
+    print(f"dashboard import: {elapsed:.3f}초 (예산 {IMPORT_BUDGET_SEC}초)")
+    print(f"미리 로드된 지연 모듈: {loaded or '없음'}")
+    print("✅ 통과" if not loaded and elapsed < IMPORT_BUDGET_SEC else "❌ 실패")
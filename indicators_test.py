@@ -0,0 +1,64 @@
+"""기술적 지표 엔진 점검: 2차원 배열 일괄 계산 결과가 종목별 pandas rolling/ewm(RSI Wilder 평활) 계산과 일치하는지 확인
+
+    python indicators_test.py        # 결과 출력
+    python -m pytest indicators_test.py
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard.indicators import MA_LONG, RSI_BARS, RSI_PERIOD, indicator_columns
+
+
+def sample_bars(days, seed):
+    """임의 보행 일봉 (pykrx OHLCV 컬럼 형식)"""
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(rng.normal(0, 0.02, size=days).cumsum())
+    volume = rng.integers(1_000, 50_000, size=days).astype(float)
+    return pd.DataFrame({'고가': close, '저가': close, '종가': close, '거래량': volume}, index=pd.bdate_range('2024-01-01', periods=days))
+
+
+def per_ticker(bars):
+    """기존 방식: 종목마다 pandas rolling으로 최신 값 계산"""
+    close, volume = bars['종가'], bars['거래량']
+    diff = close.iloc[-RSI_BARS:].diff()
+    wilder = lambda x: x.ewm(alpha=1 / RSI_PERIOD, adjust=False).mean().iloc[-1]
+    gain, loss = wilder(diff.clip(lower=0)), wilder((-diff).clip(lower=0))
+    base = volume.iloc[-21:-1]
+    return {
+        'MA20 이격도 (%)': (close.iloc[-1] / close.rolling(20).mean().iloc[-1] - 1) * 100,
+        'MA60 이격도 (%)': (close.iloc[-1] / close.rolling(MA_LONG).mean().iloc[-1] - 1) * 100,
+        'RSI(14)': 100 - 100 / (1 + gain / loss),
+        '변동성 (%)': np.log(close).diff().iloc[-20:].std() * np.sqrt(252) * 100,
+        '거래량 Z': (volume.iloc[-1] - base.mean()) / base.std(ddof=0),
+    }
+
+
+def test_matches_pandas():
+    bars_list = [sample_bars(250, seed) for seed in range(20)] + [sample_bars(30, 99), None]
+    result = indicator_columns(bars_list)
+    for i, bars in enumerate(bars_list[:20]):
+        for col, expected in per_ticker(bars).items():
+            assert np.isclose(result[col][i], expected), (i, col)
+    # 일봉이 부족하면 해당 지표만 NaN
+    assert np.isnan(result['MA60 이격도 (%)'][20]) and not np.isnan(result['MA20 이격도 (%)'][20])
+    assert all(np.isnan(values[21]) for values in result.values())
+
+
+def test_rsi_wilder_smoothing():
+    """단순 평균과 달리 오래된 변동도 지수적으로 반영: 하락 뒤 14일 연속 상승해도 RSI는 100이 아님"""
+    close = np.r_[np.linspace(200, 100, 60), np.linspace(101, 114, 14)]
+    bars = pd.DataFrame({'종가': close, '거래량': np.arange(len(close)) + 1.0})
+    rsi = indicator_columns([bars])['RSI(14)'][0]
+    assert np.isclose(rsi, per_ticker(bars)['RSI(14)']) and 50 < rsi < 100
+
+
+if __name__ == "__main__":
+    test_matches_pandas()
+    test_rsi_wilder_smoothing()
+    bars_list = [sample_bars(260, seed) for seed in range(2000)]
+    started = time.perf_counter()
+    indicator_columns(bars_list)
+    print(f"2000개 종목 지표 계산: {time.perf_counter() - started:.3f}초")
+    print("✅ 통과")
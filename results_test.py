@@ -0,0 +1,91 @@
+"""분석 결과 캐시 점검: 신선도 판정, 경과 시간 라벨, 도착한 행 병합 순서, 종목 목록 변경 시 증분 재분석 확인
+
+    python results_test.py        # 결과 출력
+    python -m pytest results_test.py
+"""
+import tempfile
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from dashboard import results
+from dashboard.config import FRESHNESS_BUDGET
+from dashboard.results import age_label, analyze_incremental, is_stale, merge_rows
+
+N_TICKERS = 40  # 증분 재분석 점검용 포트폴리오 크기
+
+
+def fake_analyze(calls):
+    """analyze_market 대체: 요청받은 종목 목록을 기록하고 종목별 행 생성"""
+    def analyze(tickers, market, on_row=None, columns=None, **kwargs):
+        calls.append(list(tickers))
+        return pd.DataFrame({'종목': tickers, '현재가': [float(len(calls))] * len(tickers)}), []
+    return analyze
+
+
+@contextmanager
+def fake_results():
+    """임시 결과 저장소 + 가짜 analyze_market (끝나면 원래 값으로 복원) -> 분석 호출 기록"""
+    saved = results.RESULT_DIR, results.analyze_market
+    calls = []
+    results.RESULT_DIR, results.analyze_market = tempfile.mkdtemp(), fake_analyze(calls)
+    try:
+        yield calls
+    finally:
+        results.RESULT_DIR, results.analyze_market = saved
+
+
+def test_freshness_and_age():
+    now = 1_000_000.0
+    assert not is_stale('crypto', now - FRESHNESS_BUDGET['crypto'] + 1, now)
+    assert is_stale('crypto', now - FRESHNESS_BUDGET['crypto'] - 1, now)
+    assert is_stale('kr', None, now)
+    assert [age_label(now - s, now) for s in [5, 150, 7300, 200000]] == ["방금 전", "2분 전", "2시간 전", "2일 전"]
+
+
+def test_merge_rows_keeps_portfolio_order():
+    base = pd.DataFrame({'종목': ['A', 'B', 'C'], '현재가': [1.0, 2.0, 3.0]})
+    merged = merge_rows(base, [{'종목': 'C', '현재가': 30.0}, {'종목': 'D', '현재가': 40.0}], ['D', 'A', 'B', 'C'])
+    assert merged['종목'].tolist() == ['D', 'A', 'B', 'C']
+    assert merged['현재가'].tolist() == [40.0, 1.0, 2.0, 30.0]
+
+
+def test_incremental_fetches_only_added_tickers():
+    with fake_results() as calls:
+        tickers = [f"T{i:02d}" for i in range(N_TICKERS)]
+        df, _, fetched, _ = analyze_incremental(tickers, 'us')
+        assert len(fetched) == N_TICKERS and df['종목'].tolist() == tickers
+
+        # 1개 추가 + 2개 삭제 + 순서 변경: 추가된 종목만 수집, 삭제된 종목은 결과에서 제외
+        changed = ['NEW'] + tickers[:10][::-1] + tickers[12:]
+        df, _, fetched, oldest = analyze_incremental(changed, 'us')
+        assert calls[-1] == ['NEW'] and fetched == ['NEW']
+        assert df['종목'].tolist() == changed
+        assert df.set_index('종목')['현재가'].to_dict()['NEW'] == 2.0 and df['현재가'].eq(1.0).sum() == len(changed) - 1
+        assert oldest is not None and not is_stale('us', oldest)
+
+
+def test_incremental_refetches_stale_and_other_columns():
+    with fake_results() as calls:
+        tickers = ['A', 'B', 'C']
+        analyze_incremental(tickers, 'crypto', columns=['현재가'])
+        # 신선도 예산이 지난 행은 다시 수집
+        rows = results.load_rows('crypto')
+        rows.loc[rows['종목'] == 'B', '갱신시각'] = time.time() - FRESHNESS_BUDGET['crypto'] - 1
+        rows.to_parquet(results.rows_path('crypto'))
+        _, _, fetched, _ = analyze_incremental(tickers, 'crypto', columns=['현재가'])
+        assert fetched == ['B']
+        # 다른 컬럼으로 분석한 행은 재사용하지 않음, 전체 컬럼으로 분석한 행은 모든 요청에 재사용
+        assert analyze_incremental(tickers, 'crypto', columns=['RSI(14)'])[2] == tickers
+        analyze_incremental(tickers, 'crypto')
+        assert analyze_incremental(tickers, 'crypto', columns=['현재가'])[2] == []
+        assert len(calls) == 4
+
+
+if __name__ == "__main__":
+    test_freshness_and_age()
+    test_merge_rows_keeps_portfolio_order()
+    test_incremental_fetches_only_added_tickers()
+    test_incremental_refetches_stale_and_other_columns()
+    print("✅ 통과")
@@ -0,0 +1,111 @@
+"""포트폴리오 위험 분석 점검: 증분 갱신 = 전체 재계산(쌍별 공통 거래일 상관), 시장별 일봉 도착 시차, 군집 순서, 포트폴리오 변동성, 계산 속도 확인
+
+    python risk_test.py        # 결과 출력
+    python -m pytest risk_test.py
+"""
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard import bars, risk
+from dashboard.extremes import RollingExtremes
+from dashboard.risk import MIN_OVERLAP, RiskMatrix, RiskReport, cluster_order
+
+N_NAMES = 500          # 속도 측정 종목 수
+N_DAYS = 250           # 속도 측정 일수
+RISK_BUDGET = 1.0      # 행렬 생성 + 상관/변동성/군집 순서 계산 허용 시간 (초)
+
+
+def returns(n_names, n_days, n_factors=2, seed=0):
+    """공통 요인 n_factors개에 종목이 번갈아 묶인 일간 수익률 (종목마다 일부 날짜는 휴장 NaN)"""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.02, (n_days, n_factors))
+    values = factors[:, np.arange(n_names) % n_factors] + rng.normal(0, 0.005, (n_days, n_names))
+    values[rng.random((n_days, n_names)) < 0.1] = np.nan
+    return pd.DataFrame(values, index=pd.date_range("2025-01-01", periods=n_days), columns=[f"T{i}" for i in range(n_names)])
+
+
+def test_incremental_matches_full():
+    frame = returns(30, 200)
+    full = RiskMatrix(frame.columns, window=120)
+    full.update(frame)
+    incremental = RiskMatrix(frame.columns, window=120)
+    incremental.update(frame.iloc[:150])
+    for day in range(150, 200):  # 하루씩 추가 -> 기간 밖 날짜는 빠짐 (휴장 종목이 있는 날은 다음 일봉까지 대기)
+        incremental.update(frame.iloc[:day + 1])
+    assert incremental.dates.equals(full.dates) and len(full) == 120
+    window = frame.loc[full.dates]
+    expected = window.corr(min_periods=MIN_OVERLAP).to_numpy()  # pandas 쌍별 공통 관측 상관
+    assert np.allclose(incremental.correlation(), expected) and np.allclose(full.correlation(), expected)
+    assert np.allclose(incremental.volatility(), window.std().to_numpy() * np.sqrt(252) * 100)
+
+
+def test_waits_for_late_market():
+    frame = returns(3, 60)
+    frame.iloc[-2:, 0] = np.nan  # 한 종목(한국 주식 등)의 최근 2일 일봉이 아직 없음
+    matrix = RiskMatrix(frame.columns)
+    matrix.update(frame)
+    assert matrix.dates[-1] == frame.index[-3]
+    assert matrix.update(returns(3, 60)) == 2  # 늦게 들어온 일봉도 건너뛰지 않고 반영
+
+
+def test_cluster_order_groups_correlated_names():
+    frame = returns(12, 200, n_factors=3)
+    matrix = RiskMatrix(frame.columns)
+    matrix.update(frame)
+    groups = np.arange(12)[cluster_order(matrix.correlation())] % 3
+    assert (np.diff(groups) != 0).sum() == 2  # 같은 요인 종목끼리 연속
+
+
+def test_portfolio_volatility():
+    rng = np.random.default_rng(1)
+    a, b = rng.normal(0, 0.01, 500), rng.normal(0, 0.01, 500)
+    frame = pd.DataFrame({'A': a, 'B': 2 * a, 'C': b}, index=pd.date_range("2024-01-01", periods=500))
+    matrix = RiskMatrix(frame.columns, window=500)
+    matrix.update(frame)
+    vol = matrix.volatility()
+    assert np.isclose(matrix.portfolio_volatility([1, 1, 0]), (vol[0] + vol[1]) / 2)  # 상관 1: 분산 효과 없음
+    assert matrix.portfolio_volatility([1, 0, 1]) < (vol[0] + vol[2]) / 2 * 0.8    # 무상관: 약 1/√2
+    report = RiskReport(matrix, [1, 1, 0])
+    assert list(report.pairs[['종목 1', '종목 2']].iloc[0]) == ['A', 'B'] and len(report.pairs) == 1
+
+
+def test_store_adds_new_days_only():
+    bars.BARS_DIR, risk.RISK_DIR = tempfile.mkdtemp(), tempfile.mkdtemp()
+    names = [('kr', '000660'), ('us', 'MU'), ('us', 'AMD')]
+    closes = 100 * np.exp(returns(3, 80).fillna(0).cumsum())
+    for i, (market, ticker) in enumerate(names):
+        bars.save_history(market, ticker, RollingExtremes(), closes.iloc[:-1, [i]].set_axis(['종가'], axis=1))
+    first = risk.risk_matrix(names)
+    for i, (market, ticker) in enumerate(names):  # 다음 날 일봉 추가
+        bars.save_history(market, ticker, RollingExtremes(), closes.iloc[:, [i]].set_axis(['종가'], axis=1))
+    second = risk.risk_matrix(names)
+    assert len(second) == len(first) + 1 and second.updates == 2  # 저장된 행렬에 하루만 추가
+    report = risk.analyze_risk(names + [('us', 'MU')], [1, 2, 3, 4])
+    assert set(report.corr.index) == {'kr:000660', 'us:MU', 'us:AMD'} and report.days == len(second)
+
+
+def measure_risk(n_names=N_NAMES, n_days=N_DAYS):
+    frame = returns(n_names, n_days, n_factors=5)
+    started = time.perf_counter()
+    matrix = RiskMatrix(frame.columns, window=n_days)
+    matrix.update(frame)
+    RiskReport(matrix)
+    return time.perf_counter() - started
+
+
+def test_risk_speed():
+    assert measure_risk() < RISK_BUDGET
+
+
+if __name__ == "__main__":
+    print(f"{N_NAMES}개 종목 x {N_DAYS}일 상관/변동성/군집 순서: {measure_risk() * 1000:.0f}ms")
+    test_incremental_matches_full()
+    test_waits_for_late_market()
+    test_cluster_order_groups_correlated_names()
+    test_portfolio_volatility()
+    test_store_adds_new_days_only()
+    test_risk_speed()
+    print("✅ 통과")
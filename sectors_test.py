@@ -0,0 +1,88 @@
+"""업종 중앙값 테이블 점검: 적자/자본잠식 제외, 최소 종목 수 미만 업종 처리, 장중이면 전 개장일 스냅샷 사용,
+생성 실패 후 재시도 대기,
+관측값 갱신(캐시 무효화)과 동시 조회 확인
+
+    python sectors_test.py        # 결과 출력
+    python -m pytest sectors_test.py
+"""
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from dashboard import sectors
+from dashboard.sectors import SECTOR_MIN_COUNT, closed_session, sector_medians
+
+
+def test_sector_medians():
+    df = pd.DataFrame({
+        '업종': ['반도체'] * 4 + ['은행'] * (SECTOR_MIN_COUNT - 1),
+        'PER': [10.0, 20.0, 30.0, -5.0, 4.0, 5.0],
+        'PBR': [1.0, 2.0, 3.0, 0.0, 0.3, 0.4],
+        '배당률 (%)': [0.0, 1.0, 2.0, 3.0, 6.0, 7.0],
+    })
+    medians = sector_medians(df)
+    assert medians.loc['반도체'].tolist() == [20.0, 2.0, 1.5]  # PER/PBR은 양수만, 배당률은 무배당 포함
+    assert medians.loc['은행'].tolist() == [0.0, 0.0, 0.0]     # 표본 부족 -> 0 (N/A)
+
+
+def test_closed_session_skips_today_and_holidays():
+    today = datetime.now()
+    day = lambda n: (today - timedelta(days=n)).strftime("%Y%m%d")
+    open_days = {day(0), day(3)}  # 오늘(장중)과 3일 전만 개장, 1~2일 전은 휴장
+    saved = sectors.load_snapshot, sectors.last_closed_day
+    sectors.load_snapshot = lambda d: pd.DataFrame({'PER': [1.0] if d in open_days else []})
+    sectors.last_closed_day = lambda market: day(1)  # 장중: 마지막 완성일은 전일
+    try:
+        assert closed_session(day(0)) == day(3)
+        assert closed_session(day(3)) == day(3)
+    finally:
+        sectors.load_snapshot, sectors.last_closed_day = saved
+
+
+def test_failed_build_waits_before_retry():
+    """pykrx 장애: 종목마다 스냅샷을 다시 찾지 않고 RETRY_SEC 동안 실패를 기억"""
+    calls = []
+
+    def failing(d):
+        calls.append(d)
+        raise ValueError("pykrx 응답 없음")
+    saved = sectors.load_snapshot, sectors.RETRY_SEC
+    sectors.load_snapshot = failing
+    sectors._failed.pop(('kr', '20240105'), None)
+    try:
+        assert sectors.kr_fundamentals('005930', '20240105') is None
+        assert sectors.kr_fundamentals('000660', '20240105') is None
+        assert len(calls) == 1
+        sectors.RETRY_SEC = 0  # 대기 시간이 지나면 다시 시도
+        assert sectors.kr_fundamentals('005930', '20240105') is None and len(calls) == 2
+    finally:
+        sectors.load_snapshot, sectors.RETRY_SEC = saved
+
+
+def test_lookup_during_invalidation():
+    saved = sectors.US_OBSERVATIONS
+    sectors.US_OBSERVATIONS = f"{tempfile.mkdtemp()}/us_observations.parquet"
+    obs = pd.DataFrame({'종목': list('ABC'), '업종': ['Tech'] * 3, 'PER': [10.0, 20.0, 30.0], 'PBR': 1.0, '배당률 (%)': 0.0})
+    results = []
+
+    def lookup():
+        for _ in range(200): results.append(sectors.us_sector('Tech', '20250102')['업종PER'])
+    try:
+        readers = [threading.Thread(target=lookup) for _ in range(4)]
+        for t in readers: t.start()
+        for _ in range(10): sectors.record_us_observations(obs)  # 조회 중 캐시 무효화 (KeyError 없이 계속 조회)
+        for t in readers: t.join()
+        assert len(results) == 800 and set(results) <= {0.0, 20.0}
+        assert sectors.us_sector('Tech', '20250102')['업종PER'] == 20.0
+        assert sectors.us_coverage() == (3, 1)
+    finally:
+        sectors.US_OBSERVATIONS = saved
+
+if __name__ == "__main__":
+    test_sector_medians()
+    test_closed_session_skips_today_and_holidays()
+    test_failed_build_waits_before_retry()
+    test_lookup_during_invalidation()
+    print("✅ 통과")
@@ -0,0 +1,98 @@
+"""종목 유니버스 색인 점검: 코드/한글명/영문명 접두어 검색, 부분 문자열 검색, 사전 검증, 자동완성 속도 확인
+
+    python universe_test.py        # 결과 출력
+    python -m pytest universe_test.py
+"""
+import tempfile
+import time
+
+import pandas as pd
+
+from dashboard import universe
+from dashboard.universe import SymbolIndex
+
+N_SYMBOLS = 30_000      # 미국 거래소 심볼 수 수준
+SEARCH_BUDGET = 0.001   # 검색 1회 허용 시간 (초)
+
+SYMBOLS = pd.DataFrame({
+    '종목': ['005930', '000660', '066570', '005380', 'BTC', 'ETH', 'AAPL', 'AAL'],
+    '이름': ['삼성전자', 'SK하이닉스', 'LG전자', '현대차', '비트코인', '이더리움', 'Apple Inc', 'American Airlines Group Inc'],
+    '영문명': ['', '', '', '', 'Bitcoin', 'Ethereum', '', ''],
+})
+
+
+def synthetic_index(n=N_SYMBOLS):
+    codes = [f"S{i:05d}" for i in range(n)]
+    names = [f"Company {i} Holdings" for i in range(n)]
+    return SymbolIndex(pd.concat([SYMBOLS, pd.DataFrame({'종목': codes, '이름': names, '영문명': ""})], ignore_index=True))
+
+
+def measure_search(index, queries=("삼성", "전자", "S1234", "holdings 29", "aa", "bit")):
+    started = time.perf_counter()
+    rounds = 100
+    for _ in range(rounds):
+        for q in queries: index.search(q)
+    return (time.perf_counter() - started) / (rounds * len(queries))
+
+
+def test_prefix_and_substring_search():
+    index = SymbolIndex(SYMBOLS)
+    assert index.search("삼성")[0] == ('005930', '삼성전자')
+    assert index.search("0059") == [('005930', '삼성전자')]
+    assert {code for code, _ in index.search("전자")} == {'005930', '066570'}  # 이름 중간 일치 (바이그램)
+    assert index.search("bit")[0][0] == 'BTC' and index.search("ether")[0][0] == 'ETH'  # 영문명, 대소문자 무시
+    assert index.search("AAL")[0] == ('AAL', 'American Airlines Group Inc')  # 코드 완전 일치가 먼저
+    assert index.search("sk 하이") == [('000660', 'SK하이닉스')]  # 공백 무시
+    assert index.search("없는종목") == [] and index.search(" ") == []
+
+
+def test_validate_keeps_order():
+    index = SymbolIndex(SYMBOLS)
+    assert index.validate(['BTC', 'XXX', '005930', '999999']) == (['BTC', '005930'], ['XXX', '999999'])
+    assert 'ETH' in index and 'eth' not in index
+
+
+def test_symbol_index_caches_and_falls_back():
+    saved = universe.UNIVERSE_DIR
+    universe.UNIVERSE_DIR = tempfile.mkdtemp()
+    calls = []
+
+    def fetch(day):
+        calls.append(day)
+        return SYMBOLS
+
+    def offline(day):
+        calls.append(day)
+        raise ConnectionError("네트워크 없음")
+    universe.SYMBOL_FETCHERS['test'] = fetch
+    try:
+        assert universe.validate_tickers('test', ['BTC', 'NOPE']) == (['BTC'], ['NOPE'])
+        assert universe.symbol_index('test') is universe.symbol_index('test')
+        assert len(calls) == 1  # 당일 목록은 한 번만 수집
+
+        # 목록을 받을 수 없으면 검증 생략 (전부 분석 대상), 실패 직후에는 다시 수집하지 않음
+        universe.SYMBOL_FETCHERS['test'] = offline
+        assert universe.symbol_index('test', '20240103') is None
+        assert universe.symbol_index('test', '20240103') is None and calls.count('20240103') == 1
+        universe._indexes.clear()
+        universe.UNIVERSE_DIR = tempfile.mkdtemp()
+        assert universe.validate_tickers('test', ['A', 'B']) == (['A', 'B'], [])
+    finally:
+        del universe.SYMBOL_FETCHERS['test']
+        universe.UNIVERSE_DIR = saved
+
+
+def test_search_speed():
+    index = synthetic_index()
+    assert measure_search(index) < SEARCH_BUDGET
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    index = synthetic_index()
+    print(f"{len(index):,}개 종목 색인 생성: {time.perf_counter() - started:.2f}초, 검색 1회 평균 {measure_search(index) * 1e6:.0f}µs")
+    test_prefix_and_substring_search()
+    test_validate_keeps_order()
+    test_symbol_index_caches_and_falls_back()
+    test_search_speed()
+    print("✅ 통과")
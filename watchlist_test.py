@@ -0,0 +1,117 @@
+"""관심 목록 일괄 가져오기 점검: CSV/xlsx 스트리밍 읽기, 머리글/시장 컬럼 인식, 검증/중복 제거, 저장소(연결 닫힘), 포트폴리오 참조 확인
+
+    python watchlist_test.py        # 결과 출력
+    python -m pytest watchlist_test.py
+"""
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+from dashboard import watchlist
+from dashboard.portfolio import read_portfolio
+from dashboard.universe import SymbolIndex
+
+N_SYMBOLS = 3_000       # 일괄 가져오기 종목 수
+IMPORT_BUDGET = 1.0     # 가져오기 + 저장 허용 시간 (초)
+SHEET = "stock_valuation.xlsx"
+RESULT_FILE = "history/investment_result_20250413_162437.xlsx"  # 한국 종목코드가 숫자로 저장된 분석 결과
+
+KR = pd.DataFrame({'종목': ['005930', '000660', '005380', '000270', '458730'],
+                   '이름': ['삼성전자', 'SK하이닉스', '현대차', '기아', 'TIGER 미국배당다우존스'], '영문명': ""})
+US_CODES = [f"S{i:04d}" for i in range(N_SYMBOLS)] + ['NVDA', 'GOOGL', 'AMZN', 'AAPL', 'MSFT', 'TSLA', 'META', 'O', 'SCHD']
+US = pd.DataFrame({'종목': US_CODES, '이름': [f"Company {c}" for c in US_CODES], '영문명': ""})
+
+
+def use_index(symbols):
+    watchlist.symbol_index = lambda market: SymbolIndex(symbols)
+    return os.path.join(tempfile.mkdtemp(), "watchlists.sqlite")
+
+
+def bulk_csv():
+    """N_SYMBOLS개 + 중복/잘못된 코드/빈 행이 섞인 CSV"""
+    rows = ["티커,메모"] + [f"{c.lower()},x" for c in US_CODES[:N_SYMBOLS]] + ["S0001,dup", "NOPE,bad", ",", "aapl,"]
+    return io.BytesIO("\n".join(rows).encode("utf-8-sig"))
+
+
+def test_bulk_csv_import():
+    path = use_index(US)
+    read = []
+    started = time.perf_counter()
+    report = watchlist.import_watchlist(bulk_csv(), "bulk.csv", 'us', "대량", path, on_progress=read.append)
+    elapsed = time.perf_counter() - started
+    assert report.tickers == US_CODES[:N_SYMBOLS] + ['AAPL']
+    assert report.duplicates == 1 and report.unknown == ['NOPE'] and report.validated
+    assert read == [500, 1000, 1500, 2000, 2500, 3000]  # 청크마다 진행 상황 보고
+    assert watchlist.load_watchlist("대량", 'us', path) == report.tickers
+    assert watchlist.list_watchlists('us', path) == [("대량", N_SYMBOLS + 1)]
+    assert elapsed < IMPORT_BUDGET
+
+
+def test_stock_valuation_sheet_filters_market():
+    path = use_index(pd.concat([KR, US], ignore_index=True))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # openpyxl 조건부 서식 확장 경고
+        us = watchlist.import_watchlist(SHEET, SHEET, 'us', "시트", path)
+        kr = watchlist.import_watchlist(SHEET, SHEET, 'kr', "시트", path)
+    assert us.tickers[:3] == ['NVDA', 'GOOGL', 'AMZN'] and us.skipped > 0  # 한국 행은 건너뜀
+    assert 'IONQ' in us.unknown  # 색인에 없는 종목은 저장하지 않음
+    assert {'005380', '000270', '005930'} <= set(kr.tickers)  # 한국 종목명 -> 코드
+    assert watchlist.load_watchlist("시트", 'us', path) == us.tickers  # 시장별로 따로 저장
+
+
+def test_result_file_numeric_kr_codes():
+    path = use_index(KR)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        report = watchlist.import_watchlist(RESULT_FILE, RESULT_FILE, 'kr', "결과", path)
+    assert report.tickers[:2] == ['005930', '005380']
+
+
+def test_portfolio_references_watchlist():
+    path = use_index(US)
+    watchlist.WATCHLIST_PATH = path
+    watchlist.save_watchlist("대량", 'us', ['AAPL', 'MSFT'])
+    portfolio_file = os.path.join(os.path.dirname(path), "portfolio_us.json")
+    with open(portfolio_file, "w", encoding="utf-8") as f:
+        json.dump({"tickers": "AAPL", "watchlist": "대량", "max_per": 20, "min_up": 70, "min_drop": 30, "min_div": 4.0}, f)
+    assert read_portfolio(portfolio_file)["tickers"] == "AAPL, MSFT"
+
+
+def test_connections_closed():
+    path = use_index(US)
+    opened, connect = [], sqlite3.connect
+    watchlist.sqlite3.connect = lambda *args, **kwargs: opened.append(connect(*args, **kwargs)) or opened[-1]
+    try:
+        watchlist.save_watchlist("닫힘", 'us', ['AAPL'], path)
+        watchlist.load_watchlist("닫힘", 'us', path)
+        watchlist.list_watchlists('us', path)
+        watchlist.delete_watchlist("닫힘", 'us', path)
+    finally:
+        watchlist.sqlite3.connect = connect
+    assert len(opened) == 4
+    for conn in opened:  # 닫힌 연결은 ProgrammingError
+        try:
+            conn.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            continue
+        raise AssertionError("연결이 닫히지 않음")
+    assert watchlist.list_watchlists('us', path) == []
+
+
+if __name__ == "__main__":
+    use_index(US)
+    started = time.perf_counter()
+    report = watchlist.collect(watchlist.iter_symbols(bulk_csv(), "bulk.csv"), 'us')
+    print(f"{report.rows:,}행 검증/중복 제거: {(time.perf_counter() - started) * 1000:.1f}ms ({len(report.tickers):,}개 종목)")
+    test_bulk_csv_import()
+    test_stock_valuation_sheet_filters_market()
+    test_result_file_numeric_kr_codes()
+    test_portfolio_references_watchlist()
+    test_connections_closed()
+    print("✅ 통과")